@@ -0,0 +1,180 @@
+"""
+app/core/circuit_breaker.py
+Circuit breakers for upstream AI APIs.
+
+A breaker tracks the outcome and latency of recent calls. When the error
+rate or slow-call rate crosses its threshold it opens and callers fail
+fast with CircuitOpenError (and take their degraded path) instead of
+waiting on a struggling upstream. After a cool-down a few probe calls are
+let through (half-open); if they succeed the breaker closes again.
+"""
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Any, Optional, TypeVar
+
+from config import settings
+from app.core.exceptions import CircuitOpenError
+from app.core.logging_config import logger
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker driven by error and slow-call rates.
+
+    Args:
+        name: Upstream name (used in logs and errors)
+        window: Number of recent calls the rates are computed over
+        min_calls: Calls needed in the window before the breaker can open
+        failure_rate: Error rate that opens the breaker
+        slow_call_ms: Calls slower than this count as slow
+        slow_call_rate: Slow-call rate that opens the breaker
+        open_seconds: Cool-down before probe calls are allowed
+        half_open_calls: Successful probes needed to close again
+    """
+
+    def __init__(self, name: str, window: int = 20, min_calls: int = 5,
+                 failure_rate: float = 0.5, slow_call_ms: float = 5000,
+                 slow_call_rate: float = 0.8, open_seconds: float = 30,
+                 half_open_calls: int = 2):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_ms = slow_call_ms
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._calls: deque = deque(maxlen=window)  # (failed, slow) per call
+        self._probes = 0  # Probe calls started while half-open
+        self._probe_successes = 0
+        self._stats = {"calls": 0, "failures": 0, "slow": 0, "rejected": 0, "opened": 0}
+
+    def before_call(self) -> None:
+        """Admit a call or raise CircuitOpenError"""
+        if self.state == OPEN:
+            remaining = self.opened_at + self.open_seconds - time.monotonic()
+            if remaining > 0:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(self.name, remaining)
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(self.name, 0.0)
+            self._probes += 1
+
+    def record(self, success: bool, duration_ms: float) -> None:
+        """Record the outcome of an admitted call"""
+        slow = duration_ms > self.slow_call_ms
+        failed = not success
+        self._stats["calls"] += 1
+        self._stats["failures"] += failed
+        self._stats["slow"] += slow
+
+        if self.state == HALF_OPEN:
+            if failed or slow:
+                self._transition(OPEN)
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_calls:
+                    self._transition(CLOSED)
+            return
+
+        if self.state == OPEN:
+            return  # Late result of a call admitted before the breaker opened
+
+        self._calls.append((failed, slow))
+        if len(self._calls) >= self.min_calls:
+            failures = sum(f for f, _ in self._calls) / len(self._calls)
+            slow_calls = sum(s for _, s in self._calls) / len(self._calls)
+            if failures >= self.failure_rate or slow_calls >= self.slow_call_rate:
+                self._transition(OPEN)
+
+    def release(self) -> None:
+        """Return a probe slot for a call that ended without an outcome (cancelled)"""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def _transition(self, state: str) -> None:
+        """Move to a new state and reset the bookkeeping for it"""
+        previous, self.state = self.state, state
+        self._calls.clear()
+        self._probes = 0
+        self._probe_successes = 0
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+            self._stats["opened"] += 1
+            logger.warning(f"[CircuitBreaker] {self.name} opened ({previous} -> open) for {self.open_seconds}s")
+        else:
+            logger.info(f"[CircuitBreaker] {self.name} {previous} -> {state}")
+
+    async def call(self, fn: Callable[[], Awaitable[T]],
+                   ignore: Optional[Callable[[Exception], bool]] = None) -> T:
+        """
+        Run fn through the breaker; exceptions count as failures unless
+        ignore(exception) is true (e.g. rate limiting, which says nothing
+        about the upstream's health).
+        """
+        self.before_call()
+        start = time.perf_counter()
+        recorded = False
+        try:
+            result = await fn()
+            self.record(True, (time.perf_counter() - start) * 1000)
+            recorded = True
+            return result
+        except Exception as e:
+            if ignore is None or not ignore(e):
+                self.record(False, (time.perf_counter() - start) * 1000)
+                recorded = True
+            raise
+        finally:
+            if not recorded:
+                self.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state, window rates and counters"""
+        calls = len(self._calls)
+        snapshot = {
+            "state": self.state,
+            "window_calls": calls,
+            "failure_rate": round(sum(f for f, _ in self._calls) / calls, 3) if calls else None,
+            "slow_call_rate": round(sum(s for _, s in self._calls) / calls, 3) if calls else None,
+            **self._stats
+        }
+        if self.state == OPEN:
+            snapshot["retry_in_s"] = round(max(0.0, self.opened_at + self.open_seconds - time.monotonic()), 3)
+        return snapshot
+
+
+# One breaker per upstream, shared by every caller of that upstream
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Get or create the breaker for an upstream"""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(
+            name,
+            window=settings.breaker_window,
+            min_calls=settings.breaker_min_calls,
+            failure_rate=settings.breaker_failure_rate,
+            slow_call_ms=settings.breaker_slow_call_ms,
+            slow_call_rate=settings.breaker_slow_call_rate,
+            open_seconds=settings.breaker_open_seconds,
+            half_open_calls=settings.breaker_half_open_calls
+        )
+    return _breakers[name]
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every breaker, for the health endpoints"""
+    return {name: breaker.snapshot() for name, breaker in _breakers.items()}
@@ -4,21 +4,30 @@ Dependency injection container using service locator pattern.
 Centralizes all service creation and lifecycle management.
 """
 from typing import Optional
-from database import Database
+from config import settings
+from database import AsyncDatabase
 from app.services.ai_service import GeminiAIService
 from app.services.cache_service import RedisCacheService, MemoryCacheService
+from app.services.embedding_cache import EmbeddingCache
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.rate_limiter import RedisLimiterStore
 from app.services.vector_service import VectorSearchService
 from app.services.routing_service import RoutingService
 from app.services.rag_service import RAGService
 from app.services.osm_service import OSMService
+from app.graph.llm_registry import LLMRegistry
+from app.graph.intent_model import LocalIntentClassifier
+from app.graph.intent_batcher import IntentBatcher
+from app.graph.response_cache import ResponseCache
 from app.graph.workflow import AstuRouteGraph
+from app.core.logging_config import logger
 
 
 class ServiceContainer:
     """Service container for dependency injection"""
     
     def __init__(self):
-        self._db: Optional[Database] = None
+        self._db: Optional[AsyncDatabase] = None
         self._ai: Optional[GeminiAIService] = None
         self._cache: Optional[object] = None
         self._vector: Optional[VectorSearchService] = None
@@ -26,19 +35,43 @@ class ServiceContainer:
         self._rag: Optional[RAGService] = None
         self._osm: Optional[OSMService] = None
         self._graph: Optional[AstuRouteGraph] = None
+        self._llms: Optional[LLMRegistry] = None
+        self._intent: Optional[LocalIntentClassifier] = None
+        self._intent_batcher: Optional[IntentBatcher] = None
+        self._responses: Optional[ResponseCache] = None
+        self._responses_unshared = False
+        self._answers: Optional[SemanticAnswerCache] = None
     
     # Database Service
-    def get_database(self) -> Database:
-        """Get or create database service"""
+    def get_database(self) -> AsyncDatabase:
+        """
+        Get or create async database service.
+        Owns the shared connection pool, which opens on first use
+        (or eagerly via open_pool() at startup).
+        """
         if self._db is None:
-            self._db = Database()
+            self._db = AsyncDatabase(pooled=settings.db_pool_enabled)
         return self._db
     
     # AI Service
     def get_ai_service(self) -> GeminiAIService:
-        """Get or create AI service"""
+        """Get or create AI service (with the embedding cache and shared
+        rate limits when enabled)"""
         if self._ai is None:
-            self._ai = GeminiAIService()
+            embedding_cache = None
+            if settings.embedding_cache_enabled:
+                cache = self.get_cache_service()
+                # The memory fallback is unbounded; the LRU tier covers that case
+                backend = cache if isinstance(cache, RedisCacheService) else None
+                embedding_cache = EmbeddingCache(
+                    backend,
+                    max_entries=settings.embedding_cache_size,
+                    ttl_seconds=settings.embedding_cache_ttl
+                )
+            limiter_store = None
+            if settings.ai_rate_limit_shared and settings.redis_url:
+                limiter_store = RedisLimiterStore(settings.redis_url)
+            self._ai = GeminiAIService(embedding_cache, limiter_store)
         return self._ai
     
     # Cache Service
@@ -75,7 +108,8 @@ class ServiceContainer:
         if self._rag is None:
             vector = self.get_vector_service()
             ai = self.get_ai_service()
-            self._rag = RAGService(vector, ai)
+            answers = self.get_answer_cache()
+            self._rag = RAGService(vector, ai, answers)
         return self._rag
     
     # OSM Service
@@ -85,28 +119,112 @@ class ServiceContainer:
             self._osm = OSMService()
         return self._osm
     
+    # Graph node LLM clients
+    def get_llm_registry(self) -> LLMRegistry:
+        """Get or create the shared LLM client registry"""
+        if self._llms is None:
+            self._llms = LLMRegistry()
+        return self._llms
+    
+    # Local intent classifier
+    def get_intent_classifier(self) -> Optional[LocalIntentClassifier]:
+        """Get or create the local intent classifier (None when disabled)"""
+        if self._intent is None and settings.intent_local_enabled:
+            self._intent = LocalIntentClassifier(
+                settings.intent_model_path,
+                settings.intent_local_threshold,
+                data_paths=(settings.intent_data_path, settings.intent_log_path or ""),
+                log_path=settings.intent_log_path
+            )
+        return self._intent
+    
+    # Intent classification micro-batcher
+    def get_intent_batcher(self) -> Optional[IntentBatcher]:
+        """Get or create the intent batcher (None when the window is 0)"""
+        if self._intent_batcher is None and settings.intent_batch_window_ms > 0:
+            self._intent_batcher = IntentBatcher(
+                self.get_llm_registry(),
+                window_ms=settings.intent_batch_window_ms,
+                max_batch_size=settings.intent_batch_max_size
+            )
+        return self._intent_batcher
+    
+    # Whole-workflow response cache
+    def get_response_cache(self) -> Optional[ResponseCache]:
+        """Get or create the graph response cache (None when disabled)"""
+        if self._responses is None and settings.response_cache_enabled and not self._responses_unshared:
+            cache = self.get_cache_service()
+            # The memory fallback never expires entries; use the bounded LRU instead
+            backend = cache if isinstance(cache, RedisCacheService) else None
+            if backend is None and settings.web_concurrency > 1:
+                # Per-process generations: an admin write would only
+                # invalidate the worker that handled it
+                logger.warning(
+                    f"Response cache disabled: Redis is unavailable and {settings.web_concurrency} "
+                    "workers would each keep their own cache"
+                )
+                self._responses_unshared = True
+                return None
+            self._responses = ResponseCache(
+                backend,
+                ttls={
+                    "NAVIGATION": settings.response_cache_ttl_navigation,
+                    "NEARBY_SERVICE": settings.response_cache_ttl_nearby_service,
+                    "UNIVERSITY_INFO": settings.response_cache_ttl_university_info,
+                    "MIXED": settings.response_cache_ttl_mixed
+                },
+                max_entries=settings.response_cache_size,
+                geohash_precision=settings.response_cache_geohash_precision
+            )
+        return self._responses
+    
+    # Semantic answer cache
+    def get_answer_cache(self) -> Optional[SemanticAnswerCache]:
+        """Get or create the semantic answer cache (None when disabled)"""
+        if self._answers is None and settings.answer_cache_enabled:
+            self._answers = SemanticAnswerCache(
+                self.get_ai_service(),
+                threshold=settings.answer_cache_threshold,
+                max_entries=settings.answer_cache_size,
+                ttl_seconds=settings.answer_cache_ttl,
+                audit_rate=settings.answer_cache_audit_rate,
+                audit_threshold=settings.answer_cache_audit_threshold
+            )
+        return self._answers
+    
     # LangGraph Workflow
     def get_graph(self) -> AstuRouteGraph:
         """Get or create LangGraph workflow"""
         if self._graph is None:
             vector = self.get_vector_service()
             routing = self.get_routing_service()
-            self._graph = AstuRouteGraph(vector, routing)
+            llms = self.get_llm_registry()
+            intent = self.get_intent_classifier()
+            batcher = self.get_intent_batcher()
+            ai = self.get_ai_service()
+            responses = self.get_response_cache()
+            answers = self.get_answer_cache()
+            self._graph = AstuRouteGraph(vector, routing, llms, intent, batcher, ai, responses, answers)
         return self._graph
     
     async def shutdown(self):
         """Clean up all services"""
         if self._db:
-            self._db.disconnect()
+            await self._db.disconnect()
         
         if self._ai:
             await self._ai.close()
         
+        if self._llms:
+            await self._llms.close()
+        
         if self._cache and hasattr(self._cache, 'close'):
             await self._cache.close()
     
-    def reset(self):
-        """Reset all services (useful for testing)"""
+    async def reset(self):
+        """Shut down and reset all services (useful for testing); closes the
+        database pool so a reset container doesn't leak its connections"""
+        await self.shutdown()
         self._db = None
         self._ai = None
         self._cache = None
@@ -115,6 +233,12 @@ class ServiceContainer:
         self._rag = None
         self._osm = None
         self._graph = None
+        self._llms = None
+        self._intent = None
+        self._intent_batcher = None
+        self._responses = None
+        self._responses_unshared = False
+        self._answers = None
 
 
 # Global container instance
@@ -28,6 +28,25 @@ class AIServiceException(AstuRouteException):
         super().__init__(message, code="AI_SERVICE_ERROR")
 
 
+class RateLimitError(AIServiceException):
+    """Upstream AI API kept rate limiting after retries"""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.code = "RATE_LIMITED"
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(AIServiceException):
+    """Upstream AI API circuit is open; callers should degrade immediately"""
+    
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"{upstream} circuit open (retry in {retry_after:.1f}s)")
+        self.code = "CIRCUIT_OPEN"
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
 class LocationNotFound(AstuRouteException):
     """Location/POI not found"""
     
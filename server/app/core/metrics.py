@@ -0,0 +1,137 @@
+"""
+app/core/metrics.py
+In-process metrics for database query paths.
+Collected per Database method and exposed via /metrics and the logs.
+"""
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    """Cumulative latency histogram with count and sum (Prometheus style)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation"""
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile"""
+        if not self.count:
+            return None
+        target = pct * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return float(bound)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative bucket counts plus summary values"""
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            cumulative[f"le_{bound}"] = running
+        cumulative["le_inf"] = self.count
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total, 3),
+            "avg_ms": round(self.total / self.count, 3) if self.count else None,
+            "max_ms": round(self.max, 3),
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+            "buckets": cumulative
+        }
+
+
+class QueryMetrics:
+    """
+    Per-method query timings, pool wait, row counts and slow-query samples.
+
+    Shared by the sync and async database classes; a lock keeps it safe
+    for scripts that query from worker threads.
+    """
+
+    def __init__(self, max_slow_queries: int = 20):
+        self._lock = threading.Lock()
+        self._methods: Dict[str, Dict[str, Any]] = {}
+        self._slow_queries: deque = deque(maxlen=max_slow_queries)
+
+    def _method(self, method: str) -> Dict[str, Any]:
+        """Get or create the stats entry for a method (caller holds the lock)"""
+        if method not in self._methods:
+            self._methods[method] = {
+                "latency": Histogram(),
+                "pool_wait": Histogram(),
+                "rows": 0,
+                "errors": 0
+            }
+        return self._methods[method]
+
+    def record(self, method: str, duration_ms: float, wait_ms: float,
+               rows: int = 0, error: bool = False) -> None:
+        """Record one query execution"""
+        with self._lock:
+            stats = self._method(method)
+            stats["latency"].observe(duration_ms)
+            stats["pool_wait"].observe(wait_ms)
+            stats["rows"] += rows
+            if error:
+                stats["errors"] += 1
+
+    def record_slow_query(self, method: str, duration_ms: float,
+                          query: str, plan: Optional[List[str]]) -> None:
+        """Keep a bounded sample of slow queries with their plans"""
+        with self._lock:
+            self._slow_queries.append({
+                "method": method,
+                "duration_ms": round(duration_ms, 3),
+                "query": query,
+                "plan": plan
+            })
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current metrics as a JSON-serializable dict"""
+        with self._lock:
+            return {
+                "methods": {
+                    method: {
+                        "latency": stats["latency"].snapshot(),
+                        "pool_wait": stats["pool_wait"].snapshot(),
+                        "rows": stats["rows"],
+                        "errors": stats["errors"]
+                    }
+                    for method, stats in self._methods.items()
+                },
+                "slow_queries": list(self._slow_queries)
+            }
+
+    def reset(self) -> None:
+        """Clear all metrics"""
+        with self._lock:
+            self._methods.clear()
+            self._slow_queries.clear()
+
+
+# Global metrics instance shared by all Database objects
+db_metrics = QueryMetrics()
@@ -0,0 +1,123 @@
+"""
+app/core/singleflight.py
+Request coalescing: concurrent calls with the same key share one execution.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+def payload_key(*parts: Any) -> str:
+    """Stable hash of a JSON-serializable call payload"""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight coroutine calls.
+
+    The first caller for a key starts the work as a task; callers arriving
+    before it finishes await the same task and get the same result or
+    exception. A cancelled caller doesn't cancel the shared work while
+    other callers still wait on it; once the last one is cancelled the
+    work is cancelled too, since nobody will read its result.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self._stats = {"calls": 0, "shared": 0, "abandoned": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn for key, or join the call already in flight for it"""
+        self._stats["calls"] += 1
+        task = self._calls.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self._stats["shared"] += 1
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Later callers start afresh instead of joining a cancelled call
+                    if self._calls.get(key) is task:
+                        del self._calls[key]
+                    task.cancel()
+                    self._stats["abandoned"] += 1
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished call so the next one starts fresh"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Total, shared and abandoned call counts plus calls in flight"""
+        return {**self._stats, "in_flight": len(self._calls)}
+
+
+class _Call:
+    """One in-flight synchronous call and its outcome"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class ThreadSingleFlight:
+    """SingleFlight for blocking calls made from several threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats = {"calls": 0, "shared": 0}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run fn for key, or wait for the call already in flight for it"""
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._stats["shared"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Total and shared call counts plus calls currently in flight"""
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
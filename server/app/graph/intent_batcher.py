@@ -0,0 +1,158 @@
+"""
+app/graph/intent_batcher.py
+Cross-request micro-batching for LLM intent classification.
+Concurrent classification requests are collected for a short window (or
+until the batch is full) and sent as one prompt returning a JSON array.
+"""
+import asyncio
+import json
+from typing import Dict, List, Tuple, Any
+
+from langchain_core.messages import SystemMessage, HumanMessage
+
+from app.core.logging_config import ai_logger
+from app.graph.intent_model import INTENTS
+from app.graph.llm_registry import LLMRegistry
+from app.graph.prompts.templates import INTENT_BATCH_SYSTEM, INTENT_BATCH_USER
+
+
+class IntentBatchMiss(Exception):
+    """No label for this query from the batch; classify it on its own"""
+
+
+def parse_batch_labels(content: Any, count: int) -> Dict[int, str]:
+    """Labels by 1-based query number from a batched response; entries
+    that are missing or invalid are left out"""
+    if isinstance(content, str):
+        content = content.strip()
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.startswith("```"):
+            content = content[3:]
+        if content.endswith("```"):
+            content = content[:-3]
+        content = json.loads(content.strip())
+
+    labels = {}
+    for position, item in enumerate(content if isinstance(content, list) else [], start=1):
+        if isinstance(item, dict):
+            number, intent = item.get("id", position), item.get("intent")
+        else:
+            number, intent = position, item  # Bare array of labels
+        if isinstance(number, int) and 1 <= number <= count and intent in INTENTS:
+            labels.setdefault(number, intent)
+    return labels
+
+
+def format_batch_queries(queries: List[str]) -> str:
+    """Queries as a JSON array of {"id", "query"} objects, one per line, so
+    quotes and newlines in a query stay inside its own string"""
+    entries = (json.dumps({"id": number, "query": query}, ensure_ascii=False)
+               for number, query in enumerate(queries, start=1))
+    return "[\n" + ",\n".join(entries) + "\n]"
+
+
+class IntentBatcher:
+    """
+    Collects intent classification requests from concurrent graph runs.
+
+    A batch is flushed window_ms after its first request, or immediately
+    once it holds max_batch_size queries, and costs one LLM call (and one
+    rate limit slot). Identical queries are classified once. Queries the
+    response has no valid label for, and batches of a single query, raise
+    IntentBatchMiss so the caller falls back to the single-query prompt.
+    """
+
+    def __init__(self, llm_registry: LLMRegistry, window_ms: float = 10.0,
+                 max_batch_size: int = 16):
+        self.llm_registry = llm_registry
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle = None
+        self._tasks: set = set()
+        self._stats = {"requests": 0, "batches": 0, "queries": 0, "max_batch": 0, "misses": 0}
+
+    async def classify(self, query: str) -> str:
+        """Intent for one query, classified together with concurrent requests"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, future))
+        self._stats["requests"] += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Hand the pending batch to a background task"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Classify a batch and resolve each waiting future"""
+        # Callers that were cancelled while waiting don't need a label
+        queries = list(dict.fromkeys(query for query, future in batch if not future.done()))
+        if len(queries) < 2:
+            self._miss(batch)
+            return
+
+        self._stats["batches"] += 1
+        self._stats["queries"] += len(queries)
+        self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+
+        messages = [
+            SystemMessage(content=INTENT_BATCH_SYSTEM),
+            HumanMessage(content=INTENT_BATCH_USER.format(queries_json=format_batch_queries(queries)))
+        ]
+
+        try:
+            response = await self.llm_registry.ainvoke("intent_classifier", messages)
+        except Exception as e:
+            ai_logger.warning(f"Batched intent classification of {len(queries)} queries failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        try:
+            labels = parse_batch_labels(response.content, len(queries))
+        except (ValueError, TypeError) as e:
+            ai_logger.warning(f"Unparseable batched intent response, classifying individually: {e}")
+            labels = {}
+
+        by_query = {query: labels.get(number) for number, query in enumerate(queries, start=1)}
+        for query, future in batch:
+            if future.done():
+                continue
+            if by_query[query] is None:
+                self._stats["misses"] += 1
+                future.set_exception(IntentBatchMiss(query))
+            else:
+                future.set_result(by_query[query])
+
+        ai_logger.debug(f"Classified {len(batch)} requests in one batch ({len(queries)} unique, {len(queries) - len(labels)} missed)")
+
+    def _miss(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Send every waiter back to the single-query prompt"""
+        for query, future in batch:
+            if not future.done():
+                future.set_exception(IntentBatchMiss(query))
+
+    def stats(self) -> Dict[str, Any]:
+        """Request, batch and miss counts with the average batch size"""
+        stats = dict(self._stats)
+        stats["avg_batch"] = round(stats["queries"] / stats["batches"], 2) if stats["batches"] else None
+        stats["window_ms"] = self.window * 1000
+        stats["max_batch_size"] = self.max_batch_size
+        return stats
@@ -0,0 +1,211 @@
+"""
+app/graph/intent_model.py
+Local intent classifier used before the LLM classifier.
+
+A TF-IDF (word and character n-grams) logistic regression, calibrated so
+its probabilities can be thresholded. Trained on the seeded queries in
+data/intent_queries.jsonl plus queries the LLM has labelled in production
+(logged to settings.intent_log_path). Queries the model isn't confident
+about still go to the LLM.
+"""
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any
+
+import joblib
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import FeatureUnion, Pipeline
+
+from config import settings
+from app.core.logging_config import ai_logger
+
+INTENTS = ("NAVIGATION", "NEARBY_SERVICE", "UNIVERSITY_INFO", "MIXED")
+
+SERVER_DIR = Path(__file__).resolve().parents[2]
+
+
+def resolve_path(path: str) -> Path:
+    """Paths in settings are relative to the server directory"""
+    resolved = Path(path)
+    return resolved if resolved.is_absolute() else SERVER_DIR / resolved
+
+
+def build_pipeline() -> Pipeline:
+    """Untrained TF-IDF + calibrated logistic regression pipeline"""
+    features = FeatureUnion([
+        ("words", TfidfVectorizer(lowercase=True, ngram_range=(1, 2), sublinear_tf=True)),
+        ("chars", TfidfVectorizer(lowercase=True, analyzer="char_wb", ngram_range=(2, 5), sublinear_tf=True)),
+    ])
+    # Sigmoid calibration is the stable choice with a few dozen examples per class
+    classifier = CalibratedClassifierCV(
+        LogisticRegression(C=10.0, max_iter=1000), method="sigmoid", cv=3
+    )
+    return Pipeline([("features", features), ("classifier", classifier)])
+
+
+def load_examples(*paths: str) -> Tuple[List[str], List[str]]:
+    """Read (query, intent) pairs from JSONL files; missing files are skipped.
+    Later files win when the same query appears twice."""
+    examples: Dict[str, str] = {}
+    for path in paths:
+        file = resolve_path(path)
+        if not file.exists():
+            continue
+        with open(file, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if row.get("intent") in INTENTS and row.get("query", "").strip():
+                    examples[row["query"].strip().lower()] = row["intent"]
+    return list(examples), list(examples.values())
+
+
+def train(queries: List[str], labels: List[str]) -> Pipeline:
+    """Fit a new pipeline"""
+    pipeline = build_pipeline()
+    pipeline.fit(queries, labels)
+    return pipeline
+
+
+def save_model(pipeline: Pipeline, path: str, examples: int) -> Path:
+    """Write the pipeline with some training metadata"""
+    file = resolve_path(path)
+    file.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump({
+        "pipeline": pipeline,
+        "examples": examples,
+        "trained_at": datetime.now(timezone.utc).isoformat()
+    }, file)
+    return file
+
+
+class LocalIntentClassifier:
+    """
+    Calibrated local classifier in front of the LLM intent classifier.
+
+    The model is loaded from model_path by load(), which runs in a worker
+    thread (called at startup); if it hasn't been trained yet it's fitted
+    from the training data there. Until it is loaded, and whenever the top
+    probability is below threshold, predict() returns None so the caller
+    escalates to the LLM. Labelled queries are appended from worker
+    threads too, so neither training nor file I/O blocks the event loop.
+
+    Args:
+        model_path: joblib file written by scripts/train_intent_classifier.py
+        threshold: Minimum calibrated probability to skip the LLM
+        data_paths: JSONL training files used when no model file exists
+        log_path: JSONL file LLM-labelled queries are appended to (None = off)
+    """
+
+    def __init__(self, model_path: str, threshold: float,
+                 data_paths: Tuple[str, ...] = (), log_path: Optional[str] = None):
+        self.model_path = model_path
+        self.threshold = threshold
+        self.data_paths = data_paths
+        self.log_path = log_path
+        self._pipeline: Optional[Pipeline] = None
+        self._load_failed = False
+        self._lock = threading.Lock()
+        self._loading: Optional[asyncio.Task] = None
+        self._writes: set = set()
+        self._stats = {"local": 0, "escalated": 0, "logged": 0, "local_ms": 0.0}
+
+    def _load(self) -> Optional[Pipeline]:
+        """Load (or train) the pipeline once"""
+        if self._pipeline is not None or self._load_failed:
+            return self._pipeline
+        with self._lock:
+            if self._pipeline is not None or self._load_failed:
+                return self._pipeline
+            try:
+                file = resolve_path(self.model_path)
+                if file.exists():
+                    self._pipeline = joblib.load(file)["pipeline"]
+                    ai_logger.info(f"[LocalIntentClassifier] Loaded model from {file}")
+                else:
+                    queries, labels = load_examples(*self.data_paths)
+                    if len(set(labels)) < len(INTENTS):
+                        raise ValueError("no trained model and not enough training data")
+                    self._pipeline = train(queries, labels)
+                    ai_logger.info(f"[LocalIntentClassifier] Trained on {len(queries)} queries (no saved model)")
+            except Exception as e:
+                ai_logger.warning(f"[LocalIntentClassifier] Unavailable, using LLM only: {e}")
+                self._load_failed = True
+        return self._pipeline
+
+    async def load(self) -> bool:
+        """Load (or train) the pipeline in a worker thread; True once loaded"""
+        return await asyncio.to_thread(self._load) is not None
+
+    def _load_in_background(self) -> None:
+        """Start loading if nothing has yet (e.g. no startup warm-up)"""
+        if self._loading is not None or self._load_failed:
+            return
+        try:
+            self._loading = asyncio.get_running_loop().create_task(self.load())
+        except RuntimeError:
+            pass  # No event loop; load() has to be called explicitly
+
+    def predict(self, query: str) -> Optional[Tuple[str, float]]:
+        """(intent, probability) when loaded and confident enough, else None"""
+        pipeline = self._pipeline
+        if pipeline is None:
+            self._load_in_background()
+            self._stats["escalated"] += 1
+            return None
+
+        start = time.perf_counter()
+        probabilities = pipeline.predict_proba([query.strip().lower()])[0]
+        best = probabilities.argmax()
+        intent, probability = str(pipeline.classes_[best]), float(probabilities[best])
+        self._stats["local_ms"] += (time.perf_counter() - start) * 1000
+
+        if probability < self.threshold:
+            self._stats["escalated"] += 1
+            return None
+        self._stats["local"] += 1
+        return intent, probability
+
+    def log_label(self, query: str, intent: str) -> None:
+        """Record an LLM-labelled query as future training data (appended
+        from a worker thread; the caller doesn't wait for the write)"""
+        if not self.log_path or intent not in INTENTS:
+            return
+        line = json.dumps({"query": query, "intent": intent}, ensure_ascii=False)
+        try:
+            task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._append_label, line))
+        except RuntimeError:
+            self._append_label(line)  # No event loop (scripts)
+            return
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    def _append_label(self, line: str) -> None:
+        try:
+            file = resolve_path(self.log_path)
+            file.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock, open(file, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                self._stats["logged"] += 1
+        except OSError as e:
+            ai_logger.warning(f"[LocalIntentClassifier] Failed to log query: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Local vs escalated counts and mean local inference time"""
+        calls = self._stats["local"] + self._stats["escalated"]
+        return {
+            "loaded": self._pipeline is not None,
+            "threshold": self.threshold,
+            "local": self._stats["local"],
+            "escalated": self._stats["escalated"],
+            "local_rate": round(self._stats["local"] / calls, 3) if calls else None,
+            "logged": self._stats["logged"],
+            "avg_local_ms": round(self._stats["local_ms"] / calls, 3) if calls else None
+        }
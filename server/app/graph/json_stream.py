@@ -0,0 +1,96 @@
+"""
+app/graph/json_stream.py
+Incremental extraction of one string field from streamed JSON.
+
+The RAG generator answers with a JSON object; to stream the answer to the
+user the "answer" string has to be decoded while the rest of the object is
+still arriving. The full text is kept so the caller can json.loads it at
+the end for the remaining fields.
+"""
+import json
+import re
+from typing import Any
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonFieldStreamer:
+    """
+    Feed raw chunks of a JSON object; feed() returns the characters of the
+    field's string value decoded since the previous call. Escape sequences
+    split across chunks are held back until complete.
+
+    Args:
+        field: Name of a top-level string field
+    """
+
+    def __init__(self, field: str):
+        self._key = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self.text = ""  # Everything fed so far
+        self._pos = None  # Index of the next undecoded value character
+        self.done = False  # Closing quote of the value seen
+
+    def feed(self, chunk: str) -> str:
+        """Append a chunk and return newly decoded value text"""
+        self.text += chunk
+        if self.done:
+            return ""
+        if self._pos is None:
+            match = self._key.search(self.text)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        text, i, decoded = self.text, self._pos, []
+        while i < len(text):
+            char = text[i]
+            if char == '"':
+                self.done = True
+                i += 1
+                break
+            if char != "\\":
+                decoded.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(text):
+                break  # Escape continues in the next chunk
+            escape = text[i + 1]
+            if escape != "u":
+                decoded.append(_ESCAPES.get(escape, escape))
+                i += 2
+                continue
+            # \uXXXX, possibly a surrogate pair spanning two escapes
+            length = 6
+            if i + 6 <= len(text) and 0xD800 <= _hex(text[i + 2:i + 6]) < 0xDC00:
+                length = 12
+            if i + length > len(text):
+                break
+            try:
+                decoded.append(json.loads(f'"{text[i:i + length]}"'))
+            except ValueError:
+                decoded.append(text[i:i + length])
+            i += length
+
+        self._pos = i
+        return "".join(decoded)
+
+
+def _hex(value: str) -> int:
+    """Code unit of a \\u escape body, -1 if malformed"""
+    try:
+        return int(value, 16)
+    except ValueError:
+        return -1
+
+
+def chunk_text(content: Any) -> str:
+    """Text of a streamed message chunk (string or list of content blocks)"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block if isinstance(block, str) else block.get("text", "")
+            for block in content
+            if isinstance(block, str) or (isinstance(block, dict) and block.get("type", "text") == "text")
+        )
+    return ""
@@ -0,0 +1,175 @@
+"""
+app/graph/llm_registry.py
+App-scoped LangChain chat clients for the graph nodes.
+One client per MODEL_CONFIGS entry, reused across requests so HTTP/2
+connections stay pooled, with a concurrency limit per entry.
+"""
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Any, List, Optional, Type, TypeVar
+
+import httpx
+from langchain_core.messages import BaseMessage, BaseMessageChunk
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from config import settings
+from app.core.circuit_breaker import get_breaker
+from app.core.logging_config import ai_logger
+from app.graph.prompts.templates import MODEL_CONFIGS
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether a Gemini client error (or its cause) is a 429 /
+    RESOURCE_EXHAUSTED; like GeminiAIService, these aren't breaker failures"""
+    while error is not None:
+        if 429 in (getattr(error, "code", None), getattr(error, "status_code", None)):
+            return True
+        if type(error).__name__ == "ResourceExhausted" or "RESOURCE_EXHAUSTED" in str(error):
+            return True
+        error = error.__cause__
+    return False
+
+
+class LLMRegistry:
+    """
+    Shared ChatGoogleGenerativeAI clients keyed by MODEL_CONFIGS name.
+
+    Each client keeps its own HTTP/2 connection pool sized to the entry's
+    max_concurrency, and calls beyond that limit queue on a semaphore
+    instead of opening more connections. Calls go through the shared
+    Gemini circuit breaker; rate-limit errors aren't counted against it.
+    """
+
+    def __init__(self, configs: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.configs = configs or MODEL_CONFIGS
+        self.breaker = get_breaker("gemini")
+        self._clients: Dict[str, ChatGoogleGenerativeAI] = {}
+        self._structured: Dict[tuple, Runnable] = {}
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {name: 0 for name in self.configs}
+
+    def _max_concurrency(self, name: str) -> int:
+        return self.configs[name].get("max_concurrency", settings.llm_max_concurrency)
+
+    def get(self, name: str) -> ChatGoogleGenerativeAI:
+        """Client for a MODEL_CONFIGS entry, created on first use"""
+        if name not in self._clients:
+            if name not in self.configs:
+                raise KeyError(f"No model config named '{name}'")
+            config = self.configs[name]
+            connections = self._max_concurrency(name)
+            self._clients[name] = ChatGoogleGenerativeAI(
+                model=config["model"],
+                temperature=config["temperature"],
+                google_api_key=settings.ai_api_key,
+                client_args={
+                    "http2": settings.llm_http2,
+                    "limits": httpx.Limits(
+                        max_connections=connections,
+                        max_keepalive_connections=connections,
+                        keepalive_expiry=settings.llm_keepalive_seconds
+                    )
+                }
+            )
+        return self._clients[name]
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        if name not in self._limits:
+            self._limits[name] = asyncio.Semaphore(self._max_concurrency(name))
+        return self._limits[name]
+
+    async def ainvoke(self, name: str, messages: List[BaseMessage]) -> BaseMessage:
+        """Invoke a model within its concurrency limit and the Gemini breaker"""
+        llm = self.get(name)
+        async with self._semaphore(name):
+            self._in_flight[name] += 1
+            try:
+                return await self.breaker.call(lambda: llm.ainvoke(messages), ignore=is_rate_limited)
+            finally:
+                self._in_flight[name] -= 1
+
+    async def ainvoke_structured(self, name: str, messages: List[BaseMessage], schema: Type[M]) -> M:
+        """Invoke a model with a JSON-schema constrained response parsed into schema"""
+        key = (name, schema)
+        if key not in self._structured:
+            self._structured[key] = self.get(name).with_structured_output(schema)
+        runnable = self._structured[key]
+        async with self._semaphore(name):
+            self._in_flight[name] += 1
+            try:
+                return await self.breaker.call(lambda: runnable.ainvoke(messages), ignore=is_rate_limited)
+            finally:
+                self._in_flight[name] -= 1
+
+    async def astream(self, name: str, messages: List[BaseMessage]) -> AsyncIterator[BaseMessageChunk]:
+        """
+        Stream a model's response within its concurrency limit. The Gemini
+        breaker judges the call by whether and how fast the first chunk
+        arrives.
+        """
+        llm = self.get(name)
+        async with self._semaphore(name):
+            self.breaker.before_call()
+            self._in_flight[name] += 1
+            pending = True  # Admitted by the breaker, outcome not yet recorded
+            start = time.perf_counter()
+            try:
+                async for chunk in llm.astream(messages):
+                    if pending:
+                        self.breaker.record(True, (time.perf_counter() - start) * 1000)
+                        pending = False
+                    yield chunk
+                if pending:
+                    self.breaker.record(True, (time.perf_counter() - start) * 1000)
+                    pending = False
+            except Exception as e:
+                if pending and not is_rate_limited(e):
+                    self.breaker.record(False, (time.perf_counter() - start) * 1000)
+                    pending = False
+                raise
+            finally:
+                if pending:
+                    self.breaker.release()
+                self._in_flight[name] -= 1
+
+    async def warm_up(self) -> None:
+        """
+        Create every client and open its connection with a model metadata
+        lookup (no tokens generated), so first requests skip TLS setup.
+        """
+        async def warm(name: str) -> bool:
+            try:
+                await self.get(name).async_client.models.get(model=self.configs[name]["model"])
+                return True
+            except Exception as e:
+                ai_logger.warning(f"[LLMRegistry] Warm-up failed for {name}: {e}")
+                return False
+
+        warmed = await asyncio.gather(*(warm(name) for name in self.configs))
+        ai_logger.info(f"[LLMRegistry] Warmed {sum(warmed)}/{len(warmed)} model clients")
+
+    async def close(self) -> None:
+        """Close all clients and their connection pools"""
+        for llm in self._clients.values():
+            try:
+                await llm.aclose()
+            except Exception as e:
+                ai_logger.warning(f"[LLMRegistry] Failed to close client: {e}")
+        self._clients.clear()
+        self._structured.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-entry model, concurrency limit and calls in flight"""
+        return {
+            name: {
+                "model": config["model"],
+                "max_concurrency": self._max_concurrency(name),
+                "in_flight": self._in_flight[name],
+                "initialized": name in self._clients
+            }
+            for name, config in self.configs.items()
+        }
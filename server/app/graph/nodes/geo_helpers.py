@@ -4,16 +4,91 @@ Semantic location extraction and routing logic
 """
 import re
 import math
-from typing import Optional, Tuple
+import asyncio
+from typing import List, Optional, Tuple
 from app.services.interfaces import IVectorService, POI
+from app.graph.prefetch import EmbeddingPrefetch, prefetched_embedding
 from app.core.logging_config import logger
 
+# Nearby service categories with the synonyms that select them
+SERVICE_CATEGORIES = {
+    "mosque": ["mosque", "masjid", "prayer hall"],
+    "cafe": ["cafe", "cafeteria", "coffee shop"],
+    "pharmacy": ["pharmacy", "drugstore", "medicine"],
+    "restaurant": ["restaurant", "food", "dining"],
+    "hospital": ["hospital", "medical center", "emergency"],
+    "clinic": ["clinic", "health center", "medical"],
+    "bank": ["bank", "banking"],
+    "atm": ["atm", "cash machine"],
+    "salon": ["salon", "barber", "hair"],
+    "market": ["market", "shop", "store"],
+}
+
+
+def match_service_category(query: str) -> Optional[str]:
+    """First service category with a synonym in the query"""
+    query = query.lower()
+    for category, synonyms in SERVICE_CATEGORIES.items():
+        if any(synonym in query for synonym in synonyms):
+            return category
+    return None
+
+
+def parse_location_names(query: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Start and destination names to search for, from the query wording.
+    
+    Returns:
+        (start_name, end_name); start_name is None unless the query says
+        "from X to Y", and end_name falls back to the whole query
+    """
+    # Pattern 1: "from X to Y"
+    from_to = re.search(r'from\s+(.+?)\s+to\s+(.+?)(?:\?|$|\.)', query, re.IGNORECASE)
+    if from_to:
+        return from_to.group(1).strip(), from_to.group(2).strip()
+    
+    # Pattern 2: "to X", "where is X", "find X", "get to X"
+    to_patterns = [
+        r'(?:to|where\s+is|find|get\s+to|locate)\s+(?:the\s+)?(.+?)(?:\?|$|\.)',
+        r'(?:direction\s+to|navigate\s+to|go\s+to)\s+(?:the\s+)?(.+?)(?:\?|$|\.)'
+    ]
+    for pattern in to_patterns:
+        match = re.search(pattern, query, re.IGNORECASE)
+        if match:
+            location_name = match.group(1).strip()
+            # Remove "nearest" or "closest" modifiers to get core location type
+            return None, re.sub(r'^(nearest|closest|a|an|the)\s+', '', location_name, flags=re.IGNORECASE).strip()
+    
+    # Pattern 3: Generic query - search for any mentioned location
+    return None, query
+
+
+def poi_search_terms(query: str) -> List[str]:
+    """
+    Texts extract_locations_from_query will embed for POI search, when the
+    query is worded as a route or place lookup. The whole-query fallback
+    isn't returned: it is what most non-navigation queries produce, so
+    prefetching it would mostly embed queries nobody searches POIs with.
+    """
+    return [name for name in parse_location_names(query) if name and name != query]
+
+
+async def _search_poi(vector_service: IVectorService, name: str,
+                      prefetch: Optional[EmbeddingPrefetch] = None) -> Optional[POI]:
+    """Best POI match for a name, reusing a prefetched embedding if any"""
+    query_embedding = await prefetched_embedding(prefetch, name, use_poi_key=True)
+    results = await vector_service.search_pois(name, limit=1, query_embedding=query_embedding)
+    return results[0] if results else None
+
 
 async def extract_locations_from_query(
     query: str,
     vector_service: IVectorService,
     current_lat: Optional[float] = None,
-    current_lon: Optional[float] = None
+    current_lon: Optional[float] = None,
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    prefetch: Optional[EmbeddingPrefetch] = None
 ) -> Tuple[Optional[POI], Optional[POI]]:
     """
     Extract start and end locations from natural language query using semantic search.
@@ -28,30 +103,28 @@ async def extract_locations_from_query(
         vector_service: Vector service for semantic POI search
         current_lat: User's current latitude (optional)
         current_lon: User's current longitude (optional)
+        origin: Start place already extracted by the fused classifier
+        destination: Destination already extracted by the fused classifier
+        prefetch: The run's speculative embeddings (see poi_search_terms)
         
     Returns:
         Tuple of (start_poi, end_poi), either can be None
     """
     logger.info(f"[GeoHelpers] Extracting locations from: {query}")
     
-    start_poi = None
-    end_poi = None
+    if destination:
+        return await _resolve_mentions(vector_service, origin, destination, current_lat, current_lon, prefetch)
     
-    # Pattern 1: "from X to Y"
-    from_to = re.search(r'from\s+(.+?)\s+to\s+(.+?)(?:\?|$|\.)', query, re.IGNORECASE)
+    start_name, end_name = parse_location_names(query)
     
-    if from_to:
-        start_name = from_to.group(1).strip()
-        end_name = from_to.group(2).strip()
-        
+    if start_name:
         logger.info(f"[GeoHelpers] Detected route: '{start_name}' → '{end_name}'")
         
-        # Semantic search for both locations
-        start_results = await vector_service.search_pois(start_name, limit=1)
-        end_results = await vector_service.search_pois(end_name, limit=1)
-        
-        start_poi = start_results[0] if start_results else None
-        end_poi = end_results[0] if end_results else None
+        # Semantic search for both locations (concurrent, so one embedding batch)
+        start_poi, end_poi = await asyncio.gather(
+            _search_poi(vector_service, start_name, prefetch),
+            _search_poi(vector_service, end_name, prefetch)
+        )
         
         if start_poi:
             logger.info(f"[GeoHelpers] Found start: {start_poi.name} (similarity: {getattr(start_poi, 'similarity', 'N/A')})")
@@ -60,54 +133,70 @@ async def extract_locations_from_query(
             
         return start_poi, end_poi
     
-    # Pattern 2: "to X", "where is X", "find X", "get to X"
-    to_patterns = [
-        r'(?:to|where\s+is|find|get\s+to|locate)\s+(?:the\s+)?(.+?)(?:\?|$|\.)',
-        r'(?:direction\s+to|navigate\s+to|go\s+to)\s+(?:the\s+)?(.+?)(?:\?|$|\.)'
-    ]
-    
-    for pattern in to_patterns:
-        match = re.search(pattern, query, re.IGNORECASE)
-        if match:
-            location_name = match.group(1).strip()
-            
-            # Remove "nearest" or "closest" modifiers to get core location type
-            clean_location = re.sub(r'^(nearest|closest|a|an|the)\s+', '', location_name, flags=re.IGNORECASE).strip()
-            
-            logger.info(f"[GeoHelpers] Detected destination: '{location_name}' → cleaned: '{clean_location}'")
-            
-            # Semantic search for destination (use cleaned name)
-            logger.info(f"[GeoHelpers] Calling search_pois with cleaned location: '{clean_location}'")
-            results = await vector_service.search_pois(clean_location, limit=1)
-            logger.info(f"[GeoHelpers] search_pois returned {len(results)} results")
-            end_poi = results[0] if results else None
-            
-            if end_poi:
-                logger.info(f"[GeoHelpers] Found: {end_poi.name} (similarity: {getattr(end_poi, 'similarity', 'N/A')})")
-            else:
-                logger.warning(f"[GeoHelpers] No POI found for '{clean_location}'")
-            
-            # If we have current location, find nearest POI as start
-            if current_lat and current_lon and end_poi:
-                start_poi = await find_nearest_poi(
-                    vector_service, current_lat, current_lon
-                )
-                if start_poi:
-                    logger.info(f"[GeoHelpers] Nearest POI to current location: {start_poi.name}")
-            
-            return start_poi, end_poi
+    if end_name != query:
+        logger.info(f"[GeoHelpers] Detected destination: '{end_name}'")
+        
+        # Semantic search for destination (use cleaned name)
+        logger.info(f"[GeoHelpers] Calling search_pois with cleaned location: '{end_name}'")
+        end_poi = await _search_poi(vector_service, end_name, prefetch)
+        
+        if end_poi:
+            logger.info(f"[GeoHelpers] Found: {end_poi.name} (similarity: {getattr(end_poi, 'similarity', 'N/A')})")
+        else:
+            logger.warning(f"[GeoHelpers] No POI found for '{end_name}'")
+        
+        # If we have current location, find nearest POI as start
+        start_poi = None
+        if current_lat and current_lon and end_poi:
+            start_poi = await find_nearest_poi(
+                vector_service, current_lat, current_lon
+            )
+            if start_poi:
+                logger.info(f"[GeoHelpers] Nearest POI to current location: {start_poi.name}")
+        
+        return start_poi, end_poi
     
     # Pattern 3: Generic query - search for any mentioned location
     logger.info("[GeoHelpers] No specific pattern matched, searching for locations in query")
     logger.info(f"[GeoHelpers] Calling search_pois with full query: '{query}'")
-    results = await vector_service.search_pois(query, limit=1)
-    logger.info(f"[GeoHelpers] Pattern 3 search returned {len(results)} results")
-    if results:
-        end_poi = results[0]
+    end_poi = await _search_poi(vector_service, query, prefetch)
+    if end_poi:
         logger.info(f"[GeoHelpers] Found location: {end_poi.name}")
     else:
         logger.warning(f"[GeoHelpers] No location found in query: '{query}'")
     
+    return None, end_poi
+
+
+async def _resolve_mentions(
+    vector_service: IVectorService,
+    origin: Optional[str],
+    destination: Optional[str],
+    current_lat: Optional[float],
+    current_lon: Optional[float],
+    prefetch: Optional[EmbeddingPrefetch] = None
+) -> Tuple[Optional[POI], Optional[POI]]:
+    """
+    Look up extracted place mentions. Both searches run concurrently, so
+    their query embeddings go out in one micro-batched Voyage call.
+    """
+    logger.info(f"[GeoHelpers] Using extracted mentions: '{origin}' → '{destination}'")
+    
+    async def start() -> Optional[POI]:
+        if origin:
+            return await _search_poi(vector_service, origin, prefetch)
+        if current_lat and current_lon:
+            return await find_nearest_poi(vector_service, current_lat, current_lon)
+        return None
+    
+    start_poi, end_poi = await asyncio.gather(start(), _search_poi(vector_service, destination, prefetch))
+    
+    if start_poi:
+        logger.info(f"[GeoHelpers] Found start: {start_poi.name}")
+    if end_poi:
+        logger.info(f"[GeoHelpers] Found end: {end_poi.name}")
+    else:
+        logger.warning(f"[GeoHelpers] No POI found for '{destination}'")
     return start_poi, end_poi
 
 
@@ -3,6 +3,7 @@ Node 6: Geo Reasoning Node
 Handles campus navigation and nearby service discovery with semantic POI matching
 """
 import json
+import asyncio
 from typing import Dict, Any
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
@@ -14,6 +15,8 @@ from app.graph.prompts.templates import (
 )
 from app.services.interfaces import IRoutingService, IVectorService
 from app.graph.nodes.geo_helpers import (
+    SERVICE_CATEGORIES,
+    match_service_category,
     extract_locations_from_query,
     haversine_distance,
     calculate_bearing,
@@ -61,28 +64,10 @@ async def _handle_nearby_service(
         # Extract service category from query with synonym mapping
         query = state["user_query"].lower()
         
-        # Category mappings with synonyms
-        category_mappings = {
-            "mosque": ["mosque", "masjid", "prayer hall"],
-            "cafe": ["cafe", "cafeteria", "coffee shop"],
-            "pharmacy": ["pharmacy", "drugstore", "medicine"],
-            "restaurant": ["restaurant", "food", "dining"],
-            "hospital": ["hospital", "medical center", "emergency"],
-            "clinic": ["clinic", "health center", "medical"],
-            "bank": ["bank", "banking"],
-            "atm": ["atm", "cash machine"],
-            "salon": ["salon", "barber", "hair"],
-            "market": ["market", "shop", "store"],
-        }
-        
-        category = None
-        for main_category, synonyms in category_mappings.items():
-            for synonym in synonyms:
-                if synonym in query:
-                    category = main_category
-                    break
-            if category:
-                break
+        # LLM-extracted category (fused classifier), else synonym matching
+        category = state.get("service_category")
+        if category not in SERVICE_CATEGORIES:
+            category = match_service_category(query)
         
         if not category:
             # Try to detect from POI search if no keyword match
@@ -154,7 +139,10 @@ async def _handle_navigation(
             query=state["user_query"],
             vector_service=vector_service,
             current_lat=state.get("latitude"),
-            current_lon=state.get("longitude")
+            current_lon=state.get("longitude"),
+            origin=state.get("origin_mention"),
+            destination=state.get("destination_mention"),
+            prefetch=state.get("prefetch")
         )
         
         # Update reasoning stream
@@ -207,8 +195,10 @@ async def _handle_navigation(
         route_coords = None
         try:
             logger.info(f"[GeoReasoningNode] Requesting OSM route from ({start_poi.latitude}, {start_poi.longitude}) to ({end_poi.latitude}, {end_poi.longitude})")
-            # NOTE: get_route is synchronous, not async
-            osm_route = routing_service.get_route(
+            # NOTE: get_route is synchronous, not async; run it in a thread so
+            # the concurrent RAG branch (MIXED) keeps the event loop
+            osm_route = await asyncio.to_thread(
+                routing_service.get_route,
                 start_lat=start_poi.latitude,
                 start_lng=start_poi.longitude,
                 end_lat=end_poi.latitude,
@@ -3,92 +3,186 @@ Node 2: Intent Classifier Node
 Classifies user query into NAVIGATION, NEARBY_SERVICE, UNIVERSITY_INFO, or MIXED
 """
 import json
-from typing import Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Dict, Any, Optional, Tuple
 from langchain_core.messages import SystemMessage, HumanMessage
-from app.graph.state import GraphState, IntentClassification
+from app.graph.state import GraphState, IntentClassification, IntentExtraction
 from app.graph.prompts.templates import (
     INTENT_CLASSIFIER_SYSTEM,
     INTENT_CLASSIFIER_USER,
-    MODEL_CONFIGS
+    INTENT_EXTRACTOR_SYSTEM,
+    INTENT_EXTRACTOR_USER
 )
+from app.graph.nodes.geo_helpers import SERVICE_CATEGORIES
 from app.core.logging_config import logger
 from config import settings
+from app.graph.llm_registry import LLMRegistry
+from app.graph.intent_model import LocalIntentClassifier
+from app.graph.intent_batcher import IntentBatcher, IntentBatchMiss
 
+INTENT_REASONING = {
+    "NAVIGATION": "Detected navigation request inside ASTU campus",
+    "NEARBY_SERVICE": "Detected nearby service discovery request",
+    "UNIVERSITY_INFO": "Searching ASTU knowledge base",
+    "MIXED": "Detected combined navigation and information request"
+}
 
-async def intent_classifier_node(state: GraphState) -> Dict[str, Any]:
+
+# Prefetched embeddings each intent's branch searches with
+INTENT_PREFETCH = {
+    "NAVIGATION": (True,),
+    "NEARBY_SERVICE": (),  # Searched by service category, not by embedding
+    "UNIVERSITY_INFO": (False,),
+    "MIXED": (True, False)
+}
+
+
+def _cancel_unneeded_prefetch(state: GraphState, intent: str,
+                              mentions: Optional[Tuple[str, ...]] = None) -> None:
+    """Cancel the speculative embeddings the intent's branch won't use,
+    before they reach the embedding batcher where possible"""
+    prefetch = state.get("prefetch")
+    if prefetch is None:
+        return
+    for use_poi_key in (True, False):
+        if use_poi_key not in INTENT_PREFETCH[intent]:
+            prefetch.cancel(use_poi_key)
+    if mentions is not None:
+        # Geo reasoning searches the extracted mentions, not the parsed names
+        prefetch.cancel(True, keep=mentions)
+
+
+def _classified(state: GraphState, intent: str, source: str) -> Dict[str, Any]:
+    """State update for a classified intent"""
+    _cancel_unneeded_prefetch(state, intent)
+    reasoning_stream = state.get("reasoning_stream", [])
+    reasoning_stream.append(INTENT_REASONING[intent])
+    return {
+        "intent": intent,
+        "confidence": "high",
+        "intent_source": source,
+        "reasoning_stream": reasoning_stream
+    }
+
+
+async def _classify_and_extract(state: GraphState, llm_registry: LLMRegistry) -> IntentExtraction:
+    """One structured-output call for intent, place mentions and service category"""
+    messages = [
+        SystemMessage(content=INTENT_EXTRACTOR_SYSTEM.format(
+            service_categories=", ".join(SERVICE_CATEGORIES)
+        )),
+        HumanMessage(content=INTENT_EXTRACTOR_USER.format(user_query=state["user_query"]))
+    ]
+    extraction = await llm_registry.ainvoke_structured("intent_classifier", messages, IntentExtraction)
+    if extraction is None:
+        raise ValueError("empty structured response")
+    return extraction
+
+
+async def _classify_single(state: GraphState, llm_registry: LLMRegistry) -> str:
+    """Classify one query with its own prompt"""
+    # Prepare messages
+    user_prompt = INTENT_CLASSIFIER_USER.format(user_query=state["user_query"])
+    messages = [
+        SystemMessage(content=INTENT_CLASSIFIER_SYSTEM),
+        HumanMessage(content=user_prompt)
+    ]
+    
+    # Get classification
+    # Temperature 0.0 client for deterministic classification; fails fast
+    # into the node's fallback while the Gemini breaker is open
+    response = await llm_registry.ainvoke("intent_classifier", messages)
+    content = response.content
+    
+    # Parse JSON response
+    if isinstance(content, str):
+        # Remove markdown code blocks if present
+        content = content.strip()
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.startswith("```"):
+            content = content[3:]
+        if content.endswith("```"):
+            content = content[:-3]
+        content = content.strip()
+        
+        result = json.loads(content)
+    else:
+        result = content
+    
+    # Validate with Pydantic
+    return IntentClassification(**result).intent
+
+
+async def intent_classifier_node(state: GraphState, llm_registry: LLMRegistry,
+                                 intent_model: Optional[LocalIntentClassifier] = None,
+                                 intent_batcher: Optional[IntentBatcher] = None) -> Dict[str, Any]:
     """
     Classify user query into a single intent
     
     Args:
         state: Current graph state
+        llm_registry: Shared LLM clients
+        intent_model: Local classifier; confident predictions skip the LLM
+        intent_batcher: Batches LLM classifications across concurrent requests
         
     Returns:
         Updated state with intent classification
     """
     logger.info("[IntentClassifierNode] Classifying user intent...")
     
-    # Initialize LLM with temperature 0.0 for deterministic classification
-    llm = ChatGoogleGenerativeAI(
-        model=MODEL_CONFIGS["intent_classifier"]["model"],
-        temperature=MODEL_CONFIGS["intent_classifier"]["temperature"],
-        google_api_key=settings.ai_api_key
-    )
+    # Fast path: calibrated local model, escalating to the LLM below threshold
+    if intent_model is not None:
+        prediction = intent_model.predict(state["user_query"])
+        if prediction is not None:
+            intent, probability = prediction
+            logger.info(f"[IntentClassifierNode] Classified locally as: {intent} (p={probability:.2f})")
+            return _classified(state, intent, "local")
     
-    # Prepare messages
-    user_prompt = INTENT_CLASSIFIER_USER.format(user_query=state["user_query"])
-    messages = [
-        SystemMessage(content=INTENT_CLASSIFIER_SYSTEM),
-        HumanMessage(content=user_prompt)
-    ]
+    # Fused mode: the same round-trip also extracts what geo reasoning needs
+    if settings.intent_fused_extraction:
+        try:
+            extraction = await _classify_and_extract(state, llm_registry)
+            logger.info(
+                f"[IntentClassifierNode] Classified as: {extraction.intent} "
+                f"(origin={extraction.origin!r}, destination={extraction.destination!r}, "
+                f"service={extraction.service_category!r})"
+            )
+            if intent_model is not None:
+                intent_model.log_label(state["user_query"], extraction.intent)
+            if extraction.destination:
+                _cancel_unneeded_prefetch(state, extraction.intent,
+                                          tuple(m for m in (extraction.origin, extraction.destination) if m))
+            return {
+                **_classified(state, extraction.intent, "llm"),
+                "origin_mention": extraction.origin,
+                "destination_mention": extraction.destination,
+                "service_category": extraction.service_category
+            }
+        except Exception as e:
+            logger.warning(f"[IntentClassifierNode] Fused extraction failed, classifying only: {e}")
     
     try:
-        # Get classification
-        response = await llm.ainvoke(messages)
-        content = response.content
-        
-        # Parse JSON response
-        if isinstance(content, str):
-            # Remove markdown code blocks if present
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-            
-            result = json.loads(content)
-        else:
-            result = content
+        intent = None
+        if intent_batcher is not None:
+            try:
+                intent = await intent_batcher.classify(state["user_query"])
+            except IntentBatchMiss:
+                pass  # Not labelled in the batch; use the single-query prompt
         
-        # Validate with Pydantic
-        classification = IntentClassification(**result)
-        intent = classification.intent
+        if intent is None:
+            intent = await _classify_single(state, llm_registry)
         
         logger.info(f"[IntentClassifierNode] Classified as: {intent}")
         
-        # Update reasoning stream
-        reasoning_stream = state.get("reasoning_stream", [])
-        if intent == "NAVIGATION":
-            reasoning_stream.append("Detected navigation request inside ASTU campus")
-        elif intent == "NEARBY_SERVICE":
-            reasoning_stream.append("Detected nearby service discovery request")
-        elif intent == "UNIVERSITY_INFO":
-            reasoning_stream.append("Searching ASTU knowledge base")
-        elif intent == "MIXED":
-            reasoning_stream.append("Detected combined navigation and information request")
+        if intent_model is not None:
+            intent_model.log_label(state["user_query"], intent)
         
-        return {
-            "intent": intent,
-            "confidence": "high",
-            "reasoning_stream": reasoning_stream
-        }
+        return _classified(state, intent, "llm")
         
     except Exception as e:
         logger.error(f"[IntentClassifierNode] Error: {e}")
         # Default to UNIVERSITY_INFO on error
+        _cancel_unneeded_prefetch(state, "UNIVERSITY_INFO")
         return {
             "intent": "UNIVERSITY_INFO",
             "confidence": "low",
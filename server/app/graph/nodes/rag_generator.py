@@ -3,26 +3,72 @@ Node 5: RAG Generator Node
 Generates grounded answers using only retrieved documents
 """
 import json
-from typing import Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Dict, Any, List, Optional
 from langchain_core.messages import SystemMessage, HumanMessage
+from langgraph.config import get_stream_writer
 from app.graph.state import GraphState, RAGResponse
 from app.graph.prompts.templates import (
     RAG_SYSTEM_PROMPT,
     RAG_USER_PROMPT,
-    RAG_NO_ANSWER,
-    MODEL_CONFIGS
+    RAG_NO_ANSWER
 )
 from app.core.logging_config import logger
-from config import settings
+from app.graph.llm_registry import LLMRegistry
+from app.graph.json_stream import JsonFieldStreamer, chunk_text
+from app.graph.prefetch import prefetched_embedding
+from app.services.answer_cache import SemanticAnswerCache
 
 
-async def rag_generator_node(state: GraphState) -> Dict[str, Any]:
+def _token_writer():
+    """Custom stream writer of the running graph (None outside a graph run)"""
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return None
+
+
+def _parse_rag_response(content: Any) -> RAGResponse:
+    """Validate the generator's JSON answer"""
+    # Parse JSON response
+    if isinstance(content, str):
+        content = content.strip()
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.startswith("```"):
+            content = content[3:]
+        if content.endswith("```"):
+            content = content[:-3]
+        content = content.strip()
+        
+        result = json.loads(content)
+    else:
+        result = content
+    
+    # Validate with Pydantic
+    return RAGResponse(**result)
+
+
+def _cited_documents(documents: List[Dict[str, Any]], sources_used: List[str]) -> List[Dict[str, Any]]:
+    """Retrieved documents the answer cites (all of them if it cites none)"""
+    cited = [doc for doc in documents if doc["source_id"] in sources_used]
+    return cited or documents
+
+
+async def _regenerate(llm_registry: LLMRegistry, messages: List) -> str:
+    """Fresh answer text, for auditing an answer cache hit"""
+    response = await llm_registry.ainvoke("rag_generator", messages)
+    return _parse_rag_response(chunk_text(response.content)).answer
+
+
+async def rag_generator_node(state: GraphState, llm_registry: LLMRegistry,
+                             answer_cache: Optional[SemanticAnswerCache] = None) -> Dict[str, Any]:
     """
     Generate grounded answer using only retrieved documents
     
     Args:
         state: Current graph state
+        llm_registry: Shared LLM clients
+        answer_cache: Reuses answers to earlier, similar UNIVERSITY_INFO questions
         
     Returns:
         Updated state with RAG answer
@@ -41,13 +87,6 @@ async def rag_generator_node(state: GraphState) -> Dict[str, Any]:
             "reasoning_stream": state.get("reasoning_stream", []) + ["Unable to provide verified answer"]
         }
     
-    # Initialize LLM with low temperature for accuracy
-    llm = ChatGoogleGenerativeAI(
-        model=MODEL_CONFIGS["rag_generator"]["model"],
-        temperature=MODEL_CONFIGS["rag_generator"]["temperature"],
-        google_api_key=settings.ai_api_key
-    )
-    
     # Format retrieved documents
     docs_text = "\n\n".join([
         f"[{doc['source_id']}] {doc['content']}"
@@ -64,31 +103,54 @@ async def rag_generator_node(state: GraphState) -> Dict[str, Any]:
         HumanMessage(content=user_prompt)
     ]
     
+    # Semantic answer cache; MIXED questions also ask for directions, so
+    # only UNIVERSITY_INFO answers are reused
+    embedding = None
+    if answer_cache is not None and state.get("intent") == "UNIVERSITY_INFO":
+        try:
+            embedding = (await prefetched_embedding(state.get("prefetch"), state["user_query"])
+                         or await answer_cache.embed(state["user_query"]))
+            entry = answer_cache.lookup("graph", embedding, retrieved_documents)
+        except Exception as e:
+            logger.warning(f"[RAG_GeneratorNode] Answer cache lookup failed: {e}")
+            embedding, entry = None, None
+        
+        if entry is not None:
+            logger.info(f"[RAG_GeneratorNode] Reusing answer to {entry.question!r} (similarity {entry.similarity:.3f})")
+            answer_cache.audit(state["user_query"], entry, lambda: _regenerate(llm_registry, messages),
+                               entry.answer["rag_answer"])
+            writer = _token_writer()
+            if writer is not None:
+                writer({"type": "token", "content": entry.answer["rag_answer"]})
+            reasoning_stream = state.get("reasoning_stream", [])
+            reasoning_stream.append("Reused a verified answer to a similar question")
+            # Cited sources renumbered to where they were retrieved this time
+            sources = [doc["source_id"] for doc in retrieved_documents
+                       if doc["metadata"]["id"] in entry.versions] if entry.answer["rag_sources"] else []
+            return {**entry.answer, "rag_sources": sources, "reasoning_stream": reasoning_stream}
+    
     try:
         # Generate answer
-        response = await llm.ainvoke(messages)
-        content = response.content
-        
-        # Parse JSON response
-        if isinstance(content, str):
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-            
-            result = json.loads(content)
-        else:
-            result = content
-        
-        # Validate with Pydantic
-        rag_response = RAGResponse(**result)
+        # Low-temperature client for accuracy; fails fast into the fallback
+        # below while the Gemini breaker is open. The answer field is decoded
+        # as it streams and sent to stream_execute as token events.
+        writer = _token_writer()
+        streamer = JsonFieldStreamer("answer")
+        async for chunk in llm_registry.astream("rag_generator", messages):
+            token = streamer.feed(chunk_text(chunk.content))
+            if token and writer is not None:
+                writer({"type": "token", "content": token})
+        rag_response = _parse_rag_response(streamer.text)
         
         logger.info(f"[RAG_GeneratorNode] Generated answer with {rag_response.confidence} confidence")
         
+        if embedding is not None and rag_response.confidence != "low":
+            answer_cache.store("graph", state["user_query"], embedding, {
+                "rag_answer": rag_response.answer,
+                "rag_sources": rag_response.sources_used,
+                "rag_confidence": rag_response.confidence
+            }, _cited_documents(retrieved_documents, rag_response.sources_used))
+        
         reasoning_stream = state.get("reasoning_stream", [])
         reasoning_stream.append("Generated answer from verified ASTU sources")
         
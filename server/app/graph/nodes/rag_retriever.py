@@ -5,6 +5,7 @@ Retrieves verified ASTU knowledge from vector database
 from typing import Dict, Any
 from app.graph.state import GraphState
 from app.services.interfaces import IVectorService
+from app.graph.prefetch import prefetched_embedding
 from app.core.logging_config import logger
 
 
@@ -24,11 +25,13 @@ async def rag_retriever_node(state: GraphState, vector_service: IVectorService)
     user_query = state["user_query"]
     
     try:
-        # Semantic search for relevant documents
-        results = await vector_service.search(
-            query=user_query,
-            top_k=5,
-            threshold=0.7
+        # Semantic search for relevant documents, reusing the query embedding
+        # prefetched during intent classification when there is one
+        query_embedding = await prefetched_embedding(state.get("prefetch"), user_query)
+        results = await vector_service.search_documents(
+            user_query,
+            limit=5,
+            query_embedding=query_embedding
         )
         
         if not results:
@@ -43,9 +46,8 @@ async def rag_retriever_node(state: GraphState, vector_service: IVectorService)
         for idx, result in enumerate(results, 1):
             documents.append({
                 "source_id": f"source_{idx}",
-                "content": result.get("content", ""),
-                "metadata": result.get("metadata", {}),
-                "similarity": result.get("similarity", 0.0)
+                "content": result.content,
+                "metadata": {"id": result.id, "title": result.title, "source": result.source, "tags": result.tags}
             })
         
         logger.info(f"[RAG_RetrieverNode] Retrieved {len(documents)} documents")
@@ -2,12 +2,12 @@
 Node 3: Routing Decision Node
 Decides which pipeline to execute based on intent
 """
-from typing import Literal
+from typing import Literal, List, Union
 from app.graph.state import GraphState
 from app.core.logging_config import logger
 
 
-def routing_decision_node(state: GraphState) -> Literal["geo", "rag", "both"]:
+def routing_decision_node(state: GraphState) -> Union[Literal["geo", "rag"], List[str]]:
     """
     Decide which pipeline(s) to run based on classified intent
     
@@ -19,7 +19,7 @@ def routing_decision_node(state: GraphState) -> Literal["geo", "rag", "both"]:
     Returns:
         "geo" for geospatial pipeline
         "rag" for RAG pipeline
-        "both" for mixed queries
+        ["rag_parallel", "geo"] for mixed queries (both pipelines run concurrently)
     """
     intent = state.get("intent", "UNIVERSITY_INFO")
     
@@ -35,8 +35,8 @@ def routing_decision_node(state: GraphState) -> Literal["geo", "rag", "both"]:
         logger.info("[RoutingDecisionNode] Routing to RAG pipeline")
         return "rag"
     elif intent == "MIXED":
-        logger.info("[RoutingDecisionNode] Routing to BOTH pipelines")
-        return "both"
+        logger.info("[RoutingDecisionNode] Routing to BOTH pipelines in parallel")
+        return ["rag_parallel", "geo"]
     else:
         # Default to RAG
         logger.warning(f"[RoutingDecisionNode] Unknown intent: {intent}, defaulting to RAG")
@@ -0,0 +1,102 @@
+"""
+app/graph/prefetch.py
+Speculative query embeddings for one graph run.
+
+The document and POI embeddings a request will probably need are started
+when the run starts, so they overlap intent classification instead of
+following it. Once the intent is known the branch it doesn't need is
+cancelled; nodes take the embedding from here when it matches their
+search text, and whatever is never claimed is cancelled when the run ends.
+"""
+import asyncio
+from typing import Dict, List, Optional, Tuple, Any
+
+from app.services.interfaces import IAIService
+from app.core.logging_config import ai_logger
+
+# Process-wide counters for /metrics
+_stats = {"started": 0, "used": 0, "unused": 0, "cancelled": 0, "failed": 0}
+
+
+class EmbeddingPrefetch:
+    """
+    Request-scoped embedding futures keyed by (text, key type).
+
+    Args:
+        ai_service: Service whose generate_embedding runs the prefetches
+    """
+
+    def __init__(self, ai_service: IAIService):
+        self.ai = ai_service
+        self._tasks: Dict[Tuple[str, bool], asyncio.Task] = {}
+        self._claimed: set = set()
+
+    def start(self, text: str, use_poi_key: bool = False) -> None:
+        """Begin embedding text in the background"""
+        key = (text, use_poi_key)
+        if text and key not in self._tasks:
+            self._tasks[key] = asyncio.ensure_future(self.ai.generate_embedding(text, use_poi_key=use_poi_key))
+            _stats["started"] += 1
+
+    async def get(self, text: str, use_poi_key: bool = False) -> Optional[List[float]]:
+        """Prefetched embedding for text, or None if it wasn't prefetched
+        or failed (the caller then embeds as usual)"""
+        key = (text, use_poi_key)
+        task = self._tasks.get(key)
+        if task is None:
+            return None
+        if key not in self._claimed:
+            self._claimed.add(key)
+            _stats["used"] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _stats["failed"] += 1
+            ai_logger.debug(f"Prefetched embedding failed, embedding on demand: {e}")
+            return None
+
+    def _drop(self, key: Tuple[str, bool]) -> None:
+        """Forget an unclaimed prefetch, cancelling it if still running"""
+        task = self._tasks.pop(key)
+        _stats["unused"] += 1
+        if not task.done():
+            task.cancel()
+            _stats["cancelled"] += 1
+        elif not task.cancelled():
+            task.exception()  # Mark retrieved; nobody awaited it
+
+    def cancel(self, use_poi_key: bool, keep: Tuple[str, ...] = ()) -> None:
+        """
+        Cancel the unclaimed prefetches of one key type (the classified
+        intent won't search with them).
+
+        Args:
+            use_poi_key: True for the POI branch, False for documents
+            keep: Texts of that key type that will still be searched
+        """
+        for key in list(self._tasks):
+            if key[1] == use_poi_key and key[0] not in keep and key not in self._claimed:
+                self._drop(key)
+
+    def cancel_unused(self) -> None:
+        """Cancel prefetches no node claimed (the run is over)"""
+        for key in list(self._tasks):
+            if key not in self._claimed:
+                self._drop(key)
+        self._tasks.clear()
+
+
+async def prefetched_embedding(prefetch: Optional[EmbeddingPrefetch], text: str,
+                               use_poi_key: bool = False) -> Optional[List[float]]:
+    """Embedding from the run's prefetch, if there is one for text"""
+    if prefetch is None:
+        return None
+    return await prefetch.get(text, use_poi_key)
+
+
+def prefetch_stats() -> Dict[str, Any]:
+    """Started, used and unused (cancelled while in flight) prefetch counts"""
+    started = _stats["started"]
+    return {**_stats, "use_rate": round(_stats["used"] / started, 3) if started else None}
@@ -0,0 +1,212 @@
+"""
+app/graph/response_cache.py
+Whole-workflow response cache for AstuRouteGraph.
+
+Answers are keyed on the normalized query plus the inputs the answer
+actually depends on: UNIVERSITY_INFO answers only on the query, geo and
+MIXED answers also on mode, urgency and the geohash cell of the user
+location. Each entry records the generation of the admin-managed data it
+was built from (POIs, documents); an admin write starts a new generation,
+which turns every dependent entry into a miss.
+"""
+import asyncio
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+from app.services.interfaces import ICacheService
+from app.services.embedding_cache import normalize_text
+from app.core.logging_config import ai_logger
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Request inputs besides the query that go into each intent's key
+INTENT_INPUTS = {
+    "NAVIGATION": ("mode", "urgency", "cell"),
+    "NEARBY_SERVICE": ("mode", "urgency", "cell"),
+    "UNIVERSITY_INFO": (),
+    "MIXED": ("mode", "urgency", "cell"),
+}
+
+# Admin-managed data each intent's answer is built from
+INTENT_SOURCES = {
+    "NAVIGATION": ("pois",),
+    "NEARBY_SERVICE": ("pois",),
+    "UNIVERSITY_INFO": ("documents",),
+    "MIXED": ("pois", "documents"),
+}
+
+# Final state fields kept in an entry (what execute callers and the SSE
+# answer/route events read)
+CACHED_FIELDS = (
+    "final_answer", "intent", "confidence", "sources_used", "reasoning_stream",
+    "start_coordinates", "end_coordinates", "distance_estimate", "route_coords",
+    "route_summary", "rag_confidence", "geo_confidence"
+)
+
+GENERATION_TTL = 30 * 86400  # Outlives any entry, so a lost token can't revive old entries
+
+
+def geohash(latitude: float, longitude: float, precision: int = 7) -> str:
+    """Geohash cell of a point (precision 7 is roughly 150 m across)"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    cell, bits, value, even = [], 0, 0, True
+    while len(cell) < precision:
+        span, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (span[0] + span[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            span[0] = mid
+        else:
+            span[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            cell.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(cell)
+
+
+def response_cache_keys(user_input: Dict[str, Any], precision: int = 7) -> Tuple[str, str]:
+    """(query-only key, key with mode, urgency and location cell)"""
+    query = normalize_text(user_input.get("user_query") or "")
+    latitude, longitude = user_input.get("latitude"), user_input.get("longitude")
+    cell = geohash(latitude, longitude, precision) if latitude is not None and longitude is not None else "-"
+    inputs = "|".join((query, user_input.get("mode") or "walking", user_input.get("urgency") or "normal", cell))
+    return (
+        "response:query:" + hashlib.sha256(query.encode("utf-8")).hexdigest(),
+        "response:input:" + hashlib.sha256(inputs.encode("utf-8")).hexdigest()
+    )
+
+
+class ResponseCache:
+    """
+    Cache of final workflow states with per-intent TTLs.
+
+    Entries live in the shared ICacheService (Redis) when one is given, so
+    every worker sees them and sees the same invalidations; otherwise in a
+    bounded in-process LRU, with generations that only this process sees.
+    That is only correct with a single worker, so the container doesn't
+    create a cache without Redis when WEB_CONCURRENCY > 1.
+
+    Args:
+        backend: Shared cache, or None for the in-process LRU
+        ttls: Seconds to keep answers per intent (0 or missing = don't cache)
+        max_entries: LRU size when there is no backend
+        geohash_precision: Geohash length the user location is quantized to
+    """
+
+    def __init__(self, backend: Optional[ICacheService], ttls: Dict[str, int],
+                 max_entries: int = 1024, geohash_precision: int = 7):
+        self.backend = backend
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.precision = geohash_precision
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._generations: Dict[str, str] = {}
+        self._stats = {"lookups": 0, "hits": 0, "misses": 0, "stale": 0,
+                       "stores": 0, "skipped": 0, "invalidations": 0}
+        self._intent_hits: Dict[str, int] = {}
+
+    async def _read(self, key: str) -> Optional[Any]:
+        if self.backend is not None:
+            return await self.backend.get(key)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def _write(self, key: str, value: Any, ttl: int) -> None:
+        if self.backend is not None:
+            await self.backend.set(key, value, ttl)
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _generation(self, source: str) -> str:
+        """Current generation token of a data source, created on first use"""
+        if self.backend is None:
+            return self._generations.setdefault(source, uuid.uuid4().hex)
+        key = f"response:generation:{source}"
+        token = await self.backend.get(key)
+        if not token:
+            token = uuid.uuid4().hex
+            await self.backend.set(key, token, GENERATION_TTL)
+        return token
+
+    async def generations(self) -> Dict[str, str]:
+        """Generation tokens of every source; read before a run so an entry
+        built while an admin write lands is already stale when stored"""
+        sources = ("pois", "documents")
+        tokens = await asyncio.gather(*(self._generation(source) for source in sources))
+        return dict(zip(sources, tokens))
+
+    async def get(self, user_input: Dict[str, Any],
+                  generations: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Cached final state for the request, or None"""
+        self._stats["lookups"] += 1
+        keys = response_cache_keys(user_input, self.precision)
+        for entry in await asyncio.gather(*(self._read(key) for key in keys)):
+            if not entry:
+                continue
+            if entry["expires_at"] <= time.time():
+                continue
+            if any(generations.get(source) != token for source, token in entry["generations"].items()):
+                self._stats["stale"] += 1
+                continue
+            self._stats["hits"] += 1
+            intent = entry["result"].get("intent")
+            self._intent_hits[intent] = self._intent_hits.get(intent, 0) + 1
+            return dict(entry["result"])
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, user_input: Dict[str, Any], result: Dict[str, Any],
+                  generations: Dict[str, str]) -> bool:
+        """Store a final state; errors and fallback classifications aren't cached"""
+        intent = result.get("intent")
+        ttl = self.ttls.get(intent, 0)
+        if ttl <= 0 or not result.get("final_answer") or result.get("error") or result.get("confidence") == "low":
+            self._stats["skipped"] += 1
+            return False
+
+        query_key, input_key = response_cache_keys(user_input, self.precision)
+        entry = {
+            "result": {field: result.get(field) for field in CACHED_FIELDS},
+            "generations": {source: generations.get(source) for source in INTENT_SOURCES[intent]},
+            "expires_at": time.time() + ttl
+        }
+        await self._write(input_key if INTENT_INPUTS[intent] else query_key, entry, ttl)
+        self._stats["stores"] += 1
+        return True
+
+    async def invalidate(self, *sources: str) -> None:
+        """Start a new generation of the given sources ("pois", "documents"),
+        so entries built from the old data miss"""
+        for source in sources:
+            token = uuid.uuid4().hex
+            if self.backend is None:
+                self._generations[source] = token
+            elif not await self.backend.set(f"response:generation:{source}", token, GENERATION_TTL):
+                ai_logger.error(f"Response cache invalidation of {source} failed; cached answers may be stale")
+                continue
+            self._stats["invalidations"] += 1
+            ai_logger.info(f"Response cache invalidated for {source} changes")
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup, hit and invalidation counts with the hit rate per intent"""
+        stats = dict(self._stats)
+        lookups = stats["lookups"]
+        return {
+            **stats,
+            "hit_rate": round(stats["hits"] / lookups, 4) if lookups else None,
+            "hits_by_intent": dict(self._intent_hits),
+            "size": len(self._entries) if self.backend is None else None,
+            "backend": type(self.backend).__name__ if self.backend is not None else None
+        }
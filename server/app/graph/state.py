@@ -1,10 +1,29 @@
 """
 State schema for ASTU Route AI LangGraph workflow
 """
-from typing import TypedDict, List, Dict, Optional, Literal, Any
+from typing import TypedDict, List, Dict, Optional, Literal, Any, Annotated
 from pydantic import BaseModel
 
 
+def merge_reasoning(current: Optional[List[str]], update: Optional[List[str]]) -> List[str]:
+    """
+    Reducer for reasoning_stream. Nodes return the whole stream with their
+    steps appended, and parallel branches (MIXED) each return their own
+    copy; new steps from every branch are kept in order.
+    """
+    current = list(current or [])
+    if not update:
+        return current
+    if update[:len(current)] == current:
+        return current + list(update[len(current):])
+    return current + [step for step in update if step not in current]
+
+
+def keep_latest(current: Optional[str], update: Optional[str]) -> Optional[str]:
+    """Reducer letting parallel branches both report an error"""
+    return update if update is not None else current
+
+
 class GraphState(TypedDict):
     """State that flows through the LangGraph workflow"""
     
@@ -18,6 +37,9 @@ class GraphState(TypedDict):
     # Intent classification
     intent: Optional[Literal["NAVIGATION", "NEARBY_SERVICE", "UNIVERSITY_INFO", "MIXED"]]
     confidence: Optional[str]
+    intent_source: Optional[Literal["local", "llm"]]
+    origin_mention: Optional[str]  # Place names extracted by the fused classifier
+    destination_mention: Optional[str]
     
     # RAG pipeline
     retrieved_documents: Optional[List[Dict[str, Any]]]
@@ -41,11 +63,14 @@ class GraphState(TypedDict):
     
     # Response composition
     final_answer: Optional[str]
-    reasoning_stream: Optional[List[str]]
+    reasoning_stream: Annotated[Optional[List[str]], merge_reasoning]
     sources_used: Optional[List[str]]
     
+    # Request-scoped speculative query embeddings (app.graph.prefetch)
+    prefetch: Optional[Any]
+    
     # Error handling
-    error: Optional[str]
+    error: Annotated[Optional[str], keep_latest]
 
 
 class IntentClassification(BaseModel):
@@ -53,6 +78,14 @@ class IntentClassification(BaseModel):
     intent: Literal["NAVIGATION", "NEARBY_SERVICE", "UNIVERSITY_INFO", "MIXED"]
 
 
+class IntentExtraction(BaseModel):
+    """Fused intent classification and entity extraction response"""
+    intent: Literal["NAVIGATION", "NEARBY_SERVICE", "UNIVERSITY_INFO", "MIXED"]
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    service_category: Optional[str] = None
+
+
 class RAGResponse(BaseModel):
     """RAG generation response"""
     answer: str
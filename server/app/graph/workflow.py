@@ -2,9 +2,9 @@
 ASTU Route AI LangGraph Workflow
 Orchestrates the 7-node intelligent routing system
 """
-from typing import Dict, Any, AsyncGenerator
+from typing import Dict, Any, AsyncGenerator, Optional, List
 from langgraph.graph import StateGraph, END
-from app.graph.state import GraphState
+from app.graph.state import GraphState, merge_reasoning
 from app.graph.nodes.user_input import user_input_node
 from app.graph.nodes.intent_classifier import intent_classifier_node
 from app.graph.nodes.routing_decision import routing_decision_node
@@ -12,7 +12,15 @@ from app.graph.nodes.rag_retriever import rag_retriever_node
 from app.graph.nodes.rag_generator import rag_generator_node
 from app.graph.nodes.geo_reasoning import geo_reasoning_node
 from app.graph.nodes.response_composer import response_composer_node
-from app.services.interfaces import IVectorService, IRoutingService
+from app.services.interfaces import IVectorService, IRoutingService, IAIService
+from app.graph.llm_registry import LLMRegistry
+from app.graph.intent_model import LocalIntentClassifier
+from app.graph.intent_batcher import IntentBatcher
+from app.graph.prefetch import EmbeddingPrefetch
+from app.graph.response_cache import ResponseCache
+from app.services.answer_cache import SemanticAnswerCache
+from app.graph.nodes.geo_helpers import poi_search_terms
+from config import settings
 from app.core.logging_config import logger
 
 
@@ -30,16 +38,33 @@ class AstuRouteGraph:
     7. ResponseComposerNode - Final output
     """
     
-    def __init__(self, vector_service: IVectorService, routing_service: IRoutingService):
+    def __init__(self, vector_service: IVectorService, routing_service: IRoutingService,
+                 llm_registry: LLMRegistry, intent_model: Optional[LocalIntentClassifier] = None,
+                 intent_batcher: Optional[IntentBatcher] = None,
+                 ai_service: Optional[IAIService] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 answer_cache: Optional[SemanticAnswerCache] = None):
         """
         Initialize the workflow graph
         
         Args:
             vector_service: Vector search service for RAG
             routing_service: Routing service for geospatial queries
+            llm_registry: Shared LLM clients for the classifier and generator
+            intent_model: Optional local classifier tried before the LLM one
+            intent_batcher: Optional cross-request batcher for LLM classification
+            ai_service: AI service for speculative query embeddings (None = off)
+            response_cache: Optional cache of final answers for repeated queries
+            answer_cache: Optional semantic cache of RAG answers for paraphrased questions
         """
         self.vector_service = vector_service
         self.routing_service = routing_service
+        self.llm_registry = llm_registry
+        self.intent_model = intent_model
+        self.intent_batcher = intent_batcher
+        self.ai_service = ai_service
+        self.response_cache = response_cache
+        self.answer_cache = answer_cache
         self.graph = self._build_graph()
         logger.info("[AstuRouteGraph] Workflow initialized")
     
@@ -50,17 +75,33 @@ class AstuRouteGraph:
         workflow = StateGraph(GraphState)
         
         # Wrapper functions for async nodes
+        async def intent_classifier_wrapper(state):
+            return await intent_classifier_node(
+                state, self.llm_registry, self.intent_model, self.intent_batcher
+            )
+        
+        async def rag_generator_wrapper(state):
+            return await rag_generator_node(state, self.llm_registry, self.answer_cache)
+        
         async def rag_retriever_wrapper(state):
             return await rag_retriever_node(state, self.vector_service)
 
+        async def rag_branch_wrapper(state):
+            # MIXED: retrieval and generation in one node, so the RAG branch
+            # doesn't wait at a step boundary for geo reasoning to finish
+            retrieved = await rag_retriever_node(state, self.vector_service)
+            generated = await rag_generator_node({**state, **retrieved}, self.llm_registry, self.answer_cache)
+            return {**retrieved, **generated}
+
         async def geo_reasoning_wrapper(state):
             return await geo_reasoning_node(state, self.routing_service, self.vector_service)
         
         # Add nodes
         workflow.add_node("user_input", user_input_node)
-        workflow.add_node("intent_classifier", intent_classifier_node)
+        workflow.add_node("intent_classifier", intent_classifier_wrapper)
         workflow.add_node("rag_retriever", rag_retriever_wrapper)
-        workflow.add_node("rag_generator", rag_generator_node)
+        workflow.add_node("rag_generator", rag_generator_wrapper)
+        workflow.add_node("rag_branch", rag_branch_wrapper)
         workflow.add_node("geo_reasoning", geo_reasoning_wrapper)
         workflow.add_node("response_composer", response_composer_node)
         
@@ -72,29 +113,29 @@ class AstuRouteGraph:
         workflow.add_edge("user_input", "intent_classifier")
         
         # 3. IntentClassifier -> Conditional branching based on routing_decision
+        #    (MIXED fans out to both pipelines, which run concurrently)
         workflow.add_conditional_edges(
             "intent_classifier",
             routing_decision_node,
             {
                 "geo": "geo_reasoning",
                 "rag": "rag_retriever",
-                "both": "rag_retriever"  # Start with RAG, then GEO
+                "rag_parallel": "rag_branch"
             }
         )
         
-        # 4. RAG pipeline: Retriever -> Generator -> Check if MIXED
+        # 4. RAG pipeline: Retriever -> Generator -> Response Composer
         workflow.add_edge("rag_retriever", "rag_generator")
+        workflow.add_edge("rag_generator", "response_composer")
+        
+        # 5. Geo pipeline -> Response Composer; for MIXED the geo branch ends
+        #    here and the composer waits for both branches instead
         workflow.add_conditional_edges(
-            "rag_generator",
-            lambda state: "geo" if state.get("intent") == "MIXED" else "compose",
-            {
-                "geo": "geo_reasoning",
-                "compose": "response_composer"
-            }
+            "geo_reasoning",
+            lambda state: END if state.get("intent") == "MIXED" else "response_composer",
+            ["response_composer", END]
         )
-        
-        # 5. Geo pipeline -> Response Composer
-        workflow.add_edge("geo_reasoning", "response_composer")
+        workflow.add_edge(["rag_branch", "geo_reasoning"], "response_composer")
         
         # 6. Response Composer -> END
         workflow.add_edge("response_composer", END)
@@ -102,6 +143,21 @@ class AstuRouteGraph:
         # Compile the graph
         return workflow.compile()
     
+    def _start_prefetch(self, user_input: Dict[str, Any]) -> Optional[EmbeddingPrefetch]:
+        """
+        Start the query embeddings retrieval and POI search will probably
+        need, so they run while the intent is being classified.
+        """
+        if self.ai_service is None or not settings.embedding_prefetch:
+            return None
+        query = user_input.get("user_query") or ""
+        prefetch = EmbeddingPrefetch(self.ai_service)
+        prefetch.start(query)
+        for term in poi_search_terms(query):
+            prefetch.start(term, use_poi_key=True)
+        user_input["prefetch"] = prefetch
+        return prefetch
+    
     async def execute(self, user_input: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute the workflow with user input
@@ -114,9 +170,23 @@ class AstuRouteGraph:
         """
         logger.info(f"[AstuRouteGraph] Executing workflow for: {user_input.get('user_query', '')[:50]}...")
         
+        generations = None
+        if self.response_cache is not None:
+            generations = await self.response_cache.generations()
+            cached = await self.response_cache.get(user_input, generations)
+            if cached is not None:
+                logger.info(f"[AstuRouteGraph] Answered from response cache ({cached.get('intent')})")
+                return {**cached, "cached": True}
+        
+        request = dict(user_input)
+        prefetch = self._start_prefetch(request)
         try:
             # Run the graph
-            result = await self.graph.ainvoke(user_input)
+            result = await self.graph.ainvoke(request)
+            result.pop("prefetch", None)
+            
+            if self.response_cache is not None:
+                await self.response_cache.set(user_input, result, generations)
             
             logger.info("[AstuRouteGraph] Workflow completed successfully")
             return result
@@ -128,6 +198,9 @@ class AstuRouteGraph:
                 "error": str(e),
                 "reasoning_stream": ["Error occurred during processing"]
             }
+        finally:
+            if prefetch is not None:
+                prefetch.cancel_unused()
     
     async def stream_execute(self, user_input: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
         """
@@ -137,16 +210,44 @@ class AstuRouteGraph:
             user_input: Dictionary with user_query, latitude, longitude, mode, urgency
             
         Yields:
-            State updates at each node execution
+            State updates at each node execution, a "route" event as soon
+            as the route is computed and "token" events as the RAG answer
+            is generated
         """
         logger.info(f"[AstuRouteGraph] Streaming workflow for: {user_input.get('user_query', '')[:50]}...")
         
+        generations = None
+        if self.response_cache is not None:
+            generations = await self.response_cache.generations()
+            cached = await self.response_cache.get(user_input, generations)
+            if cached is not None:
+                logger.info(f"[AstuRouteGraph] Replaying cached answer ({cached.get('intent')})")
+                for event in _replay_events(cached):
+                    yield event
+                return
+        
+        request = dict(user_input)
+        prefetch = self._start_prefetch(request)
+        final_state: Dict[str, Any] = {}
         try:
             # Stream the graph execution
-            async for event in self.graph.astream(user_input):
-                # Event is a dict with node name as key
+            async for mode, event in self.graph.astream(request, stream_mode=["updates", "custom"]):
+                # Custom events: answer tokens written by rag_generator_node
+                if mode == "custom":
+                    if event.get("type") == "token":
+                        yield {
+                            "type": "token",
+                            "node": "rag_generator",
+                            "data": event["content"]
+                        }
+                    continue
+                
+                # Update events are dicts with node name as key
                 for node_name, state_update in event.items():
                     logger.debug(f"[AstuRouteGraph] Node '{node_name}' executed")
+                    if not state_update:
+                        continue
+                    _accumulate(final_state, state_update)
                     
                     # Yield reasoning updates
                     if "reasoning_stream" in state_update:
@@ -156,6 +257,15 @@ class AstuRouteGraph:
                             "data": state_update["reasoning_stream"]
                         }
                     
+                    # Yield the route as soon as geo reasoning finishes; for
+                    # MIXED queries the RAG answer may still be generating
+                    if node_name == "geo_reasoning" and state_update.get("route_coords"):
+                        yield {
+                            "type": "route",
+                            "node": node_name,
+                            "data": _route_payload(state_update)
+                        }
+                    
                     # Yield final answer when available
                     if "final_answer" in state_update:
                         # Debug logging
@@ -164,27 +274,10 @@ class AstuRouteGraph:
                         if route_coords_value and isinstance(route_coords_value, list) and len(route_coords_value) > 0:
                             logger.info(f"[Workflow] First waypoint: {route_coords_value[0]}")
                         
-                        # Construct the full answer object for the frontend
-                        # If the node returned a dictionary with all the keys (like the updated response_composer),
-                        # we should pass that through.
-                        answer_payload = {
-                            "final_answer": state_update.get("final_answer"),
-                            "intent": state_update.get("intent"),
-                            "start_coordinates": state_update.get("start_coordinates"),
-                            "end_coordinates": state_update.get("end_coordinates"),
-                            "distance_estimate": state_update.get("distance_estimate"),
-                            "route_coords": state_update.get("route_coords"),
-                            "rag_confidence": state_update.get("rag_confidence"),
-                            "geo_confidence": state_update.get("geo_confidence"),
-                            "sources_used": state_update.get("sources_used", []),
-                            # Fallback/Aliases for robustness
-                            "answer": state_update.get("final_answer") 
-                        }
-                        
                         yield {
                             "type": "answer",
                             "node": node_name,
-                            "data": answer_payload,
+                            "data": _answer_payload(state_update),
                             "sources": state_update.get("sources_used", [])
                         }
                     
@@ -196,6 +289,9 @@ class AstuRouteGraph:
                             "data": state_update["error"]
                         }
             
+            if self.response_cache is not None and "final_answer" in final_state:
+                await self.response_cache.set(user_input, final_state, generations)
+            
             logger.info("[AstuRouteGraph] Streaming workflow completed")
             
         except Exception as e:
@@ -205,3 +301,61 @@ class AstuRouteGraph:
                 "node": "workflow",
                 "data": str(e)
             }
+        finally:
+            if prefetch is not None:
+                prefetch.cancel_unused()
+
+
+def _accumulate(final_state: Dict[str, Any], state_update: Dict[str, Any]) -> None:
+    """Fold a node's update into the final state of a streamed run"""
+    for key, value in state_update.items():
+        if key == "reasoning_stream":
+            value = merge_reasoning(final_state.get(key), value)
+        final_state[key] = value
+
+
+def _route_payload(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Data of a "route" event"""
+    return {
+        "route_coords": state.get("route_coords"),
+        "start_coordinates": state.get("start_coordinates"),
+        "end_coordinates": state.get("end_coordinates"),
+        "distance_estimate": state.get("distance_estimate"),
+        "route_summary": state.get("route_summary")
+    }
+
+
+def _answer_payload(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Full answer object the frontend reads from an "answer" event"""
+    return {
+        "final_answer": state.get("final_answer"),
+        "intent": state.get("intent"),
+        "start_coordinates": state.get("start_coordinates"),
+        "end_coordinates": state.get("end_coordinates"),
+        "distance_estimate": state.get("distance_estimate"),
+        "route_coords": state.get("route_coords"),
+        "rag_confidence": state.get("rag_confidence"),
+        "geo_confidence": state.get("geo_confidence"),
+        "sources_used": state.get("sources_used", []),
+        # Fallback/Aliases for robustness
+        "answer": state.get("final_answer")
+    }
+
+
+def _replay_events(cached: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The events a cached answer is streamed as: its reasoning steps, the
+    route (if any) and the answer, in the order a live run yields them"""
+    events = [{
+        "type": "reasoning",
+        "node": "response_cache",
+        "data": cached.get("reasoning_stream") or []
+    }]
+    if cached.get("route_coords"):
+        events.append({"type": "route", "node": "response_cache", "data": _route_payload(cached)})
+    events.append({
+        "type": "answer",
+        "node": "response_cache",
+        "data": {**_answer_payload(cached), "cached": True},
+        "sources": cached.get("sources_used") or []
+    })
+    return events
@@ -9,7 +9,9 @@ from datetime import datetime
 import json
 import logging
 
-from app.core.container import Container
+from app.core.container import container
+from config import settings
+from database import to_vector, content_hash
 from models import POI, Document
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
@@ -18,17 +20,24 @@ logger = logging.getLogger(__name__)
 
 def get_db():
     """Get database service from container"""
-    return Container().get_database()
+    return container.get_database()
 
 
 def get_vector():
     """Get vector service from container"""
-    return Container().get_vector_service()
+    return container.get_vector_service()
 
 
 def get_ai():
     """Get AI service from container"""
-    return Container().get_ai_service()
+    return container.get_ai_service()
+
+
+async def invalidate_responses(*sources: str):
+    """Drop cached AI answers built from the changed data ("pois", "documents")"""
+    response_cache = container.get_response_cache()
+    if response_cache is not None:
+        await response_cache.invalidate(*sources)
 
 
 @router.get("/stats")
@@ -38,29 +47,15 @@ async def get_stats(db = Depends(get_db)):
     Returns counts of POIs, documents, and OSM status.
     """
     try:
-        # Use synchronous connection for count queries
-        from database import Database
-        database = Database()
-        conn = database.connect()
-        
-        with conn.cursor() as cur:
-            # Count POIs
-            cur.execute("SELECT COUNT(*) as count FROM pois")
-            poi_count = cur.fetchone()["count"]
-            
-            # Count documents
-            cur.execute("SELECT COUNT(*) as count FROM documents")
-            doc_count = cur.fetchone()["count"]
-            
-            # Count city services
-            cur.execute("SELECT COUNT(*) as count FROM pois WHERE category = 'service'")
-            service_count = cur.fetchone()["count"]
-        
-        conn.close()
+        # Count queries run on the shared pooled database
+        poi_count = (await db.execute_query("SELECT COUNT(*) as count FROM pois"))[0]["count"]
+        doc_count = (await db.execute_query("SELECT COUNT(*) as count FROM documents"))[0]["count"]
+        service_count = (await db.execute_query(
+            "SELECT COUNT(*) as count FROM pois WHERE category = 'service'"
+        ))[0]["count"]
         
         # Check OSM status from container
-        from app.core.container import Container
-        osm_service = Container().get_osm_service()
+        osm_service = container.get_osm_service()
         osm_loaded = osm_service.campus_graph_loaded
         
         return {
@@ -127,9 +122,6 @@ async def create_poi(poi: POI, db = Depends(get_db), ai = Depends(get_ai)):
         ) RETURNING id
         """
         
-        # Format embedding for pgvector
-        embedding_str = f"[{','.join(map(str, embedding))}]" if embedding else None
-        
         result = await db.execute_query(
             query,
             poi.name,
@@ -145,11 +137,12 @@ async def create_poi(poi: POI, db = Depends(get_db), ai = Depends(get_ai)):
             facilities_json,
             tags_json,
             poi.osm_id,
-            embedding_str,
+            to_vector(embedding),
             datetime.now()
         )
         
         poi_id = result[0]["id"]
+        await invalidate_responses("pois")
         return {
             "id": poi_id,
             "message": "POI created successfully with embedding",
@@ -180,8 +173,6 @@ async def update_poi(poi_id: int, poi: POI, db = Depends(get_db), ai = Depends(g
             searchable_text = ". ".join(text_parts)
             embedding = await ai.generate_embedding(searchable_text, use_poi_key=True)
         
-        embedding_str = f"[{','.join(map(str, embedding))}]" if embedding else None
-        
         query = """
         UPDATE pois SET
             name = $1, category = $2, latitude = $3, longitude = $4,
@@ -196,8 +187,9 @@ async def update_poi(poi_id: int, poi: POI, db = Depends(get_db), ai = Depends(g
             poi.name, poi.category, poi.latitude, poi.longitude,
             poi.description, poi.building, poi.block_num, poi.floor,
             poi.room_num, poi.capacity, facilities_json, tags_json,
-            poi.osm_id, embedding_str, poi_id
+            poi.osm_id, to_vector(embedding), poi_id
         )
+        await invalidate_responses("pois")
         
         return {
             "message": "POI updated successfully with new embedding",
@@ -214,6 +206,7 @@ async def delete_poi(poi_id: int, db = Depends(get_db)):
     try:
         query = "DELETE FROM pois WHERE id = $1"
         await db.execute_query(query, poi_id)
+        await invalidate_responses("pois")
         return {"message": "POI deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete POI: {str(e)}")
@@ -252,12 +245,24 @@ async def create_document(
         tags_list = json.loads(tags) if tags else None
         tags_json = json.dumps(tags_list) if tags_list else None
         
-        # Store document
-        query = """
-        INSERT INTO documents (title, content, source, tags, embedding, created_at)
-        VALUES ($1, $2, $3, $4, $5, $6)
-        RETURNING id
-        """
+        # Store document (keyed by content hash, like bulk ingestion, with db_document_hash)
+        if settings.db_document_hash:
+            query = """
+            INSERT INTO documents (title, content, source, tags, embedding, created_at, hash)
+            VALUES ($1, $2, $3, $4, $5, $6, $7)
+            ON CONFLICT (hash) DO UPDATE SET
+                title = EXCLUDED.title, source = EXCLUDED.source,
+                tags = EXCLUDED.tags, embedding = EXCLUDED.embedding
+            RETURNING id
+            """
+            params = (content_hash(content),)
+        else:
+            query = """
+            INSERT INTO documents (title, content, source, tags, embedding, created_at)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            RETURNING id
+            """
+            params = ()
         
         result = await db.execute_query(
             query,
@@ -265,11 +270,13 @@ async def create_document(
             content,
             source,
             tags_json,
-            embedding,
-            datetime.now()
+            to_vector(embedding),
+            datetime.now(),
+            *params
         )
         
         doc_id = result[0]["id"]
+        await invalidate_responses("documents")
         
         # Document already stored with embedding via execute_query above
         # Vector service is for search only, not storage
@@ -304,23 +311,37 @@ async def upload_document(
         # Generate embedding
         embedding = await ai.generate_embedding(text_content)
         
-        # Store document
-        query = """
-        INSERT INTO documents (title, content, source, embedding, created_at)
-        VALUES ($1, $2, $3, $4, $5)
-        RETURNING id
-        """
+        # Store document (keyed by content hash, like bulk ingestion, with db_document_hash)
+        if settings.db_document_hash:
+            query = """
+            INSERT INTO documents (title, content, source, embedding, created_at, hash)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            ON CONFLICT (hash) DO UPDATE SET
+                title = EXCLUDED.title, source = EXCLUDED.source,
+                embedding = EXCLUDED.embedding
+            RETURNING id
+            """
+            params = (content_hash(text_content),)
+        else:
+            query = """
+            INSERT INTO documents (title, content, source, embedding, created_at)
+            VALUES ($1, $2, $3, $4, $5)
+            RETURNING id
+            """
+            params = ()
         
         result = await db.execute_query(
             query,
             doc_title,
             text_content,
             source or file.filename,
-            embedding,
-            datetime.now()
+            to_vector(embedding),
+            datetime.now(),
+            *params
         )
         
         doc_id = result[0]["id"]
+        await invalidate_responses("documents")
         
         # Document already stored with embedding via execute_query above
         # Vector service is for search only, not storage
@@ -353,16 +374,27 @@ async def update_document(
         tags_list = json.loads(tags) if tags else None
         tags_json = json.dumps(tags_list) if tags_list else None
         
-        query = """
-        UPDATE documents SET
-            title = $1, content = $2, source = $3, tags = $4, embedding = $5
-        WHERE id = $6
-        """
+        if settings.db_document_hash:
+            query = """
+            UPDATE documents SET
+                title = $1, content = $2, source = $3, tags = $4, embedding = $5, hash = $6
+            WHERE id = $7
+            """
+            params = (content_hash(content), doc_id)
+        else:
+            query = """
+            UPDATE documents SET
+                title = $1, content = $2, source = $3, tags = $4, embedding = $5
+            WHERE id = $6
+            """
+            params = (doc_id,)
         
         await db.execute_query(
             query,
-            title, content, source, tags_json, embedding, doc_id
+            title, content, source, tags_json, to_vector(embedding),
+            *params
         )
+        await invalidate_responses("documents")
         
         return {
             "message": "Document updated successfully with new embedding",
@@ -378,6 +410,7 @@ async def delete_document(doc_id: int, db = Depends(get_db)):
     try:
         query = "DELETE FROM documents WHERE id = $1"
         await db.execute_query(query, doc_id)
+        await invalidate_responses("documents")
         return {"message": "Document deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete document: {str(e)}")
@@ -405,19 +438,18 @@ async def scrape_single_url(
         # Generate embedding
         embedding = await ai.generate_embedding(content_data['content'])
         
-        # Insert into database
-        from database import Database
-        database = Database()
-        doc_id = database.insert_document(
-            title=content_data['title'],
-            content=content_data['content'],
-            source=content_data['url'],
-            tags=['web-scraped'],
-            embedding=embedding
-        )
+        # Insert into database (re-scraping the same content updates it in place)
+        merged = await db.bulk_upsert_documents([{
+            'title': content_data['title'],
+            'content': content_data['content'],
+            'source': content_data['url'],
+            'tags': ['web-scraped'],
+            'embedding': embedding
+        }])
+        await invalidate_responses("documents")
         
         return {
-            "id": doc_id,
+            "id": merged[0]['id'],
             "title": content_data['title'],
             "url": url,
             "message": "URL scraped and stored successfully"
@@ -438,7 +470,6 @@ async def scrape_astu_website(
     """
     try:
         from app.services.scraper_service import ASTUWebScraper
-        from database import Database
         
         scraper = ASTUWebScraper()
         
@@ -451,28 +482,16 @@ async def scrape_astu_website(
         # Prepare documents (with chunking)
         documents = scraper.prepare_documents(scraped_data, chunk_size=1000)
         
-        # Store each document
-        database = Database()
-        stored_count = 0
+        # Embed all documents in batched requests, then store them in one bulk write
+        embeddings = await ai.generate_embeddings([doc['content'] for doc in documents])
+        embedded_docs = [
+            {**doc, 'tags': doc.get('tags', []), 'embedding': embedding}
+            for doc, embedding in zip(documents, embeddings)
+        ]
         
-        for doc in documents:
-            try:
-                # Generate embedding
-                embedding = await ai.generate_embedding(doc['content'])
-                
-                # Insert into database
-                doc_id = database.insert_document(
-                    title=doc['title'],
-                    content=doc['content'],
-                    source=doc['source'],
-                    tags=doc.get('tags', []),
-                    embedding=embedding
-                )
-                stored_count += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to store document '{doc['title']}': {e}")
-                continue
+        merged = await db.bulk_upsert_documents(embedded_docs)
+        await invalidate_responses("documents")
+        stored_count = len(merged)
         
         return {
             "scraped_pages": len(scraped_data),
@@ -495,13 +514,11 @@ async def scrape_custom_urls(
     """
     try:
         from app.services.scraper_service import WebScraperService
-        from database import Database
         
         scraper = WebScraperService()
-        database = Database()
         
-        stored_count = 0
         results = []
+        scraped_docs = []
         
         for url in urls:
             try:
@@ -509,23 +526,18 @@ async def scrape_custom_urls(
                 content_data = scraper.scrape_url(url)
                 
                 if content_data and len(content_data.get('content', '')) > 100:
-                    # Generate embedding
-                    embedding = await ai.generate_embedding(content_data['content'])
-                    
-                    # Insert into database
-                    doc_id = database.insert_document(
-                        title=content_data['title'],
-                        content=content_data['content'],
-                        source=content_data['url'],
-                        tags=['web-scraped', 'custom'],
-                        embedding=embedding
-                    )
-                    
-                    stored_count += 1
+                    doc = {
+                        'title': content_data['title'],
+                        'content': content_data['content'],
+                        'source': content_data['url'],
+                        'tags': ['web-scraped', 'custom'],
+                        'hash': content_hash(content_data['content'])
+                    }
+                    scraped_docs.append(doc)
                     results.append({
                         "url": url,
                         "status": "success",
-                        "id": doc_id,
+                        "hash": doc['hash'],
                         "title": content_data['title']
                     })
                 else:
@@ -542,6 +554,20 @@ async def scrape_custom_urls(
                     "error": str(e)
                 })
         
+        # Embed all scraped pages in batched requests, store them in one
+        # bulk write and report their IDs
+        embeddings = await ai.generate_embeddings([doc['content'] for doc in scraped_docs])
+        for doc, embedding in zip(scraped_docs, embeddings):
+            doc['embedding'] = embedding
+        
+        merged = await db.bulk_upsert_documents(scraped_docs)
+        await invalidate_responses("documents")
+        ids_by_hash = {row['hash']: row['id'] for row in merged}
+        for result in results:
+            if 'hash' in result:
+                result['id'] = ids_by_hash.get(result.pop('hash'))
+        stored_count = len(merged)
+        
         return {
             "total_urls": len(urls),
             "stored_count": stored_count,
@@ -33,6 +33,7 @@ class AIQueryResponse(BaseModel):
     confidence: str
     sources: list[str] = []
     reasoning_steps: list[str] = []
+    cached: bool = False  # Served from the response cache
 
 
 # Dependency injection
@@ -91,7 +92,8 @@ async def ai_query(
             intent=result.get("intent", "UNKNOWN"),
             confidence=result.get("rag_confidence") or result.get("geo_confidence", "medium"),
             sources=result.get("sources_used", []),
-            reasoning_steps=result.get("reasoning_stream", [])
+            reasoning_steps=result.get("reasoning_stream", []),
+            cached=result.get("cached", False)
         )
         
     except Exception as e:
@@ -136,6 +138,14 @@ async def ai_query_stream_get(
                     for step in event["data"]:
                         yield f"data: {json.dumps({'type': 'reasoning', 'content': step})}\n\n"
                 
+                # Send answer tokens as they are generated
+                elif event["type"] == "token":
+                    yield f"data: {json.dumps({'type': 'token', 'content': event['data']})}\n\n"
+                
+                # Send the route as soon as it is computed
+                elif event["type"] == "route":
+                    yield f"data: {json.dumps({'type': 'route', 'content': event['data']})}\n\n"
+                
                 # Send final answer
                 elif event["type"] == "answer":
                     yield f"data: {json.dumps({'type': 'answer', 'content': event['data'], 'sources': event.get('sources', [])})}\n\n"
@@ -194,6 +204,14 @@ async def ai_query_stream_post(
                     for step in event["data"]:
                         yield f"data: {json.dumps({'type': 'reasoning', 'content': step})}\n\n"
                 
+                # Send answer tokens as they are generated
+                elif event["type"] == "token":
+                    yield f"data: {json.dumps({'type': 'token', 'content': event['data']})}\n\n"
+                
+                # Send the route as soon as it is computed
+                elif event["type"] == "route":
+                    yield f"data: {json.dumps({'type': 'route', 'content': event['data']})}\n\n"
+                
                 # Send final answer
                 elif event["type"] == "answer":
                     yield f"data: {json.dumps({'type': 'answer', 'content': event['data'], 'sources': event.get('sources', [])})}\n\n"
@@ -248,6 +266,10 @@ async def ai_query_stream_get(
                 if event["type"] == "reasoning":
                     for step in event["data"]:
                         yield f"data: {json.dumps({'type': 'reasoning', 'content': step})}\n\n"
+                elif event["type"] == "token":
+                    yield f"data: {json.dumps({'type': 'token', 'content': event['data']})}\n\n"
+                elif event["type"] == "route":
+                    yield f"data: {json.dumps({'type': 'route', 'content': event['data']})}\n\n"
                 elif event["type"] == "answer":
                     yield f"data: {json.dumps({'type': 'answer', 'content': event['data'], 'sources': event.get('sources', [])})}\n\n"
                 elif event["type"] == "error":
@@ -305,6 +327,14 @@ async def ai_query_stream_get(
                     for step in event["data"]:
                         yield f"data: {json.dumps({'type': 'reasoning', 'content': step})}\n\n"
                 
+                # Send answer tokens as they are generated
+                elif event["type"] == "token":
+                    yield f"data: {json.dumps({'type': 'token', 'content': event['data']})}\n\n"
+                
+                # Send the route as soon as it is computed
+                elif event["type"] == "route":
+                    yield f"data: {json.dumps({'type': 'route', 'content': event['data']})}\n\n"
+                
                 # Send final answer
                 elif event["type"] == "answer":
                     yield f"data: {json.dumps({'type': 'answer', 'content': event['data'], 'sources': event.get('sources', [])})}\n\n"
@@ -4,6 +4,9 @@ Health check and status endpoints.
 """
 from fastapi import APIRouter, HTTPException
 from app.core.container import container
+from app.core.metrics import db_metrics
+from app.core.circuit_breaker import breaker_states
+from app.graph.prefetch import prefetch_stats
 
 router = APIRouter(tags=["Health"])
 
@@ -21,10 +24,12 @@ async def health_check():
             "service": "ASTU Route AI",
             "version": "0.1.0",
             "services": {
-                "database": "connected" if db.test_connection() else "disconnected",
+                "database": "connected" if await db.test_connection() else "disconnected",
+                "database_pool": db.pool_stats(),
                 "ai_service": ai.model if ai else "unavailable",
                 "cache": type(cache).__name__ if cache else "unavailable"
-            }
+            },
+            "circuit_breakers": breaker_states()
         }
     except Exception as e:
         return {
@@ -39,25 +44,60 @@ async def check_database():
     """Check database connectivity"""
     try:
         db = container.get_database()
-        is_healthy = db.test_connection()
+        is_healthy = await db.test_connection()
         
         if is_healthy:
-            return {"status": "ok", "database": "connected"}
+            return {"status": "ok", "database": "connected", "pool": db.pool_stats()}
         else:
             raise HTTPException(status_code=503, detail="Database connection failed")
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Database check failed: {str(e)}")
 
 
+@router.get("/metrics")
+async def get_metrics():
+    """Per-method database timings, pool wait, row counts and slow queries,
+    plus embedding cache hit rates, micro-batch sizes, coalesced AI calls
+    upstream rate limiter state, graph LLM client concurrency and how many
+    intents the local classifier answered without the LLM (and how the
+    rest were batched), how many speculative query embeddings were used
+    and how often whole answers came from the response cache (and RAG
+    answers from the semantic answer cache, with its audited false hits)"""
+    db = container.get_database()
+    ai = container.get_ai_service()
+    intent = container.get_intent_classifier()
+    intent_batcher = container.get_intent_batcher()
+    response_cache = container.get_response_cache()
+    answer_cache = container.get_answer_cache()
+    return {
+        "database": {
+            **db_metrics.snapshot(),
+            "pool": db.pool_stats()
+        },
+        "embedding_cache": ai.embedding_cache.stats() if ai.embedding_cache else None,
+        "embedding_batcher": ai.embedding_batcher.stats() if ai.embedding_batcher else None,
+        "ai_inflight": ai.inflight.stats(),
+        "ai_rate_limits": ai.rate_limit_stats(),
+        "llm_clients": container.get_llm_registry().stats(),
+        "intent_classifier": intent.stats() if intent else None,
+        "intent_batcher": intent_batcher.stats() if intent_batcher else None,
+        "embedding_prefetch": prefetch_stats(),
+        "response_cache": response_cache.stats() if response_cache else None,
+        "answer_cache": answer_cache.stats() if answer_cache else None
+    }
+
+
 @router.get("/ai")
 async def check_ai_service():
-    """Check AI service configuration"""
+    """Check AI service configuration and upstream circuit breakers"""
     try:
         ai = container.get_ai_service()
+        breakers = breaker_states()
         return {
-            "status": "ok",
+            "status": "degraded" if any(b["state"] != "closed" for b in breakers.values()) else "ok",
             "ai_model": ai.model,
-            "embedding_model": ai.embedding_model
+            "embedding_model": ai.embedding_model,
+            "circuit_breakers": breakers
         }
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"AI service check failed: {str(e)}")
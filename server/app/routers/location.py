@@ -9,7 +9,7 @@ from fastapi import APIRouter, Query, Depends
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from app.core.logging_config import logger
-from app.core.container import Container
+from app.core.container import container
 from app.graph.workflow import AstuRouteGraph
 
 router = APIRouter(prefix="/api/location", tags=["Location"])
@@ -26,7 +26,7 @@ class LocationUpdate(BaseModel):
 
 def get_graph() -> AstuRouteGraph:
     """Dependency to get graph instance"""
-    return Container().get_graph()
+    return container.get_graph()
 
 
 @router.get(
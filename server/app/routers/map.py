@@ -6,8 +6,8 @@ router = APIRouter(prefix="/api/map", tags=["Map"])
 
 def get_db():
     """Get database service from container"""
-    from app.core.container import Container
-    return Container().get_database()
+    from app.core.container import container
+    return container.get_database()
 
 
 @router.get("/campus")
@@ -4,17 +4,48 @@ Google Gemini AI service implementation.
 """
 import httpx
 import asyncio
-from typing import AsyncGenerator, List
+import time
+from typing import AsyncGenerator, Awaitable, Callable, Dict, Any, List, Optional
 from config import settings
-from app.core.exceptions import AIServiceException
+from app.core.exceptions import AIServiceException, RateLimitError, CircuitOpenError
 from app.core.logging_config import ai_logger
+from app.core.singleflight import SingleFlight, payload_key
+from app.core.circuit_breaker import CircuitBreaker, get_breaker
 from app.services.interfaces import IAIService
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.rate_limiter import KeyPool, RedisLimiterStore, parse_retry_after, split_keys
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token estimate for batching (~3 characters per token)"""
+    return len(text) // 3 + 1
+
+
+def embedding_batches(texts: List[str], max_inputs: int, max_tokens: int) -> List[List[str]]:
+    """
+    Split texts into consecutive batches within the per-request input and
+    token limits. A single text over the token limit gets its own batch
+    (Voyage truncates it to the model context).
+    """
+    batches, batch, batch_tokens = [], [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if batch and (len(batch) >= max_inputs or batch_tokens + tokens > max_tokens):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
 
 
 class GeminiAIService(IAIService):
     """Gemini AI service using Google's native API for text, Voyage AI for embeddings"""
     
-    def __init__(self):
+    def __init__(self, embedding_cache: Optional[EmbeddingCache] = None,
+                 limiter_store: Optional[RedisLimiterStore] = None):
         self.api_key = settings.ai_api_key
         self.model = settings.ai_model
         self.voyage_api_key = settings.voyage_api_key  # For document embeddings
@@ -23,6 +54,35 @@ class GeminiAIService(IAIService):
         self.timeout = settings.ai_stream_timeout
         self.base_url = "https://generativelanguage.googleapis.com/v1beta"
         self.voyage_url = "https://api.voyageai.com/v1"
+        # Rate-limited key pools (extra keys are used round-robin); the
+        # limiter store shares quotas across workers when configured
+        self.limiter_store = limiter_store
+        self.gemini_keys = KeyPool(
+            "gemini", split_keys(self.api_key, settings.ai_api_keys),
+            settings.ai_rpm, store=limiter_store
+        )
+        self.voyage_keys = KeyPool(
+            "voyage", split_keys(self.voyage_api_key, settings.voyage_api_keys),
+            settings.voyage_rpm, settings.voyage_tpm, limiter_store
+        )
+        self.voyage_poi_keys = KeyPool(
+            "voyage_poi", split_keys(self.voyage_poi_api_key, settings.voyage_poi_api_keys),
+            settings.voyage_rpm, settings.voyage_tpm, limiter_store
+        )
+        # Shared per-upstream breakers: callers degrade at once while open
+        self.gemini_breaker = get_breaker("gemini")
+        self.voyage_breaker = get_breaker("voyage")
+        self.embedding_cache = embedding_cache  # Skips Voyage for repeated texts
+        # Coalesces concurrent single-text embedding calls into batched requests
+        self.embedding_batcher = None
+        if settings.embedding_batch_window_ms > 0:
+            self.embedding_batcher = EmbeddingBatcher(
+                self._embed_texts,
+                window_ms=settings.embedding_batch_window_ms,
+                max_batch_size=min(settings.embedding_batch_max_size, settings.voyage_batch_size)
+            )
+        # Identical concurrent embedding/text calls share one upstream request
+        self.inflight = SingleFlight()
         self._client = None
     
     async def _get_client(self) -> httpx.AsyncClient:
@@ -42,37 +102,98 @@ class GeminiAIService(IAIService):
         if self._client:
             await self._client.aclose()
             self._client = None
+        if self.limiter_store:
+            await self.limiter_store.close()
     
-    async def generate_embedding(self, text: str, use_poi_key: bool = False) -> List[float]:
+    def _voyage_pool(self, use_poi_key: bool) -> KeyPool:
+        """Select the Voyage key pool for POI or document embeddings"""
+        pool = self.voyage_poi_keys if use_poi_key else self.voyage_keys
+        if not pool:
+            raise AIServiceException(
+                f"{'POI' if use_poi_key else 'Document'} Voyage API key not configured"
+            )
+        return pool
+    
+    async def _send(self, pool: KeyPool, breaker: CircuitBreaker,
+                    request: Callable[[str], Awaitable[httpx.Response]],
+                    cost: float = 0) -> httpx.Response:
         """
-        Generate embedding for text using Voyage AI.
-        Returns 1024-dimensional vector from voyage-2 model (optimized for RAG).
-        
-        Args:
-            text: Text to embed
-            use_poi_key: If True, uses VOYAGE_POI_API_KEY for POI embeddings
+        Send a request with the next available key of a pool, within its rate
+        limits. A 429 halves that key's rate and pauses it for Retry-After,
+        then the request is retried (on another key when one is free).
+        Raises CircuitOpenError without sending while the breaker is open;
+        transport errors, 5xx responses and slow responses feed the breaker.
         """
-        try:
-            client = await self._get_client()
+        attempts = settings.ai_rate_limit_retries + 1
+        for attempt in range(1, attempts + 1):
+            key, limiter = pool.choose()
+            await limiter.acquire(cost)
+            response = await self._guarded(breaker, request, key)
             
-            # Select appropriate API key
-            api_key = self.voyage_poi_api_key if use_poi_key else self.voyage_api_key
+            if response.status_code != 429:
+                if response.status_code < 400:
+                    limiter.succeeded()
+                return response
             
-            if not api_key:
-                raise AIServiceException(
-                    f"{'POI' if use_poi_key else 'Document'} Voyage API key not configured"
-                )
+            pause = limiter.throttled(parse_retry_after(response.headers.get("Retry-After")))
+            await limiter.share_pause()
+            ai_logger.warning(
+                f"{pool.name} rate limited (attempt {attempt}/{attempts}), key paused for {pause:.1f}s"
+            )
+        
+        raise RateLimitError(
+            f"{pool.name} rate limit exceeded after {attempts} attempts", retry_after=pause
+        )
+    
+    async def _guarded(self, breaker: CircuitBreaker,
+                       request: Callable[[str], Awaitable[httpx.Response]], key: str) -> httpx.Response:
+        """Send one request through a circuit breaker (429s aren't counted)"""
+        breaker.before_call()
+        start = time.perf_counter()
+        try:
+            response = await request(key)
+        except Exception:
+            breaker.record(False, (time.perf_counter() - start) * 1000)
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        
+        if response.status_code == 429:
+            breaker.release()
+        else:
+            breaker.record(response.status_code < 500, (time.perf_counter() - start) * 1000)
+        return response
+    
+    def rate_limit_stats(self) -> Dict[str, Any]:
+        """Per-key limiter state for each upstream pool"""
+        return {
+            "gemini": self.gemini_keys.stats(),
+            "voyage": self.voyage_keys.stats(),
+            "voyage_poi": self.voyage_poi_keys.stats(),
+            "shared": bool(self.limiter_store and self.limiter_store.available)
+        }
+    
+    async def _request_embeddings(self, inputs: List[str], use_poi_key: bool) -> List[List[float]]:
+        """Embed a list of texts in one Voyage request, results in input order"""
+        try:
+            client = await self._get_client()
             
-            response = await client.post(
-                f"{self.voyage_url}/embeddings",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.embedding_model,
-                    "input": text
-                }
+            response = await self._send(
+                self._voyage_pool(use_poi_key),
+                self.voyage_breaker,
+                lambda api_key: client.post(
+                    f"{self.voyage_url}/embeddings",
+                    headers={
+                        "Authorization": f"Bearer {api_key}",
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "model": self.embedding_model,
+                        "input": inputs
+                    }
+                ),
+                cost=sum(estimate_tokens(text) for text in inputs)
             )
             
             if response.status_code != 200:
@@ -80,35 +201,114 @@ class GeminiAIService(IAIService):
                     f"Voyage embedding generation failed: {response.text}"
                 )
             
-            data = response.json()
-            embedding = data["data"][0]["embedding"]
-            key_type = "POI" if use_poi_key else "DOC"
-            ai_logger.info(f"Generated Voyage embedding [{key_type}] (dim={len(embedding)}) for text (len={len(text)})")
-            return embedding
+            data = response.json()["data"]
+            if len(data) != len(inputs):
+                raise AIServiceException(
+                    f"Voyage returned {len(data)} embeddings for {len(inputs)} inputs"
+                )
+            # Each item carries the position of its input; don't rely on response order
+            return [item["embedding"] for item in sorted(data, key=lambda item: item["index"])]
             
         except httpx.RequestError as e:
             raise AIServiceException(f"Voyage embedding request failed: {str(e)}")
     
+    async def generate_embedding(self, text: str, use_poi_key: bool = False) -> List[float]:
+        """
+        Generate embedding for text using Voyage AI.
+        Returns 1024-dimensional vector from voyage-2 model (optimized for RAG).
+        
+        Args:
+            text: Text to embed
+            use_poi_key: If True, uses VOYAGE_POI_API_KEY for POI embeddings
+        """
+        key_type = "POI" if use_poi_key else "DOC"
+        
+        if self.embedding_cache is not None:
+            cached = await self.embedding_cache.get(text, self.embedding_model, key_type)
+            if cached is not None:
+                ai_logger.debug(f"Embedding cache hit [{key_type}] for text (len={len(text)})")
+                return cached
+        
+        return await self.inflight.do(
+            payload_key("embedding", self.embedding_model, key_type, text),
+            lambda: self._fetch_embedding(text, use_poi_key)
+        )
+    
+    async def _fetch_embedding(self, text: str, use_poi_key: bool) -> List[float]:
+        """Embed one text upstream (batched with concurrent calls) and cache it"""
+        key_type = "POI" if use_poi_key else "DOC"
+        
+        if self.embedding_batcher is not None:
+            embedding = await self.embedding_batcher.embed(text, use_poi_key)
+        else:
+            embedding = (await self._request_embeddings([text], use_poi_key))[0]
+        
+        if self.embedding_cache is not None:
+            await self.embedding_cache.set(text, self.embedding_model, key_type, embedding)
+        
+        ai_logger.info(f"Generated Voyage embedding [{key_type}] (dim={len(embedding)}) for text (len={len(text)})")
+        return embedding
+    
+    async def generate_embeddings(self, texts: List[str], use_poi_key: bool = False) -> List[List[float]]:
+        """
+        Generate embeddings for many texts using batched Voyage AI requests.
+        Texts are split into batches by input count and estimated tokens;
+        embeddings are returned in the same order as the texts.
+        
+        Args:
+            texts: Texts to embed
+            use_poi_key: If True, uses VOYAGE_POI_API_KEY for POI embeddings
+        """
+        if not texts:
+            return []
+        
+        embeddings = await self._embed_texts(texts, use_poi_key)
+        key_type = "POI" if use_poi_key else "DOC"
+        ai_logger.info(f"Generated {len(embeddings)} Voyage embeddings [{key_type}]")
+        return embeddings
+    
+    async def _embed_texts(self, texts: List[str], use_poi_key: bool) -> List[List[float]]:
+        """Embed texts in as few Voyage requests as the batch limits allow"""
+        self._voyage_pool(use_poi_key)  # Fail fast when no key is configured
+        embeddings: List[List[float]] = []
+        
+        for batch in embedding_batches(texts, settings.voyage_batch_size, settings.voyage_batch_max_tokens):
+            embeddings.extend(await self._request_embeddings(batch, use_poi_key))
+        
+        return embeddings
+    
     async def generate_text(self, prompt: str, temperature: float = 0.7) -> str:
         """
         Generate text response from Gemini using native API.
+        Identical concurrent prompts share one upstream request.
         """
+        return await self.inflight.do(
+            payload_key("text", self.model, prompt, temperature),
+            lambda: self._generate_text(prompt, temperature)
+        )
+    
+    async def _generate_text(self, prompt: str, temperature: float) -> str:
+        """Send one generateContent request"""
         try:
             client = await self._get_client()
             
             # Gemini API format: /v1beta/models/{model}:generateContent?key=API_KEY
-            response = await client.post(
-                f"{self.base_url}/models/{self.model}:generateContent",
-                params={"key": self.api_key},
-                json={
-                    "contents": [{
-                        "parts": [{"text": prompt}]
-                    }],
-                    "generationConfig": {
-                        "temperature": temperature,
-                        "maxOutputTokens": 2048
+            response = await self._send(
+                self.gemini_keys,
+                self.gemini_breaker,
+                lambda api_key: client.post(
+                    f"{self.base_url}/models/{self.model}:generateContent",
+                    params={"key": api_key},
+                    json={
+                        "contents": [{
+                            "parts": [{"text": prompt}]
+                        }],
+                        "generationConfig": {
+                            "temperature": temperature,
+                            "maxOutputTokens": 2048
+                        }
                     }
-                }
+                )
             )
             
             # Log response details for debugging
@@ -137,6 +337,8 @@ class GeminiAIService(IAIService):
         except httpx.RequestError as e:
             ai_logger.error(f"HTTP request failed: {str(e)}")
             raise AIServiceException(f"Text generation request failed: {str(e)}")
+        except (RateLimitError, CircuitOpenError):
+            raise
         except KeyError as e:
             ai_logger.error(f"Unexpected response format: {str(e)}")
             raise AIServiceException(f"Invalid response from Gemini: {str(e)}")
@@ -147,14 +349,22 @@ class GeminiAIService(IAIService):
     async def stream_text(self, prompt: str, temperature: float = 0.7) -> AsyncGenerator[str, None]:
         """
         Stream text response from Gemini using native streaming API.
+        The breaker judges the call by its status and time to first byte.
         """
+        breaker = self.gemini_breaker
+        pending = False  # Admitted by the breaker, outcome not yet recorded
         try:
             client = await self._get_client()
+            api_key, limiter = self.gemini_keys.choose()
+            await limiter.acquire()
             
+            breaker.before_call()
+            pending = True
+            start = time.perf_counter()
             async with client.stream(
                 "POST",
                 f"{self.base_url}/models/{self.model}:streamGenerateContent",
-                params={"key": self.api_key, "alt": "sse"},
+                params={"key": api_key, "alt": "sse"},
                 json={
                     "contents": [{
                         "parts": [{"text": prompt}]
@@ -165,6 +375,16 @@ class GeminiAIService(IAIService):
                     }
                 }
             ) as response:
+                pending = False
+                if response.status_code == 429:
+                    breaker.release()
+                    # Streams aren't retried: partial output can't be replayed
+                    pause = limiter.throttled(parse_retry_after(response.headers.get("Retry-After")))
+                    await limiter.share_pause()
+                    raise RateLimitError("gemini rate limit exceeded", retry_after=pause)
+                
+                breaker.record(response.status_code < 500, (time.perf_counter() - start) * 1000)
+                
                 if response.status_code != 200:
                     raise AIServiceException(
                         f"Stream generation failed: {response.status_code}"
@@ -185,9 +405,14 @@ class GeminiAIService(IAIService):
                             ai_logger.warning(f"Failed to parse chunk: {e}")
                             continue
                 
+                limiter.succeeded()
                 ai_logger.info("Stream text generation completed")
                 
         except httpx.RequestError as e:
+            if pending:
+                pending = False
+                breaker.record(False, (time.perf_counter() - start) * 1000)
             raise AIServiceException(f"Stream request failed: {str(e)}")
-
-            raise AIServiceException(f"Stream request failed: {str(e)}")
+        finally:
+            if pending:
+                breaker.release()
@@ -0,0 +1,235 @@
+"""
+app/services/answer_cache.py
+Semantic cache of generated answers to university questions.
+
+Paraphrases ("when does registration open", "registration start date")
+miss exact-match caches. Here every answered question's embedding goes
+into a small in-process index; a new question whose embedding is similar
+enough reuses the stored answer, provided the documents it was grounded
+on come back from retrieval unchanged. A sample of hits is re-answered in
+the background to measure how often a reused answer was wrong.
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Callable, Awaitable
+
+import numpy as np
+
+from database import content_hash
+from app.services.interfaces import IAIService
+from app.core.logging_config import ai_logger
+
+
+def document_versions(documents: List[Any]) -> Dict[Any, str]:
+    """Content hash by document ID, for Document objects or the graph's
+    retrieved document dicts"""
+    versions = {}
+    for doc in documents:
+        if isinstance(doc, dict):
+            doc_id, content = doc.get("metadata", {}).get("id", doc.get("id")), doc.get("content")
+        else:
+            doc_id, content = doc.id, doc.content
+        if doc_id is not None and content is not None:
+            versions[doc_id] = content_hash(content)
+    return versions
+
+
+@dataclass
+class CachedAnswer:
+    """One answered question in the index"""
+    namespace: str
+    question: str
+    answer: Dict[str, Any]  # Whatever the caller returns for a hit
+    versions: Dict[Any, str]  # Documents the answer is grounded on
+    expires_at: float
+    similarity: float = 0.0  # Of the last lookup that matched
+
+
+class SemanticAnswerCache:
+    """
+    Nearest-neighbour answer cache over question embeddings.
+
+    Entries are grouped by namespace (callers whose answers have different
+    shapes, e.g. the graph and /api/query) and matched by cosine
+    similarity. A match above threshold is a hit only if every document
+    the answer was grounded on is among the freshly retrieved documents
+    with the same content; otherwise it is counted as stale and dropped.
+
+    Args:
+        ai_service: Embeds questions, and answers when auditing hits
+        threshold: Minimum cosine similarity for a hit
+        max_entries: Index size; the least recently used entry is replaced
+        ttl_seconds: Lifetime of an entry
+        audit_rate: Share of hits re-answered in the background
+        audit_threshold: Answer similarity below which an audited hit is false
+    """
+
+    def __init__(self, ai_service: IAIService, threshold: float = 0.9, max_entries: int = 512,
+                 ttl_seconds: int = 86400, audit_rate: float = 0.0, audit_threshold: float = 0.85):
+        self.ai = ai_service
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.audit_rate = audit_rate
+        self.audit_threshold = audit_threshold
+        self._vectors: Optional[np.ndarray] = None  # Unit-length rows, one per slot
+        self._entries: List[Optional[CachedAnswer]] = []
+        self._last_used: List[float] = []
+        self._audits: set = set()
+        self._stats = {"lookups": 0, "hits": 0, "misses": 0, "near_misses": 0, "stale": 0,
+                       "stores": 0, "audits": 0, "false_hits": 0}
+        self._hit_similarities: List[float] = []
+
+    async def embed(self, question: str) -> List[float]:
+        """Embedding of a question (the document key, as retrieval uses)"""
+        return await self.ai.generate_embedding(question)
+
+    def _unit(self, embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _best(self, namespace: str, vector: np.ndarray):
+        """(slot, similarity) of the closest live entry in namespace"""
+        if self._vectors is None or vector.shape[0] != self._vectors.shape[1]:
+            return None, 0.0
+        similarities = self._vectors @ vector
+        now = time.time()
+        best, best_similarity = None, -1.0
+        for slot in np.argsort(-similarities):
+            entry = self._entries[slot]
+            if entry is None or entry.namespace != namespace:
+                continue
+            if entry.expires_at <= now:
+                self._entries[slot] = None
+                continue
+            best, best_similarity = int(slot), float(similarities[slot])
+            break
+        return best, best_similarity
+
+    def lookup(self, namespace: str, embedding: List[float],
+               documents: List[Any]) -> Optional[CachedAnswer]:
+        """
+        Stored answer for a similar question, or None.
+
+        Args:
+            namespace: Caller the answer must come from
+            embedding: Embedding of the new question
+            documents: Documents just retrieved for the new question
+        """
+        self._stats["lookups"] += 1
+        slot, similarity = self._best(namespace, self._unit(embedding))
+        if slot is None or similarity < self.threshold:
+            if slot is not None and similarity >= self.threshold - 0.05:
+                self._stats["near_misses"] += 1
+            self._stats["misses"] += 1
+            return None
+
+        entry = self._entries[slot]
+        current = document_versions(documents)
+        if any(current.get(doc_id) != version for doc_id, version in entry.versions.items()):
+            # A source was edited, deleted or no longer retrieved for this question
+            self._stats["stale"] += 1
+            self._stats["misses"] += 1
+            self._entries[slot] = None
+            return None
+
+        self._stats["hits"] += 1
+        self._hit_similarities.append(similarity)
+        del self._hit_similarities[:-1000]
+        self._last_used[slot] = time.time()
+        entry.similarity = similarity
+        return entry
+
+    def store(self, namespace: str, question: str, embedding: List[float],
+              answer: Dict[str, Any], documents: List[Any]) -> None:
+        """
+        Add an answered question to the index.
+
+        Args:
+            namespace: Caller the answer belongs to
+            question: The question as asked
+            embedding: Its embedding
+            answer: What lookup returns for a hit
+            documents: Documents the answer is grounded on
+        """
+        vector = self._unit(embedding)
+        if self._vectors is None or vector.shape[0] != self._vectors.shape[1]:
+            # First entry, or the embedding model changed
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            self._entries = [None] * self.max_entries
+            self._last_used = [0.0] * self.max_entries
+
+        # Replace a near-duplicate, else a free slot, else the least recently used
+        slot, similarity = self._best(namespace, vector)
+        if slot is None or similarity < self.threshold:
+            free = [index for index, entry in enumerate(self._entries) if entry is None]
+            slot = free[0] if free else int(np.argmin(self._last_used))
+
+        self._vectors[slot] = vector
+        self._entries[slot] = CachedAnswer(
+            namespace=namespace,
+            question=question,
+            answer=answer,
+            versions=document_versions(documents),
+            expires_at=time.time() + self.ttl_seconds
+        )
+        self._last_used[slot] = time.time()
+        self._stats["stores"] += 1
+
+    def audit(self, question: str, entry: CachedAnswer,
+              regenerate: Callable[[], Awaitable[str]], answer_text: str) -> None:
+        """
+        Maybe re-answer a hit in the background and compare (audit_rate of
+        hits). A fresh answer that differs in meaning from the cached one
+        counts as a false hit and evicts the entry.
+
+        Args:
+            question: The question that hit
+            entry: The entry it hit
+            regenerate: Produces a fresh answer text for the question
+            answer_text: Text of the cached answer
+        """
+        if self.audit_rate <= 0 or random.random() >= self.audit_rate:
+            return
+        task = asyncio.ensure_future(self._audit(question, entry, regenerate, answer_text))
+        self._audits.add(task)
+        task.add_done_callback(self._audits.discard)
+
+    async def _audit(self, question: str, entry: CachedAnswer,
+                     regenerate: Callable[[], Awaitable[str]], answer_text: str) -> None:
+        try:
+            fresh = await regenerate()
+            cached_vector, fresh_vector = await self.ai.generate_embeddings([answer_text, fresh])
+        except Exception as e:
+            ai_logger.debug(f"Answer cache audit skipped: {e}")
+            return
+
+        self._stats["audits"] += 1
+        agreement = float(self._unit(cached_vector) @ self._unit(fresh_vector))
+        if agreement < self.audit_threshold:
+            self._stats["false_hits"] += 1
+            ai_logger.warning(
+                f"Answer cache false hit: {question!r} reused the answer to {entry.question!r} "
+                f"(question similarity {entry.similarity:.3f}, answer agreement {agreement:.3f})"
+            )
+            for slot, candidate in enumerate(self._entries):
+                if candidate is entry:
+                    self._entries[slot] = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, stale and near misses, and audited false-hit rate"""
+        stats = dict(self._stats)
+        lookups, audits = stats["lookups"], stats["audits"]
+        similarities = self._hit_similarities
+        return {
+            **stats,
+            "hit_rate": round(stats["hits"] / lookups, 4) if lookups else None,
+            "false_hit_rate": round(stats["false_hits"] / audits, 4) if audits else None,
+            "min_hit_similarity": round(min(similarities), 4) if similarities else None,
+            "mean_hit_similarity": round(sum(similarities) / len(similarities), 4) if similarities else None,
+            "size": sum(entry is not None for entry in self._entries),
+            "threshold": self.threshold
+        }
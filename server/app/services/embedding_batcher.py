@@ -0,0 +1,99 @@
+"""
+app/services/embedding_batcher.py
+Cross-request micro-batching for embedding calls.
+Concurrent requests are collected for a short window (or until the batch
+is full) and sent upstream as one batched call.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Tuple, Any
+
+from app.core.logging_config import ai_logger
+
+
+# Embeds a list of texts with the POI or document key, results in input order
+EmbedFunction = Callable[[List[str], bool], Awaitable[List[List[float]]]]
+
+
+class EmbeddingBatcher:
+    """
+    Collects single-text embedding requests from concurrent coroutines.
+
+    A batch is flushed window_ms after its first request, or immediately
+    once it holds max_batch_size texts. POI and document requests are
+    batched separately because they use different API keys. Identical
+    texts in a batch are embedded once.
+    """
+
+    def __init__(self, embed_fn: EmbedFunction, window_ms: float = 5.0,
+                 max_batch_size: int = 64):
+        self._embed_fn = embed_fn
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[bool, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[bool, asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+        self._stats = {"requests": 0, "batches": 0, "texts": 0, "max_batch": 0}
+
+    async def embed(self, text: str, use_poi_key: bool = False) -> List[float]:
+        """Embedding for one text, sent upstream with any concurrent requests"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(use_poi_key, [])
+        pending.append((text, future))
+        self._stats["requests"] += 1
+
+        if len(pending) >= self.max_batch_size:
+            self._flush(use_poi_key)
+        elif use_poi_key not in self._timers:
+            self._timers[use_poi_key] = loop.call_later(self.window, self._flush, use_poi_key)
+
+        return await future
+
+    def _flush(self, use_poi_key: bool) -> None:
+        """Hand the pending batch for a key type to a background task"""
+        timer = self._timers.pop(use_poi_key, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._pending.pop(use_poi_key, [])
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch, use_poi_key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]], use_poi_key: bool) -> None:
+        """Embed a batch and resolve each waiting future"""
+        # Callers that were cancelled while waiting don't need an embedding
+        texts = list(dict.fromkeys(text for text, future in batch if not future.done()))
+        if not texts:
+            return
+
+        self._stats["batches"] += 1
+        self._stats["texts"] += len(texts)
+        self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+
+        try:
+            embeddings = await self._embed_fn(texts, use_poi_key)
+        except Exception as e:
+            ai_logger.warning(f"Batched embedding of {len(texts)} texts failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(texts, embeddings))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
+
+        if len(batch) > 1:
+            key_type = "POI" if use_poi_key else "DOC"
+            ai_logger.debug(f"Embedded {len(batch)} requests [{key_type}] in one batch ({len(texts)} unique)")
+
+    def stats(self) -> Dict[str, Any]:
+        """Request, batch and text counts with the average batch size"""
+        stats = dict(self._stats)
+        stats["avg_batch"] = round(stats["requests"] / stats["batches"], 2) if stats["batches"] else None
+        stats["window_ms"] = self.window * 1000
+        stats["max_batch_size"] = self.max_batch_size
+        return stats
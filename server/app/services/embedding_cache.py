@@ -0,0 +1,128 @@
+"""
+app/services/embedding_cache.py
+Two-tier cache for text embeddings: a bounded in-process LRU in front of
+the shared ICacheService (Redis). Vectors are stored as float32 bytes.
+"""
+import base64
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any
+
+import numpy as np
+
+from app.services.interfaces import ICacheService
+from app.core.logging_config import ai_logger
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold, NFKC-normalize and collapse whitespace so trivial variants share a key"""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def embedding_cache_key(text: str, model: str, key_type: str) -> str:
+    """Cache key for an embedding of text by model with the given API key type"""
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"embedding:{model}:{key_type}:{digest}"
+
+
+def pack_embedding(embedding: List[float]) -> bytes:
+    """Encode an embedding as little-endian float32 bytes"""
+    return np.asarray(embedding, dtype="<f4").tobytes()
+
+
+def unpack_embedding(data: bytes) -> List[float]:
+    """Decode float32 bytes back into a list of floats"""
+    return np.frombuffer(data, dtype="<f4").tolist()
+
+
+class EmbeddingCache:
+    """
+    Embedding cache with an in-process LRU tier and an optional shared tier.
+
+    The LRU holds packed vectors (4 bytes per dimension). The shared tier
+    stores them base64-encoded, since ICacheService values are JSON.
+    Redis hits are promoted into the LRU.
+    """
+
+    def __init__(self, backend: Optional[ICacheService] = None,
+                 max_entries: int = 2048, ttl_seconds: int = 604800):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "backend_hits": 0, "misses": 0, "stores": 0}
+
+    def _remember(self, key: str, data: bytes) -> None:
+        """Insert into the LRU, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    async def get(self, text: str, model: str, key_type: str) -> Optional[List[float]]:
+        """Cached embedding for text, or None on a miss"""
+        key = embedding_cache_key(text, model, key_type)
+
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return unpack_embedding(data)
+
+        if self.backend is not None:
+            encoded = await self.backend.get(key)
+            if encoded:
+                try:
+                    data = base64.b64decode(encoded)
+                except (TypeError, ValueError) as e:
+                    ai_logger.warning(f"Discarding malformed cached embedding {key}: {e}")
+                else:
+                    self._remember(key, data)
+                    self._count("backend_hits")
+                    return unpack_embedding(data)
+
+        self._count("misses")
+        return None
+
+    async def set(self, text: str, model: str, key_type: str, embedding: List[float]) -> None:
+        """Store an embedding in both tiers"""
+        key = embedding_cache_key(text, model, key_type)
+        data = pack_embedding(embedding)
+        self._remember(key, data)
+        self._count("stores")
+
+        if self.backend is not None:
+            await self.backend.set(key, base64.b64encode(data).decode("ascii"), self.ttl_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, hit rates and LRU occupancy"""
+        with self._lock:
+            stats = dict(self._stats)
+            size = len(self._entries)
+        lookups = stats["memory_hits"] + stats["backend_hits"] + stats["misses"]
+        hits = stats["memory_hits"] + stats["backend_hits"]
+        return {
+            **stats,
+            "lookups": lookups,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "memory_hit_rate": round(stats["memory_hits"] / lookups, 4) if lookups else None,
+            "size": size,
+            "max_entries": self.max_entries,
+            "backend": type(self.backend).__name__ if self.backend is not None else None
+        }
+
+    def clear(self) -> None:
+        """Drop the in-process tier and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            for stat in self._stats:
+                self._stats[stat] = 0
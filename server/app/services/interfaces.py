@@ -4,53 +4,120 @@ Abstract service interfaces (contracts).
 Defines the contract that all implementations must follow.
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any, AsyncGenerator
+from typing import List, Dict, Optional, Any, AsyncGenerator, Sequence
 from models import POI, Document
 
 
 class IDatabase(ABC):
-    """Abstract database interface"""
+    """Abstract async database interface (awaited by services and routers)"""
     
     @abstractmethod
-    def connect(self) -> Any:
+    async def connect(self) -> Any:
         """Establish database connection"""
         pass
     
     @abstractmethod
-    def disconnect(self) -> None:
+    async def disconnect(self) -> None:
         """Close database connection"""
         pass
     
     @abstractmethod
-    def test_connection(self) -> bool:
+    async def test_connection(self) -> bool:
         """Test connectivity"""
         pass
     
     @abstractmethod
-    def insert_poi(self, poi: POI) -> int:
+    async def insert_poi(self, name: str, category: str, latitude: float,
+                         longitude: float, description: str = None,
+                         tags: List[str] = None, osm_id: int = None) -> int:
         """Insert POI and return ID"""
         pass
     
     @abstractmethod
-    def get_pois_by_category(self, category: str, limit: int = 10) -> List[Dict]:
+    async def get_pois_by_category(self, category: str, limit: int = 10) -> List[Dict]:
         """Fetch POIs by category"""
         pass
     
     @abstractmethod
-    def get_nearby_pois(self, latitude: float, longitude: float, 
-                       radius_km: float = 5, limit: int = 10) -> List[Dict]:
+    async def get_nearby_pois(self, latitude: float, longitude: float, 
+                              radius_km: float = 5, limit: int = 10) -> List[Dict]:
         """Find POIs near location"""
         pass
     
     @abstractmethod
-    def insert_document(self, doc: Document) -> int:
+    async def insert_document(self, title: str, content: str, source: str = None,
+                              tags: List[str] = None, embedding: Sequence[float] = None) -> int:
         """Store document with embedding"""
         pass
     
     @abstractmethod
-    def semantic_search(self, query_embedding: List[float], 
-                       limit: int = 5, threshold: float = 0.5) -> List[Dict]:
-        """Vector similarity search"""
+    async def bulk_upsert_documents(self, documents: List[Dict]) -> List[Dict]:
+        """Bulk-insert documents deduplicated on content hash"""
+        pass
+    
+    @abstractmethod
+    async def bulk_upsert_chunks(self, chunks: List[Dict]) -> List[Dict]:
+        """Bulk-insert document chunks deduplicated on hash"""
+        pass
+    
+    @abstractmethod
+    async def bulk_update_poi_embeddings(self, embeddings: List[tuple]) -> int:
+        """Bulk-set POI description embeddings from (poi_id, embedding) pairs"""
+        pass
+    
+    @abstractmethod
+    async def semantic_search(self, query_embedding: Sequence[float], 
+                              limit: int = 5, threshold: Optional[float] = 0.5,
+                              ef_search: Optional[int] = None, *,
+                              tags: Optional[List[str]] = None, source: Optional[str] = None,
+                              columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Vector similarity search with threshold and filters applied in SQL"""
+        pass
+    
+    @abstractmethod
+    async def semantic_search_chunks(self, query_embedding: Sequence[float], 
+                                     limit: int = 5, threshold: Optional[float] = 0.5,
+                                     ef_search: Optional[int] = None, *,
+                                     tags: Optional[List[str]] = None, source: Optional[str] = None,
+                                     content_type: Optional[str] = None,
+                                     columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Vector similarity search over scraped document chunks"""
+        pass
+    
+    @abstractmethod
+    async def semantic_search_pois(self, query_embedding: Sequence[float], limit: int = 10,
+                                   ef_search: Optional[int] = None, *,
+                                   threshold: Optional[float] = None,
+                                   tags: Optional[List[str]] = None, category: Optional[str] = None,
+                                   columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Vector similarity search over POIs"""
+        pass
+    
+    @abstractmethod
+    async def hybrid_search(self, query: str, query_embedding: Optional[Sequence[float]] = None,
+                            limit: int = 5, *, columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Fused full-text + vector document search (lexical-only without embedding)"""
+        pass
+    
+    @abstractmethod
+    async def has_full_text_search(self) -> bool:
+        """Whether documents have the full-text column hybrid_search ranks on"""
+        pass
+    
+    @abstractmethod
+    async def hybrid_search_chunks(self, query: str, query_embedding: Optional[Sequence[float]] = None,
+                                   limit: int = 5, *, columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Fused full-text + vector search over document chunks"""
+        pass
+    
+    @abstractmethod
+    async def search_pois_by_text(self, query: str, limit: int = 10) -> List[Dict]:
+        """Text-matching POI search (fallback when no embeddings)"""
+        pass
+    
+    @abstractmethod
+    async def execute_query(self, query: str, *params) -> List[Dict]:
+        """Execute a parameterized query and return rows"""
         pass
 
 
@@ -61,7 +128,12 @@ class IAIService(ABC):
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate text embedding"""
         pass
-    
+
+    @abstractmethod
+    async def generate_embeddings(self, texts: List[str], use_poi_key: bool = False) -> List[List[float]]:
+        """Generate embeddings for many texts in batched requests, in input order"""
+        pass
+
     @abstractmethod
     async def generate_text(self, prompt: str, temperature: float = 0.7) -> str:
         """Generate text response"""
@@ -77,12 +149,14 @@ class IVectorService(ABC):
     """Abstract vector search service"""
     
     @abstractmethod
-    async def search_documents(self, query: str, limit: int = 5) -> List[Document]:
+    async def search_documents(self, query: str, limit: int = 5,
+                               query_embedding: Optional[Sequence[float]] = None) -> List[Document]:
         """Search knowledge base by semantic similarity"""
         pass
     
     @abstractmethod
-    async def search_pois(self, query: str, limit: int = 10) -> List[POI]:
+    async def search_pois(self, query: str, limit: int = 10,
+                          query_embedding: Optional[Sequence[float]] = None) -> List[POI]:
         """Search POIs by semantic relevance"""
         pass
 
@@ -7,6 +7,7 @@ import networkx as nx
 from typing import List, Dict, Any, Optional, Tuple
 from geopy.distance import geodesic
 from app.core.logging_config import logger
+from app.core.singleflight import ThreadSingleFlight
 
 
 class OSMService:
@@ -20,15 +21,22 @@ class OSMService:
         """Initialize OSM service"""
         self.graph = None
         self.campus_graph_loaded = False
+        # Concurrent first requests share one graph download
+        self._graph_load = ThreadSingleFlight()
         logger.info("[OSMService] Initialized")
     
     def load_campus_graph(self) -> bool:
         """
-        Load ASTU campus road network from OSM
+        Load ASTU campus road network from OSM.
+        Concurrent callers wait for the download already in progress.
         
         Returns:
             True if successful, False otherwise
         """
+        return self._graph_load.do("campus_graph", self._download_campus_graph)
+    
+    def _download_campus_graph(self) -> bool:
+        """Download the campus walking network"""
         try:
             logger.info("[OSMService] Loading ASTU campus graph from OpenStreetMap...")
             
@@ -2,8 +2,9 @@
 app/services/rag_service.py
 Retrieval-Augmented Generation service for university Q&A.
 """
-from typing import AsyncGenerator, List
+from typing import AsyncGenerator, List, Optional
 from app.services.interfaces import IVectorService, IAIService
+from app.services.answer_cache import SemanticAnswerCache
 from app.core.exceptions import AIServiceException
 from app.core.logging_config import ai_logger
 
@@ -11,15 +12,18 @@ from app.core.logging_config import ai_logger
 class RAGService:
     """Retrieval-Augmented Generation for knowledge-based Q&A"""
     
-    def __init__(self, vector_service: IVectorService, ai_service: IAIService):
+    def __init__(self, vector_service: IVectorService, ai_service: IAIService,
+                 answer_cache: Optional[SemanticAnswerCache] = None):
         """
         Initialize with dependencies.
         Args:
             vector_service: For retrieving relevant documents
             ai_service: For generating answers
+            answer_cache: Reuses answers to earlier, similar questions
         """
         self.vector = vector_service
         self.ai = ai_service
+        self.answer_cache = answer_cache
     
     async def answer_question(self, question: str, max_sources: int = 5) -> dict:
         """
@@ -28,7 +32,8 @@ class RAGService:
         Process:
         1. Retrieve relevant documents
         2. Build context from documents
-        3. Generate answer using Gemini
+        3. Reuse the answer to a similar earlier question if its sources are unchanged
+        4. Otherwise generate answer using Gemini
         
         Args:
             question: User's question
@@ -38,48 +43,29 @@ class RAGService:
             ai_logger.info(f"Answering question: {question} (max_sources={max_sources})")
             
             # Retrieve relevant documents
-            documents = await self.vector.search_documents(question, limit=max_sources)
+            embedding, documents = await self._retrieve(question, max_sources)
             
             # Build context
             context = self._build_context(documents)
+            prompt = self._build_prompt(question, context)
+
+            cached = self._cached_answer(question, max_sources, embedding, documents, prompt)
+            if cached is not None:
+                return cached
 
             # Generate answer
-            prompt = self._build_prompt(question, context)
             answer_text = await self.ai.generate_text(prompt)
 
-            # Build sources list for response (as strings for QueryResponse model)
-            sources = []
-            for d in documents:
-                try:
-                    title = getattr(d, "title", None)
-                    source = getattr(d, "source", None)
-                    # Format as "title (source)" or just use available field
-                    if title and source:
-                        sources.append(f"{title} ({source})")
-                    elif title:
-                        sources.append(title)
-                    elif source:
-                        sources.append(source)
-                except Exception:
-                    # Fallback if document is a dict
-                    if isinstance(d, dict):
-                        title = d.get("title")
-                        source = d.get("source")
-                        if title and source:
-                            sources.append(f"{title} ({source})")
-                        elif title:
-                            sources.append(title)
-                        elif source:
-                            sources.append(source)
-
             ai_logger.info(f"Answer generated (len={len(answer_text)})")
 
-            return {
+            answer = {
                 "answer": answer_text,
-                "sources": sources,
+                "sources": self._format_sources(documents),
                 "confidence": 0.0,
                 "metadata": {"context_length": len(context)}
             }
+            self._store_answer(question, max_sources, embedding, answer, documents)
+            return answer
             
         except Exception as e:
             raise AIServiceException(f"RAG answer generation failed: {str(e)}")
@@ -98,17 +84,31 @@ class RAGService:
             ai_logger.info(f"Streaming answer to: {question} (max_sources={max_sources})")
             
             # Retrieve documents
-            documents = await self.vector.search_documents(question, limit=max_sources)
+            embedding, documents = await self._retrieve(question, max_sources)
             context = self._build_context(documents)
+            prompt = self._build_prompt(question, context)
+            
+            cached = self._cached_answer(question, max_sources, embedding, documents, prompt)
+            if cached is not None:
+                yield {"type": "token", "data": cached["answer"]}
+                return
             
             # Stream answer
-            prompt = self._build_prompt(question, context)
+            chunks = []
             async for chunk in self.ai.stream_text(prompt):
                 # Wrap streamed chunks as structured events for SSE
+                chunks.append(chunk)
                 yield {"type": "token", "data": chunk}
             
             ai_logger.info("Answer stream completed")
             
+            self._store_answer(question, max_sources, embedding, {
+                "answer": "".join(chunks),
+                "sources": self._format_sources(documents),
+                "confidence": 0.0,
+                "metadata": {"context_length": len(context)}
+            }, documents)
+            
         except Exception as e:
             raise AIServiceException(f"RAG stream failed: {str(e)}")
 
@@ -117,6 +117,69 @@ class RAGService:
         async for ev in self.stream_answer(question, max_sources=max_sources):
             yield ev
     
+    async def _retrieve(self, question: str, max_sources: int):
+        """(question embedding, documents); the embedding is only computed
+        here when the answer cache needs it, else search embeds the query.
+        If embedding fails the cache is bypassed and search falls back to
+        whatever it can do without a query embedding."""
+        embedding = None
+        if self.answer_cache is not None:
+            try:
+                embedding = await self.answer_cache.embed(question)
+            except Exception as e:
+                ai_logger.warning(f"Question embedding failed, skipping answer cache: {e}")
+        documents = await self.vector.search_documents(question, limit=max_sources,
+                                                       query_embedding=embedding)
+        return embedding, documents
+    
+    def _cached_answer(self, question: str, max_sources: int, embedding, documents: List,
+                       prompt: str) -> Optional[dict]:
+        """Stored answer to a similar question over unchanged sources, or None"""
+        if self.answer_cache is None or embedding is None:
+            return None
+        entry = self.answer_cache.lookup(f"query:{max_sources}", embedding, documents)
+        if entry is None:
+            return None
+        ai_logger.info(f"Reusing answer to {entry.question!r} (similarity {entry.similarity:.3f})")
+        self.answer_cache.audit(question, entry, lambda: self.ai.generate_text(prompt), entry.answer["answer"])
+        return {
+            **entry.answer,
+            "metadata": {**entry.answer.get("metadata", {}), "cached": True, "similarity": round(entry.similarity, 4)}
+        }
+    
+    def _store_answer(self, question: str, max_sources: int, embedding, answer: dict,
+                      documents: List) -> None:
+        """Index a generated answer for later similar questions"""
+        if self.answer_cache is not None and embedding is not None and documents and answer["answer"].strip():
+            self.answer_cache.store(f"query:{max_sources}", question, embedding, answer, documents)
+    
+    def _format_sources(self, documents: List) -> List[str]:
+        """Sources list for response (as strings for QueryResponse model)"""
+        sources = []
+        for d in documents:
+            try:
+                title = getattr(d, "title", None)
+                source = getattr(d, "source", None)
+                # Format as "title (source)" or just use available field
+                if title and source:
+                    sources.append(f"{title} ({source})")
+                elif title:
+                    sources.append(title)
+                elif source:
+                    sources.append(source)
+            except Exception:
+                # Fallback if document is a dict
+                if isinstance(d, dict):
+                    title = d.get("title")
+                    source = d.get("source")
+                    if title and source:
+                        sources.append(f"{title} ({source})")
+                    elif title:
+                        sources.append(title)
+                    elif source:
+                        sources.append(source)
+        return sources
+    
     def _build_context(self, documents: List) -> str:
         """Build context string from retrieved documents"""
         if not documents:
@@ -0,0 +1,282 @@
+"""
+app/services/rate_limiter.py
+Adaptive client-side rate limiting for upstream AI APIs.
+
+Each API key gets token buckets for its request and token quotas. The
+allowed rate adapts AIMD-style: it grows additively after successes and
+is halved when the API answers 429, and Retry-After pauses the key. With
+Redis configured, bucket and pause state is shared across workers.
+"""
+import asyncio
+import hashlib
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Any
+
+from app.core.logging_config import ai_logger
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+BURST_SECONDS = 5.0  # Bucket capacity, in seconds of quota
+AIMD_INCREASE = 0.05  # Fraction of the quota regained per successful call
+AIMD_DECREASE = 0.5  # Rate multiplier on 429
+AIMD_MIN_FRACTION = 0.05  # Lowest rate, as a fraction of the quota
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket with an adjustable refill rate.
+
+    Reservations may drive the balance negative; the returned wait is the
+    time until the reservation is covered, so waiters queue in order.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.time()
+
+    def reserve(self, cost: float, now: Optional[float] = None) -> float:
+        """Debit cost and return seconds until it is covered"""
+        now = time.time() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= cost
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+# Atomic shared token bucket: KEYS[1] bucket hash, ARGV rate, capacity, cost, now.
+# Returns seconds to wait, including any Retry-After pause on the key.
+_RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated', 'paused_until')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+local paused_until = tonumber(state[3]) or 0
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate) - tonumber(ARGV[3])
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], 3600)
+local wait = 0
+if tokens < 0 then wait = -tokens / rate end
+return tostring(math.max(wait, paused_until - now))
+"""
+
+# Extend the pause on a key: KEYS[1] bucket hash, ARGV paused_until
+_PAUSE_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], 'paused_until')) or 0
+if tonumber(ARGV[1]) > current then
+    redis.call('HSET', KEYS[1], 'paused_until', ARGV[1])
+    redis.call('EXPIRE', KEYS[1], 3600)
+end
+return 1
+"""
+
+
+class RedisLimiterStore:
+    """Shares limiter buckets and pauses between workers through Redis"""
+
+    def __init__(self, redis_url: str, prefix: str = "ratelimit"):
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self._client = None
+        self.available = REDIS_AVAILABLE and bool(redis_url)
+
+    async def _get_client(self):
+        """Lazy-load Redis client"""
+        if self._client is None:
+            self._client = aioredis.from_url(self.redis_url, decode_responses=True)
+        return self._client
+
+    async def reserve(self, bucket: str, rate: float, capacity: float, cost: float) -> Optional[float]:
+        """Reserve cost from a shared bucket; None when Redis is unreachable"""
+        if not self.available:
+            return None
+        try:
+            client = await self._get_client()
+            wait = await client.eval(
+                _RESERVE_SCRIPT, 1, f"{self.prefix}:{bucket}", rate, capacity, cost, time.time()
+            )
+            return float(wait)
+        except Exception as e:
+            ai_logger.warning(f"Shared rate limiter unavailable, using local limits: {e}")
+            self.available = False
+            return None
+
+    async def pause(self, bucket: str, until: float) -> None:
+        """Pause a shared bucket until the given UNIX time"""
+        if not self.available:
+            return
+        try:
+            client = await self._get_client()
+            await client.eval(_PAUSE_SCRIPT, 1, f"{self.prefix}:{bucket}", until)
+        except Exception as e:
+            ai_logger.warning(f"Failed to share rate limit pause: {e}")
+
+    async def close(self):
+        """Close Redis connection"""
+        if self._client:
+            await self._client.close()
+            self._client = None
+
+
+class AdaptiveRateLimiter:
+    """
+    Request and token quotas for one API key with AIMD rate adaptation.
+
+    Args:
+        name: Bucket name (shared across workers when a store is given)
+        rpm: Requests per minute allowed by the provider
+        tpm: Tokens per minute allowed by the provider (None = unlimited)
+        store: Optional shared store; local buckets are used without it
+    """
+
+    def __init__(self, name: str, rpm: float, tpm: Optional[float] = None,
+                 store: Optional[RedisLimiterStore] = None):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.store = store
+        self.fraction = 1.0  # Current rate as a fraction of the quota
+        self.paused_until = 0.0
+        self.requests = TokenBucket(rpm / 60, max(1.0, rpm / 60 * BURST_SECONDS))
+        self.tokens = TokenBucket(tpm / 60, max(1.0, tpm / 60 * BURST_SECONDS)) if tpm else None
+        self._stats = {"requests": 0, "throttled": 0, "waited_s": 0.0}
+
+    def _buckets(self, cost: float):
+        """(name, bucket, cost) for each quota a call consumes"""
+        yield "requests", self.requests, 1.0
+        if self.tokens is not None and cost:
+            yield "tokens", self.tokens, cost
+
+    def reserve(self, cost: float = 0) -> float:
+        """Reserve one request (and cost tokens) locally; returns seconds to wait"""
+        now = time.time()
+        wait = max(bucket.reserve(units, now) for _, bucket, units in self._buckets(cost))
+        wait = max(wait, self.paused_until - now)
+        self._stats["requests"] += 1
+        self._stats["waited_s"] += wait
+        return wait
+
+    async def acquire(self, cost: float = 0) -> None:
+        """Wait until a call costing cost tokens fits the quotas"""
+        if self.store is None:
+            wait = self.reserve(cost)
+        else:
+            # Each quota is charged exactly once: in Redis, or locally when
+            # the shared reservation fails (a bucket already reserved in
+            # Redis is not charged again if a later one falls back)
+            waits = []
+            for kind, bucket, units in self._buckets(cost):
+                shared = await self.store.reserve(f"{self.name}:{kind}", bucket.rate, bucket.capacity, units)
+                waits.append(shared if shared is not None else bucket.reserve(units))
+            wait = max(max(waits), self.paused_until - time.time())
+            self._stats["requests"] += 1
+            self._stats["waited_s"] += wait
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def _set_fraction(self, fraction: float) -> None:
+        """Scale the bucket refill rates to a fraction of the quota"""
+        self.fraction = min(1.0, max(AIMD_MIN_FRACTION, fraction))
+        self.requests.rate = self.rpm / 60 * self.fraction
+        if self.tokens is not None:
+            self.tokens.rate = self.tpm / 60 * self.fraction
+
+    def succeeded(self) -> None:
+        """Additive increase after a successful call"""
+        if self.fraction < 1.0:
+            self._set_fraction(self.fraction + AIMD_INCREASE)
+
+    def throttled(self, retry_after: Optional[float] = None) -> float:
+        """
+        Multiplicative decrease after a 429, pausing the key for
+        Retry-After seconds (or one request interval at the new rate).
+        Returns the pause length.
+        """
+        self._set_fraction(self.fraction * AIMD_DECREASE)
+        pause = retry_after if retry_after is not None else 1 / self.requests.rate
+        self.paused_until = max(self.paused_until, time.time() + pause)
+        self._stats["throttled"] += 1
+        return pause
+
+    async def share_pause(self) -> None:
+        """Propagate the current pause to other workers through the store"""
+        if self.store is not None:
+            for kind, _, _ in self._buckets(1):
+                await self.store.pause(f"{self.name}:{kind}", self.paused_until)
+
+    def stats(self) -> Dict[str, Any]:
+        """Call counts, time spent waiting and the current adapted rate"""
+        return {
+            **self._stats,
+            "waited_s": round(self._stats["waited_s"], 3),
+            "rpm": round(self.rpm * self.fraction, 2),
+            "paused_for_s": round(max(0.0, self.paused_until - time.time()), 3)
+        }
+
+
+class KeyPool:
+    """
+    Round-robin over the API keys of one provider, each with its own limiter.
+    Keys paused by Retry-After are skipped while another key is available.
+    """
+
+    def __init__(self, name: str, keys: List[str], rpm: float, tpm: Optional[float] = None,
+                 store: Optional[RedisLimiterStore] = None):
+        self.name = name
+        self.keys = list(dict.fromkeys(key for key in keys if key))
+        # Bucket names use a key fingerprint so workers sharing Redis share quotas
+        self.limiters = [
+            AdaptiveRateLimiter(
+                f"{name}:{hashlib.sha256(key.encode()).hexdigest()[:12]}", rpm, tpm, store
+            )
+            for key in self.keys
+        ]
+        self._next = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    def choose(self) -> "tuple[str, AdaptiveRateLimiter]":
+        """Next key in rotation that isn't paused (else the one free soonest)"""
+        now = time.time()
+        count = len(self.keys)
+        for offset in range(count):
+            index = (self._next + offset) % count
+            if self.limiters[index].paused_until <= now:
+                self._next = index + 1
+                return self.keys[index], self.limiters[index]
+        index = min(range(count), key=lambda i: self.limiters[i].paused_until)
+        return self.keys[index], self.limiters[index]
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-key limiter stats (keys identified by position)"""
+        return {f"key_{i}": limiter.stats() for i, limiter in enumerate(self.limiters)}
+
+
+def split_keys(*values: Optional[str]) -> List[str]:
+    """Flatten single keys and comma-separated key lists"""
+    return [key.strip() for value in values if value for key in value.split(",") if key.strip()]
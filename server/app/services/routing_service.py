@@ -85,8 +85,8 @@ class RoutingService(IRoutingService):
             
             # Find start and end POIs
             # In MVP: Direct lookup or search
-            start_poi = self._find_poi_by_name(start_name)
-            end_poi = self._find_poi_by_name(end_name)
+            start_poi = await self._find_poi_by_name(start_name)
+            end_poi = await self._find_poi_by_name(end_name)
             
             if not start_poi or not end_poi:
                 raise LocationNotFound(start_name if not start_poi else end_name)
@@ -207,7 +207,7 @@ class RoutingService(IRoutingService):
             routing_logger.error(f"Service search failed: {str(e)}")
             raise RouteCalculationError(f"Service search failed: {str(e)}")
     
-    def _find_poi_by_name(self, name: str) -> Dict[str, Any]:
+    async def _find_poi_by_name(self, name: str) -> Dict[str, Any]:
         """
         Find POI by name (MVP implementation).
         Future: Use vector search for fuzzy matching.
@@ -216,7 +216,7 @@ class RoutingService(IRoutingService):
         categories = name.lower().split()
         
         for category in categories:
-            pois = self.db.get_pois_by_category(category, limit=1)
+            pois = await self.db.get_pois_by_category(category, limit=1)
             if pois:
                 return pois[0]
         
@@ -2,10 +2,11 @@
 app/services/vector_service.py
 Vector search service using pgvector and embeddings.
 """
-from typing import List
+from typing import List, Optional, Sequence
 from app.services.interfaces import IVectorService, IAIService, IDatabase
-from app.core.exceptions import VectorSearchError
+from app.core.exceptions import VectorSearchError, RateLimitError, CircuitOpenError
 from app.core.logging_config import vector_logger
+from config import settings
 from models import Document, POI
 
 
@@ -21,24 +22,68 @@ class VectorSearchService(IVectorService):
         """
         self.db = db_service
         self.ai = ai_service
+        self._full_text: Optional[bool] = None  # documents.search_vector exists
     
-    async def search_documents(self, query: str, limit: int = 5) -> List[Document]:
+    async def _has_full_text(self) -> bool:
+        """Whether lexical-only search is available (checked once)"""
+        if self._full_text is None:
+            try:
+                self._full_text = await self.db.has_full_text_search()
+            except Exception as e:
+                vector_logger.warning(f"Could not check for full-text search: {e}")
+                return False
+        return self._full_text
+    
+    async def search_documents(self, query: str, limit: int = 5,
+                               query_embedding: Optional[Sequence[float]] = None) -> List[Document]:
         """
         Search knowledge base documents by semantic similarity.
         
         Process:
         1. Generate embedding for query using AI
-        2. Search pgvector index in database
+        2. Search pgvector index in database (fused with full-text rank
+           when db_hybrid_search is on)
         3. Return top matches
+        
+        A failed embedding call degrades to full-text search instead of
+        failing the RAG pipeline: always in hybrid mode, and otherwise
+        when documents.search_vector exists (create_tables or
+        migrate_fulltext.py). A query_embedding computed earlier (e.g.
+        prefetched by the graph) skips step 1.
         """
         try:
             vector_logger.info(f"Searching documents for: {query[:50]}...")
+            columns = ("id", "title", "content", "source", "tags")
             
-            # Generate query embedding
-            query_embedding = await self.ai.generate_embedding(query)
-            
-            # Search database
-            results = self.db.semantic_search(query_embedding, limit=limit)
+            if settings.db_hybrid_search:
+                try:
+                    if query_embedding is None:
+                        query_embedding = await self.ai.generate_embedding(query)
+                except Exception as e:
+                    vector_logger.warning(f"Query embedding failed, using lexical-only search: {e}")
+                    query_embedding = None
+                
+                results = await self.db.hybrid_search(
+                    query, query_embedding, limit=limit, columns=columns
+                )
+            else:
+                # Generate query embedding
+                try:
+                    if query_embedding is None:
+                        query_embedding = await self.ai.generate_embedding(query)
+                except Exception as e:
+                    if not await self._has_full_text():
+                        raise
+                    vector_logger.warning(f"Query embedding failed, using full-text search: {e}")
+                    query_embedding = None
+                
+                # Search database
+                if query_embedding is None:
+                    results = await self.db.hybrid_search(query, None, limit=limit, columns=columns)
+                else:
+                    results = await self.db.semantic_search(
+                        query_embedding, limit=limit, columns=columns
+                    )
             
             documents = [
                 Document(
@@ -57,11 +102,13 @@ class VectorSearchService(IVectorService):
         except Exception as e:
             raise VectorSearchError(f"Document search failed: {str(e)}")
     
-    async def search_pois(self, query: str, limit: int = 10) -> List[POI]:
+    async def search_pois(self, query: str, limit: int = 10,
+                          query_embedding: Optional[Sequence[float]] = None) -> List[POI]:
         """
         Search POIs by semantic relevance using Voyage embeddings.
         
         Falls back to category matching if embeddings not available.
+        A query_embedding computed earlier (POI key) skips the Voyage call.
         """
         try:
             vector_logger.info(f"Searching POIs for: {query}")
@@ -69,10 +116,11 @@ class VectorSearchService(IVectorService):
             # Try semantic search first (skip if rate limited)
             try:
                 # Generate query embedding using POI-specific Voyage key
-                query_embedding = await self.ai.generate_embedding(query, use_poi_key=True)
+                if query_embedding is None:
+                    query_embedding = await self.ai.generate_embedding(query, use_poi_key=True)
                 
-                # Use synchronous database method (pgvector search)
-                results = self.db.semantic_search_pois(query_embedding, limit=limit)
+                # pgvector search on the async pool
+                results = await self.db.semantic_search_pois(query_embedding, limit=limit)
                 
                 if results:
                     pois = [
@@ -91,12 +139,19 @@ class VectorSearchService(IVectorService):
                     vector_logger.info(f"Found {len(pois)} POIs via semantic search (best: {pois[0].similarity:.2f})")
                     return pois
                     
+            except RateLimitError as e:
+                vector_logger.warning(
+                    f"Voyage rate limited (retry after {e.retry_after or 0:.1f}s), "
+                    f"using text-based POI fallback"
+                )
+            except CircuitOpenError as e:
+                vector_logger.info(f"{e}, using text-based POI fallback")
             except Exception as e:
                 vector_logger.warning(f"Semantic POI search failed, using text-based fallback: {e}")
             
             # Fallback: Enhanced text-based search (name, category, description)
             try:
-                results = self.db.search_pois_by_text(query, limit=limit)
+                results = await self.db.search_pois_by_text(query, limit=limit)
                 
                 pois = [
                     POI(
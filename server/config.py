@@ -22,19 +22,150 @@ class Settings(BaseSettings):
     # Database
     database_url: str
     
+    # Database Connection Pool
+    db_pool_enabled: bool = True
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 10
+    db_pool_max_idle: float = 300.0  # Seconds before an idle connection is closed
+    db_pool_timeout: float = 30.0  # Seconds to wait for a free connection
+    db_pool_check: bool = True  # Validate connections before handing them out
+    
+    # Spatial POI queries: "bbox" (lat/lng btree prefilter + haversine) or
+    # "postgis" (GiST index on pois.location, requires migrate_spatial.py)
+    db_spatial_mode: str = "bbox"
+    
+    # POI text search: "like" (substring match on each column) or "trigram"
+    # (pg_trgm GIN index on pois.search_text, requires migrate_trigram.py)
+    db_text_search_mode: str = "like"
+    
+    # Vector indexes: "ivfflat" or "hnsw" (rebuild with migrate_vector_index.py)
+    db_vector_index: str = "ivfflat"
+    db_ivfflat_probes: int = 10  # Lists scanned per query (recall vs speed)
+    db_hnsw_m: int = 16  # Graph links per node
+    db_hnsw_ef_construction: int = 64  # Candidate list size while building
+    db_hnsw_ef_search: int = 40  # Candidate list size per query
+    # pgvector >= 0.8: keep scanning the index until filtered searches fill
+    # their LIMIT ("off", "relaxed_order" or "strict_order")
+    db_vector_iterative_scan: str = "off"
+    
+    # Key single document inserts and admin writes on the content hash, so
+    # they dedupe against bulk ingestion (requires migrate_document_hash.py
+    # on databases created before documents.hash; startup checks the index)
+    db_document_hash: bool = False
+    
+    # Hybrid document retrieval (requires migrate_fulltext.py): reciprocal
+    # rank fusion of full-text and vector rankings, full-text only when no
+    # query embedding is available. With it off, a failed query embedding
+    # still falls back to full-text search if documents.search_vector exists
+    db_hybrid_search: bool = False
+    db_hybrid_rrf_k: int = 60  # Damps the weight of top ranks in the fusion
+    db_hybrid_candidates: int = 40  # Rows taken from each ranking before fusion
+    
+    # Query instrumentation (see /metrics): queries slower than
+    # db_slow_query_ms are logged with their plan, captured in the background
+    # on another connection (EXPLAIN (ANALYZE, BUFFERS) for reads, plain
+    # EXPLAIN for writes so they aren't executed twice)
+    db_slow_query_ms: float = 500.0
+    db_slow_query_explain: bool = True
+    db_slow_query_explain_interval: float = 60.0  # Min seconds between plans per method
+    
     # Gemini AI Configuration
     ai_model: str = "gemini-2.5-flash"
     ai_api_key: str
     ai_stream_timeout: int = 30
+    ai_api_keys: Optional[str] = None  # Extra comma-separated keys, used round-robin
+    ai_rpm: float = 60  # Gemini requests per minute per key
+    # Graph node LLM clients (see LLMRegistry): shared per MODEL_CONFIGS entry
+    llm_http2: bool = True
+    llm_keepalive_seconds: float = 120.0  # Idle time before pooled connections close
+    llm_max_concurrency: int = 8  # Default when a model config sets no limit
+    llm_warmup: bool = True  # Open client connections at startup
+    # Local intent classifier: queries it labels with at least this calibrated
+    # probability skip the LLM classifier (see scripts/train_intent_classifier.py)
+    intent_local_enabled: bool = True
+    intent_local_threshold: float = 0.8
+    intent_model_path: str = "data/intent_classifier.joblib"
+    intent_data_path: str = "data/intent_queries.jsonl"  # Seeded training queries
+    intent_log_path: Optional[str] = "data/intent_queries_logged.jsonl"  # LLM-labelled queries
+    # One structured-output LLM call returning intent plus origin/destination
+    # mentions and service category, used by geo reasoning instead of regexes
+    intent_fused_extraction: bool = False
+    # Cross-request intent micro-batching: concurrent LLM classifications are
+    # collected for a few milliseconds and sent as one prompt (0 disables)
+    intent_batch_window_ms: float = 0.0
+    intent_batch_max_size: int = 16
+    # Start the document and POI query embeddings when a graph run starts,
+    # overlapping intent classification; unused ones are cancelled
+    embedding_prefetch: bool = True
+    # Whole-workflow response cache: final answers keyed on the normalized
+    # query (plus mode, urgency and geohash cell of the location for geo
+    # intents); admin POI/document writes invalidate dependent answers.
+    # Invalidation only reaches every worker through Redis: without it the
+    # cache is per process, so it is only used with a single worker
+    # (WEB_CONCURRENCY=1) and is disabled otherwise
+    response_cache_enabled: bool = True
+    response_cache_size: int = 1024  # Entries kept in process when Redis isn't configured
+    response_cache_geohash_precision: int = 7  # ~150 m cells
+    response_cache_ttl_navigation: int = 3600  # Seconds per intent (0 = don't cache)
+    response_cache_ttl_nearby_service: int = 900
+    response_cache_ttl_university_info: int = 21600
+    response_cache_ttl_mixed: int = 1800
+    # Semantic answer cache for UNIVERSITY_INFO and /api/query: the answer to
+    # an earlier question at least this similar is reused when the documents
+    # it cites are retrieved again unchanged. A sample of hits is re-answered
+    # in the background to count false hits (see /metrics)
+    answer_cache_enabled: bool = True
+    answer_cache_threshold: float = 0.9  # Cosine similarity of question embeddings
+    answer_cache_size: int = 512
+    answer_cache_ttl: int = 86400  # Seconds
+    answer_cache_audit_rate: float = 0.02  # Share of hits audited
+    answer_cache_audit_threshold: float = 0.85  # Answer agreement below which a hit was false
     embedding_model: str = "text-embedding-004"
     
     # Voyage AI Configuration
     voyage_api_key: Optional[str] = None
     voyage_poi_api_key: Optional[str] = None
+    voyage_api_keys: Optional[str] = None  # Extra comma-separated document keys
+    voyage_poi_api_keys: Optional[str] = None  # Extra comma-separated POI keys
+    voyage_rpm: float = 300  # Requests per minute per key
+    voyage_tpm: float = 1000000  # Tokens per minute per key
+    # Batched embedding requests: Voyage accepts up to 128 inputs per call and
+    # caps total tokens per call (320K for voyage-2); tokens are estimated
+    voyage_batch_size: int = 128
+    voyage_batch_max_tokens: int = 120000
+    
+    # Query embedding cache: in-process LRU backed by Redis (when configured),
+    # keyed on normalized text, model and API key type
+    embedding_cache_enabled: bool = True
+    embedding_cache_size: int = 2048  # Vectors kept in process (~4 KB each)
+    embedding_cache_ttl: int = 604800  # Seconds in Redis (7 days)
+    
+    # Cross-request embedding micro-batching: concurrent query embeddings are
+    # collected for a few milliseconds and sent as one Voyage call (0 disables)
+    embedding_batch_window_ms: float = 5.0
+    embedding_batch_max_size: int = 64  # Flush early once this many texts wait
+    
+    # Upstream rate limiting: token buckets per key, rate halved on 429 and
+    # regained gradually, Retry-After honoured; state optionally shared
+    # across workers through REDIS_URL
+    ai_rate_limit_retries: int = 3  # Retries after a 429 before giving up
+    ai_rate_limit_shared: bool = False
+    
+    # Circuit breakers per upstream (Voyage, Gemini): open when the error or
+    # slow-call rate over the recent window crosses its threshold, fail fast
+    # while open, then admit probe calls after the cool-down
+    breaker_window: int = 20  # Recent calls the rates are computed over
+    breaker_min_calls: int = 5
+    breaker_failure_rate: float = 0.5
+    breaker_slow_call_ms: float = 5000.0
+    breaker_slow_call_rate: float = 0.8
+    breaker_open_seconds: float = 30.0
+    breaker_half_open_calls: int = 2  # Successful probes needed to close
     
     # Server Configuration
     port: int = int(os.getenv("PORT", "4000"))
     host: str = "0.0.0.0"
+    web_concurrency: int = 1  # Uvicorn worker processes (WEB_CONCURRENCY)
     node_env: str = "development"
     
     # Redis Cache (Optional)
@@ -3,21 +3,969 @@ Database connection and pgvector helpers for ASTU Route AI.
 Handles Postgres/Supabase connections and vector operations.
 """
 import psycopg
-from psycopg import Connection, AsyncConnection
+import numpy as np
+from psycopg import Connection, AsyncConnection, sql
+from psycopg.adapt import Dumper
+from psycopg.pq import Format
 from psycopg.rows import dict_row
+from psycopg.types import TypeInfo
+from psycopg.types.json import Jsonb
+from psycopg_pool import ConnectionPool, AsyncConnectionPool
+from contextlib import contextmanager, asynccontextmanager
+from dataclasses import dataclass
 from config import settings
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterable, Iterator, AsyncIterator, Sequence, Union
+from app.services.interfaces import IDatabase
+from app.core.metrics import db_metrics
+from datetime import datetime
+import asyncio
+import hashlib
 import logging
+import math
+import re
+import struct
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+Query = Union[str, sql.Composable]
 
-class Database:
+KM_PER_DEGREE = 111.045  # Length of one degree of latitude
+
+
+# Query SQL shared by the sync and async database classes
+INSERT_POI_SQL = """
+    INSERT INTO pois (name, category, latitude, longitude, description, tags, osm_id)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    RETURNING id;
+"""
+
+POIS_BY_CATEGORY_SQL = """
+    SELECT * FROM pois WHERE category = %s LIMIT %s;
+"""
+
+# Nearby POIs (bbox mode): the lat/lng box lets pois_location_idx discard
+# far rows before the haversine distance is computed once per candidate
+NEARBY_POIS_BBOX_SQL = """
+    SELECT * FROM (
+        SELECT 
+            id, name, category, latitude, longitude, description,
+            (6371 * acos(LEAST(1.0, cos(radians(%(lat)s)) * cos(radians(latitude)) * 
+             cos(radians(longitude) - radians(%(lng)s)) + 
+             sin(radians(%(lat)s)) * sin(radians(latitude))))) AS distance_km
+        FROM pois
+        WHERE latitude BETWEEN %(min_lat)s AND %(max_lat)s
+          AND longitude BETWEEN %(min_lng)s AND %(max_lng)s
+    ) candidates
+    WHERE distance_km <= %(radius_km)s
+    ORDER BY distance_km
+    LIMIT %(limit)s;
+"""
+
+# Nearby POIs (postgis mode): ST_DWithin prefilters on the GiST index and
+# <-> returns rows in KNN order straight from the index
+NEARBY_POIS_POSTGIS_SQL = """
+    SELECT 
+        id, name, category, latitude, longitude, description,
+        ST_Distance(location, origin.point) / 1000.0 AS distance_km
+    FROM pois,
+         (SELECT ST_SetSRID(ST_MakePoint(%(lng)s, %(lat)s), 4326)::geography AS point) origin
+    WHERE ST_DWithin(location, origin.point, %(radius_m)s)
+    ORDER BY location <-> origin.point
+    LIMIT %(limit)s;
+"""
+
+INSERT_DOCUMENT_SQL = """
+    INSERT INTO documents (title, content, source, tags, embedding)
+    VALUES (%s, %s, %s, %s, %s)
+    RETURNING id;
+"""
+
+# With db_document_hash: the same content hash key as the bulk merge, so
+# single inserts and bulk ingestion dedupe against each other
+UPSERT_DOCUMENT_SQL = """
+    INSERT INTO documents (title, content, source, tags, embedding, hash)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON CONFLICT (hash) DO UPDATE SET
+        title = EXCLUDED.title,
+        source = EXCLUDED.source,
+        tags = EXCLUDED.tags,
+        embedding = COALESCE(EXCLUDED.embedding, documents.embedding)
+    RETURNING id;
+"""
+
+# Unique index on documents.hash that UPSERT_DOCUMENT_SQL merges against
+# (from create_tables or migrate_document_hash.py)
+DOCUMENT_HASH_INDEX_SQL = """
+    SELECT 1 FROM pg_index i
+    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+    WHERE i.indrelid = to_regclass('documents') AND i.indisunique
+      AND i.indnatts = 1 AND a.attname = 'hash';
+"""
+
+# documents.search_vector, which full-text ranking needs (from create_tables
+# or migrate_fulltext.py)
+SEARCH_VECTOR_COLUMN_SQL = """
+    SELECT 1 FROM information_schema.columns
+    WHERE table_schema = current_schema() AND table_name = 'documents'
+      AND column_name = 'search_vector';
+"""
+
+# Vector search (see _vector_search_query): columns callers may project and
+# filters pushed into the WHERE clause next to the similarity threshold
+DOCUMENT_SEARCH_COLUMNS = ("id", "title", "content", "source", "tags", "created_at")
+DOCUMENT_SEARCH_DEFAULTS = ("id", "title", "content", "source")
+DOCUMENT_SEARCH_FILTERS = {
+    "tags": "tags && %(tags)s",
+    "source": "source = %(source)s",
+}
+
+CHUNK_SEARCH_COLUMNS = ("id", "content", "source_url", "metadata", "language",
+                        "date_scraped", "token_count", "created_at")
+CHUNK_SEARCH_DEFAULTS = ("id", "content", "source_url", "metadata")
+CHUNK_SEARCH_FILTERS = {
+    "tags": "metadata->'tags' ?| %(tags)s",
+    "source": "source_url = %(source)s",
+    "content_type": "metadata->>'content_type' = %(content_type)s",
+}
+
+POI_SEARCH_COLUMNS = ("id", "name", "category", "latitude", "longitude", "description",
+                      "building", "block_num", "floor", "room_num", "capacity",
+                      "facilities", "tags", "osm_id")
+POI_SEARCH_DEFAULTS = ("id", "name", "category", "latitude", "longitude",
+                       "description", "tags")
+POI_SEARCH_FILTERS = {
+    "tags": "tags && %(tags)s",
+    "category": "category = %(category)s",
+}
+
+# Per-query ef_search override (transaction-local)
+LOCAL_EF_SEARCH_SQL = """
+    SELECT set_config('hnsw.ef_search', %s, true);
+"""
+
+SEARCH_POIS_BY_TEXT_SQL = """
+    SELECT 
+        id, name, category, latitude, longitude, 
+        description, tags
+    FROM pois
+    WHERE 
+        LOWER(name) LIKE %s
+        OR LOWER(category) LIKE %s
+        OR LOWER(description) LIKE %s
+        OR LOWER(tags::text) LIKE %s
+    ORDER BY 
+        CASE 
+            WHEN LOWER(name) = %s THEN 1
+            WHEN LOWER(category) = %s THEN 2
+            WHEN LOWER(name) LIKE %s THEN 3
+            WHEN LOWER(category) LIKE %s THEN 4
+            ELSE 5
+        END
+    LIMIT %s;
+"""
+
+# Fuzzy POI search (trigram mode): <% matches the query against words in the
+# precomputed search_text column on its GIN index, so typos like "libary"
+# still hit; name matches win ties
+SEARCH_POIS_BY_TRIGRAM_SQL = """
+    SELECT 
+        id, name, category, latitude, longitude, 
+        description, tags,
+        GREATEST(word_similarity(%(query)s, lower(name)),
+                 word_similarity(%(query)s, search_text)) AS similarity
+    FROM pois
+    WHERE %(query)s <%% search_text
+    ORDER BY similarity DESC, word_similarity(%(query)s, lower(name)) DESC
+    LIMIT %(limit)s;
+"""
+
+
+# Bulk ingestion: rows are streamed into an ON COMMIT DROP staging table
+# with binary COPY, then merged into the real table in a single statement.
+# DISTINCT ON keeps one row per hash so a batch can't conflict with itself.
+DOCUMENTS_STAGING_SQL = """
+    CREATE TEMP TABLE documents_staging (
+        title TEXT, content TEXT, source TEXT, tags TEXT[],
+        embedding vector, hash TEXT
+    ) ON COMMIT DROP;
+"""
+
+COPY_DOCUMENTS_SQL = """
+    COPY documents_staging (title, content, source, tags, embedding, hash)
+    FROM STDIN (FORMAT BINARY)
+"""
+
+DOCUMENT_COPY_TYPES = ["text", "text", "text", "text[]", "vector", "text"]
+
+MERGE_DOCUMENTS_SQL = """
+    INSERT INTO documents (title, content, source, tags, embedding, hash)
+    SELECT DISTINCT ON (hash) title, content, source, tags, embedding, hash
+    FROM documents_staging
+    ORDER BY hash
+    ON CONFLICT (hash) DO UPDATE SET
+        title = EXCLUDED.title,
+        source = EXCLUDED.source,
+        tags = EXCLUDED.tags,
+        embedding = COALESCE(EXCLUDED.embedding, documents.embedding)
+    RETURNING id, hash, (xmax = 0) AS inserted;
+"""
+
+CHUNKS_STAGING_SQL = """
+    CREATE TEMP TABLE document_chunks_staging (
+        content TEXT, embedding vector, source_url TEXT, metadata JSONB,
+        language TEXT, date_scraped TIMESTAMP, hash TEXT, token_count INTEGER
+    ) ON COMMIT DROP;
+"""
+
+COPY_CHUNKS_SQL = """
+    COPY document_chunks_staging (
+        content, embedding, source_url, metadata,
+        language, date_scraped, hash, token_count
+    ) FROM STDIN (FORMAT BINARY)
+"""
+
+CHUNK_COPY_TYPES = ["text", "vector", "text", "jsonb", "text", "timestamp", "text", "int4"]
+
+# Existing chunks only pick up an embedding they are missing
+MERGE_CHUNKS_SQL = """
+    INSERT INTO document_chunks (
+        content, embedding, source_url, metadata,
+        language, date_scraped, hash, token_count
+    )
+    SELECT DISTINCT ON (hash)
+        content, embedding, source_url, metadata,
+        language, date_scraped, hash, token_count
+    FROM document_chunks_staging
+    ORDER BY hash
+    ON CONFLICT (hash) DO UPDATE SET
+        embedding = EXCLUDED.embedding,
+        metadata = EXCLUDED.metadata
+    WHERE document_chunks.embedding IS NULL AND EXCLUDED.embedding IS NOT NULL
+    RETURNING id, hash, (xmax = 0) AS inserted;
+"""
+
+POI_EMBEDDINGS_STAGING_SQL = """
+    CREATE TEMP TABLE poi_embeddings_staging (
+        id INTEGER, embedding vector
+    ) ON COMMIT DROP;
+"""
+
+COPY_POI_EMBEDDINGS_SQL = """
+    COPY poi_embeddings_staging (id, embedding) FROM STDIN (FORMAT BINARY)
+"""
+
+POI_EMBEDDING_COPY_TYPES = ["int4", "vector"]
+
+MERGE_POI_EMBEDDINGS_SQL = """
+    UPDATE pois
+    SET description_embedding = staging.embedding
+    FROM poi_embeddings_staging staging
+    WHERE pois.id = staging.id
+    RETURNING pois.id;
+"""
+
+
+class VectorBinaryDumper(Dumper):
+    """
+    Send embeddings to pgvector in its binary wire format
+    (uint16 dim, uint16 unused, dim big-endian float32s) instead of
+    ~20KB of decimal text that Postgres has to parse on every call.
+    """
+    format = Format.BINARY
+    
+    def dump(self, obj: np.ndarray) -> bytes:
+        vec = np.asarray(obj, dtype=">f4")
+        return struct.pack(">HH", vec.shape[0], 0) + vec.tobytes()
+
+
+def _register_vector_info(conn, info: Optional[TypeInfo]) -> None:
+    """Bind the binary dumper for numpy arrays to this database's vector OID"""
+    if info is None:
+        raise psycopg.ProgrammingError("vector type not found - run init_pgvector() first")
+    # Known type name lets binary COPY resolve "vector" in set_types()
+    info.register(conn)
+    dumper = type("VectorBinaryDumper", (VectorBinaryDumper,), {"oid": info.oid})
+    conn.adapters.register_dumper(np.ndarray, dumper)
+
+
+def register_vector_adapter(conn: Connection) -> None:
+    """Register the binary pgvector adapter on a sync connection"""
+    _register_vector_info(conn, TypeInfo.fetch(conn, "vector"))
+
+
+async def register_vector_adapter_async(conn: AsyncConnection) -> None:
+    """Register the binary pgvector adapter on an async connection"""
+    _register_vector_info(conn, await TypeInfo.fetch(conn, "vector"))
+
+
+def _vector_search_settings() -> tuple:
+    """set_config() statement applying the vector search settings to a session"""
+    values = {
+        "ivfflat.probes": settings.db_ivfflat_probes,
+        "hnsw.ef_search": settings.db_hnsw_ef_search,
+    }
+    if settings.db_vector_iterative_scan != "off":
+        values["hnsw.iterative_scan"] = settings.db_vector_iterative_scan
+        values["ivfflat.iterative_scan"] = "relaxed_order"  # The only ordered mode IVFFlat has
+    calls = ", ".join("set_config(%s, %s, false)" for _ in values)
+    params = [param for name, value in values.items() for param in (name, str(value))]
+    return f"SELECT {calls};", params
+
+
+def _vector_search_query(table: str, column: str, embedding: Sequence[float], limit: int,
+                         threshold: Optional[float], columns: Optional[Sequence[str]],
+                         allowed_columns: Sequence[str], default_columns: Sequence[str],
+                         filters: Dict[str, str], filter_values: Dict[str, Any]) -> tuple:
+    """
+    Build a nearest-neighbour query returning only the requested columns.
+    
+    The threshold (as a max cosine distance) and every non-None filter go
+    into the WHERE clause, so the index scan returns only qualifying rows.
+    
+    Raises:
+        ValueError: If a column is not in allowed_columns
+    """
+    columns = columns or default_columns
+    unknown = set(columns) - set(allowed_columns)
+    if unknown:
+        raise ValueError(f"Unknown {table} columns: {', '.join(sorted(unknown))}")
+    
+    vector = sql.Identifier(column)
+    conditions = [sql.SQL("{} IS NOT NULL").format(vector)]
+    params = {"embedding": to_vector(embedding), "limit": limit}
+    
+    if threshold is not None:
+        conditions.append(sql.SQL("{} <=> %(embedding)s <= %(max_distance)s").format(vector))
+        params["max_distance"] = 1 - threshold
+    for name, value in filter_values.items():
+        if value is not None:
+            conditions.append(sql.SQL(filters[name]))
+            params[name] = value
+    
+    query = sql.SQL("""
+        SELECT {columns}, 1 - ({vector} <=> %(embedding)s) AS similarity
+        FROM {table}
+        WHERE {conditions}
+        ORDER BY {vector} <=> %(embedding)s
+        LIMIT %(limit)s;
+    """).format(
+        columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+        vector=vector,
+        table=sql.Identifier(table),
+        conditions=sql.SQL(" AND ").join(conditions)
+    )
+    return query, params
+
+
+def configure_connection(conn: Connection) -> None:
+    """Prepare a new sync connection: binary vector adapter and search settings.
+    On a fresh database the vector type doesn't exist until init_pgvector(),
+    so the adapter is skipped rather than failing every connection."""
+    info = TypeInfo.fetch(conn, "vector")
+    if info is None:
+        logger.warning("pgvector type not found; connection opened without the vector adapter")
+    else:
+        _register_vector_info(conn, info)
+    with conn.cursor() as cur:
+        cur.execute(*_vector_search_settings())
+
+
+async def configure_connection_async(conn: AsyncConnection) -> None:
+    """Prepare a new async connection: binary vector adapter and search
+    settings (adapter skipped until the vector type exists)"""
+    info = await TypeInfo.fetch(conn, "vector")
+    if info is None:
+        logger.warning("pgvector type not found; connection opened without the vector adapter")
+    else:
+        _register_vector_info(conn, info)
+    async with conn.cursor() as cur:
+        await cur.execute(*_vector_search_settings())
+
+
+# Vector indexes managed by migrate_vector_index.py: name -> (table, column)
+VECTOR_INDEXES = {
+    "documents_embedding_idx": ("documents", "embedding"),
+    "document_chunks_embedding_idx": ("document_chunks", "embedding"),
+    "idx_pois_description_embedding": ("pois", "description_embedding"),
+}
+
+
+def ivfflat_lists(row_count: int) -> int:
+    """pgvector's guidance for IVFFlat lists: rows / 1000, sqrt(rows) past 1M rows"""
+    if row_count > 1_000_000:
+        return int(math.sqrt(row_count))
+    return max(row_count // 1000, 10)
+
+
+def vector_index_sql(name: str, table: str, column: str,
+                     method: Optional[str] = None, row_count: int = 0) -> str:
+    """
+    CREATE INDEX statement for a cosine vector index.
+    
+    Args:
+        method: "ivfflat" or "hnsw" (defaults to db_vector_index)
+        row_count: Rows with embeddings, used to size IVFFlat lists. IVFFlat
+                   centroids are trained on existing rows, so build it after
+                   loading data; HNSW can be built on an empty table.
+    """
+    method = method or settings.db_vector_index
+    if method == "hnsw":
+        options = (f"m = {int(settings.db_hnsw_m)}, "
+                   f"ef_construction = {int(settings.db_hnsw_ef_construction)}")
+    elif method == "ivfflat":
+        options = f"lists = {ivfflat_lists(row_count)}"
+    else:
+        raise ValueError(f"Unknown vector index method: {method}")
+    return (f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            f"USING {method} ({column} vector_cosine_ops) WITH ({options});")
+
+
+def _hybrid_search_query(table: str, vector_column: str, text: str,
+                         embedding: Optional[Sequence[float]], limit: int,
+                         columns: Optional[Sequence[str]],
+                         allowed_columns: Sequence[str],
+                         default_columns: Sequence[str]) -> tuple:
+    """
+    Build a reciprocal rank fusion query over full-text and vector rankings.
+    
+    Each ranking contributes 1 / (rrf_k + rank) for its top candidates and
+    rows are ordered by the summed score. Without an embedding only the
+    full-text ranking is used (lexical-only mode, no embedding call needed).
+    
+    Raises:
+        ValueError: If a column is not in allowed_columns
+    """
+    columns = columns or default_columns
+    unknown = set(columns) - set(allowed_columns)
+    if unknown:
+        raise ValueError(f"Unknown {table} columns: {', '.join(sorted(unknown))}")
+    
+    identifiers = {"table": sql.Identifier(table), "vector": sql.Identifier(vector_column)}
+    params = {
+        "query": text,
+        "limit": limit,
+        "candidates": max(settings.db_hybrid_candidates, limit),
+        "rrf_k": settings.db_hybrid_rrf_k
+    }
+    
+    # ts_rank_cd weights title/heading matches (A) over body matches (B)
+    rankings = [sql.SQL("""
+        (SELECT id, RANK() OVER (ORDER BY ts_rank_cd(search_vector, query) DESC) AS rank
+         FROM {table}, websearch_to_tsquery('english', %(query)s) query
+         WHERE search_vector @@ query
+         ORDER BY ts_rank_cd(search_vector, query) DESC
+         LIMIT %(candidates)s)
+    """).format(**identifiers)]
+    
+    if embedding is not None:
+        params["embedding"] = to_vector(embedding)
+        rankings.append(sql.SQL("""
+            (SELECT id, RANK() OVER (ORDER BY {vector} <=> %(embedding)s) AS rank
+             FROM {table}
+             WHERE {vector} IS NOT NULL
+             ORDER BY {vector} <=> %(embedding)s
+             LIMIT %(candidates)s)
+        """).format(**identifiers))
+    
+    query = sql.SQL("""
+        WITH hits AS ({rankings})
+        SELECT {columns}, fused.score
+        FROM (
+            SELECT id, SUM(1.0 / (%(rrf_k)s + rank))::float AS score
+            FROM hits
+            GROUP BY id
+        ) fused
+        JOIN {table} USING (id)
+        ORDER BY fused.score DESC
+        LIMIT %(limit)s;
+    """).format(
+        rankings=sql.SQL(" UNION ALL ").join(rankings),
+        columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+        **identifiers
+    )
+    return query, params
+
+
+def to_vector(embedding: Any) -> Optional[np.ndarray]:
+    """
+    Normalize an embedding (list, array('f') or NumPy array) to a float32
+    NumPy array that the binary pgvector adapter can send as a query param.
+    """
+    if embedding is None or len(embedding) == 0:
+        return None
+    return np.asarray(embedding, dtype=np.float32)
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the content, the dedup key for documents and chunks"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _document_copy_rows(documents: Iterable[Dict]) -> Iterator[tuple]:
+    """COPY rows (DOCUMENT_COPY_TYPES order) for document dicts"""
+    for doc in documents:
+        yield (
+            doc['title'],
+            doc['content'],
+            doc.get('source'),
+            doc.get('tags'),
+            to_vector(doc.get('embedding')),
+            doc.get('hash') or content_hash(doc['content'])
+        )
+
+
+def _chunk_copy_rows(chunks: Iterable[Dict]) -> Iterator[tuple]:
+    """COPY rows (CHUNK_COPY_TYPES order) for document chunk dicts"""
+    for chunk in chunks:
+        date_scraped = chunk.get('date_scraped')
+        if isinstance(date_scraped, str):
+            date_scraped = datetime.fromisoformat(date_scraped)
+        yield (
+            chunk['content'],
+            to_vector(chunk.get('embedding')),
+            chunk.get('source_url'),
+            Jsonb(chunk.get('metadata') or {}),
+            chunk.get('language'),
+            date_scraped,
+            chunk.get('hash') or content_hash(chunk['content']),
+            chunk.get('token_count', 0)
+        )
+
+
+def _poi_embedding_copy_rows(embeddings: Iterable[tuple]) -> Iterator[tuple]:
+    """COPY rows (POI_EMBEDDING_COPY_TYPES order) for (poi_id, embedding) pairs"""
+    for poi_id, embedding in embeddings:
+        yield (poi_id, to_vector(embedding))
+
+
+def _log_merge(table: str, total: int, merged: List[Dict]) -> None:
+    """Log how a bulk merge split into inserts, updates and skipped rows"""
+    inserted = sum(1 for row in merged if row.get('inserted', True))
+    updated = len(merged) - inserted
+    logger.info(
+        f"✓ Bulk merged {total} rows into {table}: {inserted} inserted, "
+        f"{updated} updated, {total - len(merged)} unchanged"
+    )
+
+
+def _insert_document_query(title: str, content: str, source: Optional[str],
+                           tags: Optional[List[str]], embedding: Optional[Sequence[float]]) -> tuple:
+    """Pick the document insert SQL for db_document_hash and build its params"""
+    params = (title, content, source, tags, to_vector(embedding))
+    if settings.db_document_hash:
+        return UPSERT_DOCUMENT_SQL, params + (content_hash(content),)
+    return INSERT_DOCUMENT_SQL, params
+
+
+def _text_search_query(query: str, limit: int) -> tuple:
+    """Pick the POI text-search SQL for db_text_search_mode and build its params"""
+    clean_query = query.strip().lower()
+    if settings.db_text_search_mode == "trigram":
+        return SEARCH_POIS_BY_TRIGRAM_SQL, {"query": clean_query, "limit": limit}
+    
+    search_pattern = f"%{clean_query}%"
+    return SEARCH_POIS_BY_TEXT_SQL, (search_pattern, search_pattern, search_pattern, search_pattern,
+                                     clean_query, clean_query, search_pattern, search_pattern, limit)
+
+
+def _nearby_query(latitude: float, longitude: float,
+                  radius_km: float, limit: int) -> tuple:
+    """Pick the nearby-POI SQL for db_spatial_mode and build its params"""
+    params = {
+        "lat": latitude,
+        "lng": longitude,
+        "radius_km": radius_km,
+        "radius_m": radius_km * 1000,
+        "limit": limit
+    }
+    if settings.db_spatial_mode == "postgis":
+        return NEARBY_POIS_POSTGIS_SQL, params
+    
+    # Degrees per km shrink for longitude as we move away from the equator
+    lat_delta = radius_km / KM_PER_DEGREE
+    lng_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    params.update({
+        "min_lat": latitude - lat_delta,
+        "max_lat": latitude + lat_delta,
+        "min_lng": longitude - lng_delta,
+        "max_lng": longitude + lng_delta
+    })
+    return NEARBY_POIS_BBOX_SQL, params
+
+
+def _format_placeholders(query: str, param_count: int) -> str:
+    """Convert PostgreSQL $1, $2 placeholders to %s for psycopg"""
+    formatted_query = query
+    for i in range(param_count, 0, -1):
+        formatted_query = formatted_query.replace(f'${i}', '%s')
+    return formatted_query
+
+
+def _pool_options() -> Dict[str, Any]:
+    """Pool sizing and connection options shared by sync and async pools"""
+    return {
+        "min_size": settings.db_pool_min_size,
+        "max_size": settings.db_pool_max_size,
+        "max_idle": settings.db_pool_max_idle,
+        "timeout": settings.db_pool_timeout,
+        "kwargs": {"row_factory": dict_row, "autocommit": True},
+        "name": "astu-db",
+        "open": False
+    }
+
+
+class _QueryTimer:
+    """Times one instrumented query: connection wait, execution and rows"""
+    
+    def __init__(self, method: str):
+        self.method = method
+        self.start = time.perf_counter()
+        self.acquired: Optional[float] = None
+        self.duration_ms = 0.0
+        self.recorded = False
+    
+    @property
+    def wait_ms(self) -> float:
+        """Time spent waiting for a pooled (or new) connection"""
+        return ((self.acquired or time.perf_counter()) - self.start) * 1000
+    
+    def connected(self) -> None:
+        """Mark the connection as acquired; execution time starts here"""
+        self.acquired = time.perf_counter()
+    
+    def is_slow(self) -> bool:
+        """Whether the query crossed db_slow_query_ms"""
+        return self.duration_ms >= settings.db_slow_query_ms
+    
+    def done(self, rows: int) -> None:
+        """Record a successful query"""
+        self.duration_ms = (time.perf_counter() - (self.acquired or self.start)) * 1000
+        self.recorded = True
+        db_metrics.record(self.method, self.duration_ms, self.wait_ms, rows)
+        logger.debug(f"{self.method}: {self.duration_ms:.1f}ms, {rows} rows, "
+                     f"waited {self.wait_ms:.1f}ms for a connection")
+    
+    def failed(self) -> None:
+        """Record a failed query (no-op if it was already recorded)"""
+        if not self.recorded:
+            self.duration_ms = (time.perf_counter() - (self.acquired or self.start)) * 1000
+            self.recorded = True
+            db_metrics.record(self.method, self.duration_ms, self.wait_ms, error=True)
+
+
+# Last EXPLAIN per method, so a burst of slow queries is only analyzed once
+_last_explain: Dict[str, float] = {}
+
+
+def _explain_due(method: str) -> bool:
+    """Whether a slow query of this method should have its plan captured"""
+    if not settings.db_slow_query_explain:
+        return False
+    now = time.monotonic()
+    if now - _last_explain.get(method, -math.inf) < settings.db_slow_query_explain_interval:
+        return False
+    _last_explain[method] = now
+    return True
+
+
+_WRITE_KEYWORDS = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|COPY|CREATE|ALTER|DROP|TRUNCATE)\b", re.IGNORECASE)
+
+
+def _is_read_only(text: str) -> bool:
+    """Whether a statement only reads (safe to execute again under ANALYZE)"""
+    words = text.lstrip("( ").split(None, 1)
+    return bool(words) and words[0].upper() in ("SELECT", "WITH", "VALUES", "TABLE") \
+        and not _WRITE_KEYWORDS.search(text)
+
+
+def _explain_query(query: Query, analyze: bool) -> sql.Composable:
+    """Prefix a query with EXPLAIN (ANALYZE, BUFFERS), or plain EXPLAIN for
+    statements that write (ANALYZE would execute them again)"""
+    if not isinstance(query, sql.Composable):
+        query = sql.SQL(query)
+    return sql.SQL("EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN ") + query
+
+
+def _query_text(query: Query, conn) -> str:
+    """Single-line SQL text for logs and metrics"""
+    text = query.as_string(conn) if isinstance(query, sql.Composable) else query
+    return " ".join(text.split())
+
+
+def _report_slow_query(timer: _QueryTimer, query: str, plan: Optional[List[str]]) -> None:
+    """Log a slow query (with its plan when captured) and keep it for /metrics"""
+    message = (f"⚠ Slow query in {timer.method}: {timer.duration_ms:.1f}ms "
+               f"(threshold {settings.db_slow_query_ms:.0f}ms, "
+               f"waited {timer.wait_ms:.1f}ms for a connection)\n  {query}")
+    if plan:
+        message += "\n  " + "\n  ".join(plan)
+    logger.warning(message)
+    db_metrics.record_slow_query(timer.method, timer.duration_ms, query, plan)
+
+
+@dataclass
+class _Statement:
+    """
+    One query method's call: the SQL, how its rows become the result and
+    how a failure is handled. Built once by _DatabaseQueries and executed
+    by Database or AsyncDatabase.
+    """
+    method: str  # Metrics name
+    query: Query
+    params: Any = ()
+    ef_search: Optional[int] = None
+    result: Callable[[List[Dict]], Any] = list  # Rows -> return value
+    failure: str = "Query failed"  # Logged with the error
+    fallback: Optional[Callable[[], Any]] = None  # Value on error (None = re-raise)
+    copy: Optional[tuple] = None  # (staging_sql, copy_sql, types, rows) for bulk merges
+
+
+def _inserted_id(label: str) -> Callable[[List[Dict]], int]:
+    """Row handler for INSERT ... RETURNING id"""
+    def handle(rows: List[Dict]) -> int:
+        row_id = rows[0]['id']
+        logger.info(f"✓ {label} (ID: {row_id})")
+        return row_id
+    return handle
+
+
+def _merged(table: str, total: int) -> Callable[[List[Dict]], List[Dict]]:
+    """Row handler for a bulk merge into table"""
+    def handle(merged: List[Dict]) -> List[Dict]:
+        _log_merge(table, total, merged)
+        return merged
+    return handle
+
+
+def _updated_poi_embeddings(merged: List[Dict]) -> int:
+    logger.info(f"✓ Bulk updated {len(merged)} POI embeddings")
+    return len(merged)
+
+
+def _handle_failure(statement: _Statement, error: Exception) -> Any:
+    """Log a failed statement and return its fallback, or re-raise"""
+    logger.error(f"✗ {statement.failure}: {error}")
+    if statement.fallback is None:
+        raise error
+    return statement.fallback()
+
+
+class _DatabaseQueries:
+    """
+    Query methods shared by Database and AsyncDatabase.
+    
+    Each method builds a _Statement and hands it to _run, which the sync
+    and async managers implement on their own connections (returning the
+    result, or a coroutine of it).
+    """
+    
+    def _run(self, statement: _Statement) -> Any:
+        raise NotImplementedError
+    
+    def _done(self, value: Any) -> Any:
+        """Result of a call that needs no query (e.g. an empty bulk insert)"""
+        raise NotImplementedError
+    
+    def has_full_text_search(self) -> bool:
+        """Whether documents.search_vector exists (lexical-only hybrid_search works)"""
+        return self._run(_Statement("has_full_text_search", SEARCH_VECTOR_COLUMN_SQL, result=bool,
+                                    failure="Full-text search check failed"))
+    
+    def has_document_hash(self) -> bool:
+        """Whether documents.hash has the unique index db_document_hash needs"""
+        return self._run(_Statement("has_document_hash", DOCUMENT_HASH_INDEX_SQL, result=bool,
+                                    failure="Document hash check failed"))
+    
+    def insert_poi(self, name: str, category: str, latitude: float, 
+                   longitude: float, description: str = None, 
+                   tags: List[str] = None, osm_id: int = None) -> int:
+        """Insert a Point of Interest into the database"""
+        return self._run(_Statement(
+            "insert_poi", INSERT_POI_SQL, (name, category, latitude, longitude, description, tags, osm_id),
+            result=_inserted_id(f"POI inserted: {name}"), failure="Failed to insert POI"
+        ))
+    
+    def get_pois_by_category(self, category: str, limit: int = 10) -> List[Dict]:
+        """Fetch POIs by category"""
+        return self._run(_Statement("get_pois_by_category", POIS_BY_CATEGORY_SQL, (category, limit),
+                                    failure="Failed to fetch POIs", fallback=list))
+    
+    def get_nearby_pois(self, latitude: float, longitude: float, 
+                        radius_km: float = 5, limit: int = 10) -> List[Dict]:
+        """Find POIs near a location, nearest first (see db_spatial_mode)"""
+        return self._run(_Statement("get_nearby_pois", *_nearby_query(latitude, longitude, radius_km, limit),
+                                    failure="Failed to fetch nearby POIs", fallback=list))
+    
+    def insert_document(self, title: str, content: str, source: str = None, 
+                        tags: List[str] = None, embedding: Sequence[float] = None) -> int:
+        """Insert a document into the knowledge base (with db_document_hash,
+        same content as an existing document updates that row instead)"""
+        return self._run(_Statement(
+            "insert_document", *_insert_document_query(title, content, source, tags, embedding),
+            result=_inserted_id(f"Document inserted: {title}"), failure="Failed to insert document"
+        ))
+    
+    def bulk_upsert_documents(self, documents: List[Dict]) -> List[Dict]:
+        """
+        Insert documents in bulk, deduplicated on the content hash.
+        
+        Args:
+            documents: Dicts with title, content and optional source, tags,
+                       embedding and hash (computed from content if missing)
+        
+        Returns:
+            One {id, hash, inserted} row per distinct document. Re-ingested
+            content updates title/source/tags and keeps its old embedding
+            when the new one is missing.
+        """
+        if not documents:
+            return self._done([])
+        return self._run(_Statement(
+            "bulk_upsert_documents", MERGE_DOCUMENTS_SQL,
+            copy=(DOCUMENTS_STAGING_SQL, COPY_DOCUMENTS_SQL, DOCUMENT_COPY_TYPES, _document_copy_rows(documents)),
+            result=_merged("documents", len(documents)), failure="Bulk document insert failed"
+        ))
+    
+    def bulk_upsert_chunks(self, chunks: List[Dict]) -> List[Dict]:
+        """
+        Insert document chunks in bulk, deduplicated on hash.
+        
+        Existing chunks are only updated when they have no embedding yet
+        and the new row brings one; other duplicates are left untouched
+        and do not appear in the returned {id, hash, inserted} rows.
+        """
+        if not chunks:
+            return self._done([])
+        return self._run(_Statement(
+            "bulk_upsert_chunks", MERGE_CHUNKS_SQL,
+            copy=(CHUNKS_STAGING_SQL, COPY_CHUNKS_SQL, CHUNK_COPY_TYPES, _chunk_copy_rows(chunks)),
+            result=_merged("document_chunks", len(chunks)), failure="Bulk chunk insert failed"
+        ))
+    
+    def bulk_update_poi_embeddings(self, embeddings: List[tuple]) -> int:
+        """Set description_embedding for many (poi_id, embedding) pairs; returns rows updated"""
+        if not embeddings:
+            return self._done(0)
+        return self._run(_Statement(
+            "bulk_update_poi_embeddings", MERGE_POI_EMBEDDINGS_SQL,
+            copy=(POI_EMBEDDINGS_STAGING_SQL, COPY_POI_EMBEDDINGS_SQL, POI_EMBEDDING_COPY_TYPES,
+                  _poi_embedding_copy_rows(embeddings)),
+            result=_updated_poi_embeddings, failure="Bulk POI embedding update failed"
+        ))
+    
+    def semantic_search(self, query_embedding: Sequence[float], 
+                        limit: int = 5, threshold: Optional[float] = 0.5,
+                        ef_search: Optional[int] = None, *,
+                        tags: Optional[List[str]] = None, source: Optional[str] = None,
+                        columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Search documents by semantic similarity using pgvector.
+        
+        Args:
+            threshold: Minimum cosine similarity (None for no cutoff)
+            tags: Only documents sharing at least one of these tags
+            source: Only documents from this source
+            columns: Columns to return besides similarity (DOCUMENT_SEARCH_COLUMNS)
+        """
+        query = _vector_search_query(
+            "documents", "embedding", query_embedding, limit, threshold, columns,
+            DOCUMENT_SEARCH_COLUMNS, DOCUMENT_SEARCH_DEFAULTS,
+            DOCUMENT_SEARCH_FILTERS, {"tags": tags, "source": source}
+        )
+        return self._run(_Statement("semantic_search", *query, ef_search,
+                                    failure="Semantic search failed", fallback=list))
+    
+    def semantic_search_chunks(self, query_embedding: Sequence[float], 
+                               limit: int = 5, threshold: Optional[float] = 0.5,
+                               ef_search: Optional[int] = None, *,
+                               tags: Optional[List[str]] = None, source: Optional[str] = None,
+                               content_type: Optional[str] = None,
+                               columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Search scraped document chunks by semantic similarity using pgvector.
+        
+        Args:
+            threshold: Minimum cosine similarity (None for no cutoff)
+            tags: Only chunks whose metadata tags include one of these
+            source: Only chunks scraped from this URL
+            content_type: Only chunks of this metadata content_type
+            columns: Columns to return besides similarity (CHUNK_SEARCH_COLUMNS)
+        """
+        query = _vector_search_query(
+            "document_chunks", "embedding", query_embedding, limit, threshold, columns,
+            CHUNK_SEARCH_COLUMNS, CHUNK_SEARCH_DEFAULTS,
+            CHUNK_SEARCH_FILTERS, {"tags": tags, "source": source, "content_type": content_type}
+        )
+        return self._run(_Statement("semantic_search_chunks", *query, ef_search,
+                                    failure="Chunk semantic search failed", fallback=list))
+    
+    def semantic_search_pois(self, query_embedding: Sequence[float], limit: int = 10,
+                             ef_search: Optional[int] = None, *,
+                             threshold: Optional[float] = None,
+                             tags: Optional[List[str]] = None, category: Optional[str] = None,
+                             columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Search POIs by semantic similarity using pgvector (filters as in semantic_search)"""
+        query = _vector_search_query(
+            "pois", "description_embedding", query_embedding, limit, threshold, columns,
+            POI_SEARCH_COLUMNS, POI_SEARCH_DEFAULTS,
+            POI_SEARCH_FILTERS, {"tags": tags, "category": category}
+        )
+        return self._run(_Statement("semantic_search_pois", *query, ef_search,
+                                    failure="POI semantic search failed", fallback=list))
+    
+    def hybrid_search(self, query: str, query_embedding: Optional[Sequence[float]] = None,
+                      limit: int = 5, *, columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Search documents by fused full-text and vector rank (see db_hybrid_search).
+        
+        Args:
+            query: Raw user query for the full-text ranking
+            query_embedding: Query embedding, or None for lexical-only search
+            columns: Columns to return besides score (DOCUMENT_SEARCH_COLUMNS)
+        """
+        sql_query = _hybrid_search_query(
+            "documents", "embedding", query, query_embedding, limit, columns,
+            DOCUMENT_SEARCH_COLUMNS, DOCUMENT_SEARCH_DEFAULTS
+        )
+        return self._run(_Statement("hybrid_search", *sql_query,
+                                    failure="Hybrid search failed", fallback=list))
+    
+    def hybrid_search_chunks(self, query: str, query_embedding: Optional[Sequence[float]] = None,
+                             limit: int = 5, *, columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Search document chunks by fused full-text and vector rank"""
+        sql_query = _hybrid_search_query(
+            "document_chunks", "embedding", query, query_embedding, limit, columns,
+            CHUNK_SEARCH_COLUMNS, CHUNK_SEARCH_DEFAULTS
+        )
+        return self._run(_Statement("hybrid_search_chunks", *sql_query,
+                                    failure="Chunk hybrid search failed", fallback=list))
+    
+    def search_pois_by_text(self, query: str, limit: int = 10) -> List[Dict]:
+        """Search POIs by text (fallback when no embeddings, see db_text_search_mode)"""
+        return self._run(_Statement("search_pois_by_text", *_text_search_query(query, limit),
+                                    failure="POI text search failed", fallback=list))
+    
+    def execute_query(self, query: str, *params) -> List[Dict]:
+        """Execute a parameterized query ($1, $2 placeholders) and return results"""
+        return self._run(_Statement("execute_query", _format_placeholders(query, len(params)), params,
+                                    failure="Query execution failed"))
+
+
+class Database(_DatabaseQueries):
     """Database manager for Supabase Postgres with pgvector support"""
     
-    def __init__(self):
+    def __init__(self, pooled: bool = False):
+        """
+        Args:
+            pooled: If True, queries borrow connections from a shared pool
+                    (see open_pool) instead of connecting per call.
+        """
         self.connection_string = settings.database_url
+        self.pooled = pooled
         self._conn: Optional[Connection] = None
+        self._pool: Optional[ConnectionPool] = None
     
     def connect(self) -> Connection:
         """Establish database connection"""
@@ -27,6 +975,7 @@ class Database:
                 row_factory=dict_row,
                 autocommit=True
             )
+            configure_connection(self._conn)
             logger.info("✓ Connected to Supabase Postgres")
             return self._conn
         except Exception as e:
@@ -34,18 +983,88 @@ class Database:
             raise
     
     def disconnect(self):
-        """Close database connection"""
+        """Close database connection and connection pool"""
         if self._conn:
             self._conn.close()
             logger.info("Database connection closed")
+        self.close_pool()
+    
+    def open_pool(self) -> ConnectionPool:
+        """
+        Open the shared connection pool.
+        
+        Connections are created in the background up to db_pool_min_size,
+        grow on demand to db_pool_max_size, and are closed after sitting
+        idle for db_pool_max_idle seconds.
+        """
+        if self._pool is None:
+            self._pool = ConnectionPool(
+                self.connection_string,
+                configure=configure_connection,
+                check=ConnectionPool.check_connection if settings.db_pool_check else None,
+                **_pool_options()
+            )
+            self._pool.open()
+            logger.info(
+                f"✓ Database pool opened (min={settings.db_pool_min_size}, "
+                f"max={settings.db_pool_max_size})"
+            )
+        return self._pool
+    
+    def close_pool(self):
+        """Close the connection pool if open"""
+        if self._pool:
+            self._pool.close()
+            self._pool = None
+            logger.info("Database pool closed")
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return pool size and usage counters (empty when pooling is off)"""
+        if self._pool is None:
+            return {"pooled": False}
+        return {"pooled": True, **self._pool.get_stats()}
+    
+    @contextmanager
+    def _connection(self) -> Iterator[Connection]:
+        """
+        Yield a connection with dict rows and autocommit.
+        Borrowed from the pool when pooled, otherwise opened for this call only.
+        """
+        if self.pooled:
+            pool = self._pool or self.open_pool()
+            with pool.connection() as conn:
+                yield conn
+        else:
+            with psycopg.connect(
+                self.connection_string,
+                row_factory=dict_row,
+                autocommit=True
+            ) as conn:
+                configure_connection(conn)
+                yield conn
+    
+    def _plain_connection(self) -> Connection:
+        """
+        Open a connection with no configure step, for bootstrap and health
+        checks that must work before the pgvector extension exists.
+        """
+        return psycopg.connect(
+            self.connection_string,
+            row_factory=dict_row,
+            autocommit=True
+        )
     
     def init_pgvector(self):
         """Enable pgvector extension for embeddings"""
         try:
-            with psycopg.connect(self.connection_string) as conn:
+            with self._plain_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
                 logger.info("✓ pgvector extension enabled")
+            # Pooled connections opened before the extension existed lack
+            # the vector adapter; reopen the pool so new ones register it
+            if self._pool is not None:
+                self.close_pool()
         except Exception as e:
             logger.error(f"✗ Failed to enable pgvector: {e}")
             raise
@@ -53,7 +1072,7 @@ class Database:
     def create_tables(self):
         """Create required tables for ASTU Route AI"""
         try:
-            with psycopg.connect(self.connection_string) as conn:
+            with self._plain_connection() as conn:
                 with conn.cursor() as cur:
                     # POIs table (Points of Interest)
                     cur.execute("""
@@ -85,6 +1104,11 @@ class Database:
                             source VARCHAR(255),
                             tags TEXT[],
                             embedding vector(1024),
+                            hash VARCHAR(64) UNIQUE,
+                            search_vector tsvector GENERATED ALWAYS AS (
+                                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                                setweight(to_tsvector('english', content), 'B')
+                            ) STORED,
                             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                         );
                     """)
@@ -92,206 +1116,309 @@ class Database:
                     # Create indexes for faster queries
                     cur.execute("CREATE INDEX IF NOT EXISTS pois_category_idx ON pois(category);")
                     cur.execute("CREATE INDEX IF NOT EXISTS pois_location_idx ON pois(latitude, longitude);")
-                    cur.execute("CREATE INDEX IF NOT EXISTS documents_embedding_idx ON documents USING ivfflat (embedding vector_cosine_ops);")
+                    cur.execute(vector_index_sql("documents_embedding_idx", "documents", "embedding"))
+                    cur.execute("CREATE INDEX IF NOT EXISTS documents_search_vector_idx ON documents USING gin (search_vector);")
                     
                 logger.info("✓ All tables created successfully")
         except Exception as e:
             logger.error(f"✗ Failed to create tables: {e}")
             raise
     
-    def test_connection(self) -> bool:
-        """Test database connectivity"""
+    def _fetch_all(self, method: str, query: Query, params: Any = (),
+                   ef_search: Optional[int] = None) -> List[Dict]:
+        """
+        Run an instrumented query and return all rows (empty list for
+        statements without results).
+        
+        Records connection wait, execution time and row count under
+        `method`; slow queries are logged with their EXPLAIN plan, which is
+        captured after the rows are returned (see _report_slow).
+        ef_search overrides hnsw.ef_search for this query only.
+        """
+        timer = _QueryTimer(method)
         try:
-            with psycopg.connect(self.connection_string) as conn:
+            with self._connection() as conn:
+                timer.connected()
                 with conn.cursor() as cur:
-                    cur.execute("SELECT NOW();")
-                    result = cur.fetchone()
-                    logger.info(f"✓ Database test successful. Server time: {result}")
-                    return True
+                    if ef_search is None:
+                        cur.execute(query, params)
+                    else:
+                        with conn.transaction():
+                            cur.execute(LOCAL_EF_SEARCH_SQL, (str(ef_search),))
+                            cur.execute(query, params)
+                    rows = cur.fetchall() if cur.description else []
+                timer.done(len(rows))
+                text = _query_text(query, conn) if timer.is_slow() else None
+        except Exception:
+            timer.failed()
+            raise
+        if text is not None:
+            self._report_slow(timer, query, text, params, ef_search)
+        return rows
+    
+    def _report_slow(self, timer: _QueryTimer, query: Query, text: str, params: Any,
+                     ef_search: Optional[int]) -> None:
+        """Report a slow query; when its plan is due, the plan is captured in
+        a background thread on another connection so the caller isn't kept
+        waiting for a second run"""
+        if not _explain_due(timer.method):
+            _report_slow_query(timer, text, None)
+            return
+        
+        def explain():
+            _report_slow_query(timer, text, self._explain(query, text, params, ef_search))
+        
+        threading.Thread(target=explain, name="explain-slow-query", daemon=True).start()
+    
+    def _explain(self, query: Query, text: str, params: Any,
+                 ef_search: Optional[int]) -> Optional[List[str]]:
+        """EXPLAIN a query in a rolled-back transaction (ANALYZE only for reads)"""
+        try:
+            with self._connection() as conn:
+                with conn.transaction(force_rollback=True):
+                    with conn.cursor() as cur:
+                        if ef_search is not None:
+                            cur.execute(LOCAL_EF_SEARCH_SQL, (str(ef_search),))
+                        cur.execute(_explain_query(query, _is_read_only(text)), params)
+                        return [row["QUERY PLAN"] for row in cur.fetchall()]
+        except Exception as e:
+            logger.warning(f"Could not capture query plan: {e}")
+            return None
+    
+    def test_connection(self) -> bool:
+        """Test database connectivity (on a plain connection, so it works
+        before init_pgvector on a fresh database)"""
+        try:
+            with self._plain_connection() as conn:
+                result = conn.execute("SELECT NOW();").fetchall()
+            logger.info(f"✓ Database test successful. Server time: {result[0]}")
+            return True
         except Exception as e:
             logger.error(f"✗ Database test failed: {e}")
             return False
     
-    def insert_poi(self, name: str, category: str, latitude: float, 
-                   longitude: float, description: str = None, 
-                   tags: List[str] = None, osm_id: int = None) -> int:
-        """Insert a Point of Interest into the database"""
+    def _bulk_merge(self, method: str, staging_sql: str, copy_sql: str, types: List[str],
+                    rows: Iterable[tuple], merge_sql: str) -> List[Dict]:
+        """
+        COPY rows into a transaction-scoped staging table in binary format
+        and merge them with one statement. Returns the merged rows.
+        """
+        timer = _QueryTimer(method)
         try:
-            with psycopg.connect(self.connection_string, row_factory=dict_row) as conn:
-                with conn.cursor() as cur:
-                    cur.execute("""
-                        INSERT INTO pois (name, category, latitude, longitude, description, tags, osm_id)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        RETURNING id;
-                    """, (name, category, latitude, longitude, description, tags, osm_id))
-                    poi_id = cur.fetchone()['id']
-                    logger.info(f"✓ POI inserted: {name} (ID: {poi_id})")
-                    return poi_id
-        except Exception as e:
-            logger.error(f"✗ Failed to insert POI: {e}")
+            with self._connection() as conn:
+                timer.connected()
+                with conn.transaction():
+                    with conn.cursor() as cur:
+                        cur.execute(staging_sql)
+                        with cur.copy(copy_sql) as copy:
+                            copy.set_types(types)
+                            for row in rows:
+                                copy.write_row(row)
+                        cur.execute(merge_sql)
+                        merged = cur.fetchall()
+            timer.done(len(merged))
+            return merged
+        except Exception:
+            timer.failed()
             raise
     
-    def get_pois_by_category(self, category: str, limit: int = 10) -> List[Dict]:
-        """Fetch POIs by category"""
+    def _run(self, statement: _Statement) -> Any:
+        """Execute a statement from _DatabaseQueries and handle its rows"""
         try:
-            with psycopg.connect(self.connection_string, row_factory=dict_row) as conn:
-                with conn.cursor() as cur:
-                    cur.execute("""
-                        SELECT * FROM pois WHERE category = %s LIMIT %s;
-                    """, (category, limit))
-                    return cur.fetchall()
+            if statement.copy is not None:
+                rows = self._bulk_merge(statement.method, *statement.copy, statement.query)
+            else:
+                rows = self._fetch_all(statement.method, statement.query, statement.params,
+                                       statement.ef_search)
+            return statement.result(rows)
         except Exception as e:
-            logger.error(f"✗ Failed to fetch POIs: {e}")
-            return []
+            return _handle_failure(statement, e)
     
-    def get_nearby_pois(self, latitude: float, longitude: float, 
-                        radius_km: float = 5, limit: int = 10) -> List[Dict]:
-        """Find POIs near a location using haversine distance"""
-        try:
-            with psycopg.connect(self.connection_string) as conn:
-                with conn.cursor() as cur:
-                    # Haversine formula for distance calculation
-                    cur.execute("""
-                        SELECT 
-                            id, name, category, latitude, longitude, description,
-                            (6371 * acos(cos(radians(%s)) * cos(radians(latitude)) * 
-                             cos(radians(longitude) - radians(%s)) + 
-                             sin(radians(%s)) * sin(radians(latitude)))) AS distance_km
-                        FROM pois
-                        WHERE (6371 * acos(cos(radians(%s)) * cos(radians(latitude)) * 
-                               cos(radians(longitude) - radians(%s)) + 
-                               sin(radians(%s)) * sin(radians(latitude)))) <= %s
-                        ORDER BY distance_km
-                        LIMIT %s;
-                    """, (latitude, longitude, latitude, latitude, longitude, latitude, radius_km, limit))
-                    return cur.fetchall()
-        except Exception as e:
-            logger.error(f"✗ Failed to fetch nearby POIs: {e}")
-            return []
+    def _done(self, value: Any) -> Any:
+        return value
+
+
+class AsyncDatabase(_DatabaseQueries, IDatabase):
+    """
+    Non-blocking database manager for request handlers.
     
-    def insert_document(self, title: str, content: str, source: str = None, 
-                       tags: List[str] = None, embedding: List[float] = None) -> int:
-        """Insert a document into the knowledge base"""
+    Runs the query methods of _DatabaseQueries on psycopg AsyncConnection
+    so pgvector and POI queries never block the event loop.
+    """
+    
+    def __init__(self, pooled: bool = True):
+        """
+        Args:
+            pooled: If True, queries borrow connections from a shared
+                    AsyncConnectionPool instead of connecting per call.
+        """
+        self.connection_string = settings.database_url
+        self.pooled = pooled
+        self._pool: Optional[AsyncConnectionPool] = None
+        self._pool_lock = asyncio.Lock()
+        self._explains: set = set()  # Background EXPLAIN tasks of slow queries
+    
+    async def connect(self) -> AsyncConnectionPool:
+        """Establish database connections (opens the pool)"""
+        return await self.open_pool()
+    
+    async def disconnect(self) -> None:
+        """Close the connection pool"""
+        await self.close_pool()
+    
+    async def open_pool(self) -> AsyncConnectionPool:
+        """Open the shared async connection pool (idempotent)"""
+        async with self._pool_lock:
+            if self._pool is None:
+                pool = AsyncConnectionPool(
+                    self.connection_string,
+                    configure=configure_connection_async,
+                    check=AsyncConnectionPool.check_connection if settings.db_pool_check else None,
+                    **_pool_options()
+                )
+                await pool.open()
+                self._pool = pool
+                logger.info(
+                    f"✓ Async database pool opened (min={settings.db_pool_min_size}, "
+                    f"max={settings.db_pool_max_size})"
+                )
+        return self._pool
+    
+    async def close_pool(self) -> None:
+        """Close the async connection pool if open"""
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+            logger.info("Async database pool closed")
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return pool size and usage counters (empty when pooling is off)"""
+        if self._pool is None:
+            return {"pooled": False}
+        return {"pooled": True, **self._pool.get_stats()}
+    
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[AsyncConnection]:
+        """
+        Yield an async connection with dict rows and autocommit.
+        Borrowed from the pool when pooled, otherwise opened for this call only.
+        """
+        if self.pooled:
+            pool = self._pool or await self.open_pool()
+            async with pool.connection() as conn:
+                yield conn
+        else:
+            async with await AsyncConnection.connect(
+                self.connection_string,
+                row_factory=dict_row,
+                autocommit=True
+            ) as conn:
+                await configure_connection_async(conn)
+                yield conn
+    
+    async def _fetch_all(self, method: str, query: Query, params: Any = (),
+                         ef_search: Optional[int] = None) -> List[Dict]:
+        """Run an instrumented query and return all rows (see Database._fetch_all)"""
+        timer = _QueryTimer(method)
         try:
-            with psycopg.connect(self.connection_string, row_factory=dict_row) as conn:
-                with conn.cursor() as cur:
-                    # Convert embedding list to pgvector format
-                    embedding_str = f"[{','.join(map(str, embedding))}]" if embedding else None
-                    
-                    cur.execute("""
-                        INSERT INTO documents (title, content, source, tags, embedding)
-                        VALUES (%s, %s, %s, %s, %s::vector)
-                        RETURNING id;
-                    """, (title, content, source, tags, embedding_str))
-                    doc_id = cur.fetchone()['id']
-                    logger.info(f"✓ Document inserted: {title} (ID: {doc_id})")
-                    return doc_id
-        except Exception as e:
-            logger.error(f"✗ Failed to insert document: {e}")
+            async with self._connection() as conn:
+                timer.connected()
+                async with conn.cursor() as cur:
+                    if ef_search is None:
+                        await cur.execute(query, params)
+                    else:
+                        async with conn.transaction():
+                            await cur.execute(LOCAL_EF_SEARCH_SQL, (str(ef_search),))
+                            await cur.execute(query, params)
+                    rows = await cur.fetchall() if cur.description else []
+                timer.done(len(rows))
+                text = _query_text(query, conn) if timer.is_slow() else None
+        except Exception:
+            timer.failed()
             raise
+        if text is not None:
+            self._report_slow(timer, query, text, params, ef_search)
+        return rows
     
-    def semantic_search(self, query_embedding: List[float], 
-                       limit: int = 5, threshold: float = 0.5) -> List[Dict]:
-        """Search documents by semantic similarity using pgvector"""
+    def _report_slow(self, timer: _QueryTimer, query: Query, text: str, params: Any,
+                     ef_search: Optional[int]) -> None:
+        """Report a slow query; its plan is captured in a background task
+        (see Database._report_slow)"""
+        if not _explain_due(timer.method):
+            _report_slow_query(timer, text, None)
+            return
+        
+        async def explain():
+            _report_slow_query(timer, text, await self._explain(query, text, params, ef_search))
+        
+        task = asyncio.get_running_loop().create_task(explain())
+        self._explains.add(task)
+        task.add_done_callback(self._explains.discard)
+    
+    async def _explain(self, query: Query, text: str, params: Any,
+                       ef_search: Optional[int]) -> Optional[List[str]]:
+        """EXPLAIN a query in a rolled-back transaction (ANALYZE only for reads)"""
         try:
-            with psycopg.connect(self.connection_string, row_factory=dict_row) as conn:
-                with conn.cursor() as cur:
-                    embedding_str = f"[{','.join(map(str, query_embedding))}]"
-                    
-                    cur.execute("""
-                        SELECT 
-                            id, title, content, source,
-                            1 - (embedding <=> %s::vector) AS similarity
-                        FROM documents
-                        WHERE embedding IS NOT NULL
-                        ORDER BY embedding <=> %s::vector
-                        LIMIT %s;
-                    """, (embedding_str, embedding_str, limit))
-                    results = cur.fetchall()
-                    
-                    # Filter by threshold if needed
-                    return [r for r in results if r['similarity'] >= threshold]
+            async with self._connection() as conn:
+                async with conn.transaction(force_rollback=True):
+                    async with conn.cursor() as cur:
+                        if ef_search is not None:
+                            await cur.execute(LOCAL_EF_SEARCH_SQL, (str(ef_search),))
+                        await cur.execute(_explain_query(query, _is_read_only(text)), params)
+                        return [row["QUERY PLAN"] for row in await cur.fetchall()]
         except Exception as e:
-            logger.error(f"✗ Semantic search failed: {e}")
-            return []
+            logger.warning(f"Could not capture query plan: {e}")
+            return None
     
-    def semantic_search_pois(self, query_embedding: List[float], limit: int = 10) -> List[Dict]:
-        """Search POIs by semantic similarity using pgvector"""
+    async def test_connection(self) -> bool:
+        """Test database connectivity"""
         try:
-            with psycopg.connect(self.connection_string, row_factory=dict_row) as conn:
-                with conn.cursor() as cur:
-                    embedding_str = f"[{','.join(map(str, query_embedding))}]"
-                    
-                    cur.execute("""
-                        SELECT 
-                            id, name, category, latitude, longitude, 
-                            description, tags,
-                            1 - (description_embedding <=> %s::vector) AS similarity
-                        FROM pois
-                        WHERE description_embedding IS NOT NULL
-                        ORDER BY description_embedding <=> %s::vector
-                        LIMIT %s;
-                    """, (embedding_str, embedding_str, limit))
-                    
-                    return cur.fetchall()
+            result = await self._fetch_all("test_connection", "SELECT NOW();")
+            logger.info(f"✓ Database test successful. Server time: {result[0]}")
+            return True
         except Exception as e:
-            logger.error(f"✗ POI semantic search failed: {e}")
-            return []
+            logger.error(f"✗ Database test failed: {e}")
+            return False
     
-    def search_pois_by_text(self, query: str, limit: int = 10) -> List[Dict]:
-        """Search POIs using text matching (fallback when no embeddings)"""
+    async def _bulk_merge(self, method: str, staging_sql: str, copy_sql: str, types: List[str],
+                          rows: Iterable[tuple], merge_sql: str) -> List[Dict]:
+        """
+        COPY rows into a transaction-scoped staging table in binary format
+        and merge them with one statement. Returns the merged rows.
+        """
+        timer = _QueryTimer(method)
         try:
-            with psycopg.connect(self.connection_string, row_factory=dict_row) as conn:
-                with conn.cursor() as cur:
-                    clean_query = query.strip().lower()
-                    search_pattern = f"%{clean_query}%"
-                    
-                    cur.execute("""
-                        SELECT 
-                            id, name, category, latitude, longitude, 
-                            description, tags
-                        FROM pois
-                        WHERE 
-                            LOWER(name) LIKE %s
-                            OR LOWER(category) LIKE %s
-                            OR LOWER(description) LIKE %s
-                            OR LOWER(tags::text) LIKE %s
-                        ORDER BY 
-                            CASE 
-                                WHEN LOWER(name) = %s THEN 1
-                                WHEN LOWER(category) = %s THEN 2
-                                WHEN LOWER(name) LIKE %s THEN 3
-                                WHEN LOWER(category) LIKE %s THEN 4
-                                ELSE 5
-                            END
-                        LIMIT %s;
-                    """, (search_pattern, search_pattern, search_pattern, search_pattern,
-                          clean_query, clean_query, search_pattern, search_pattern, limit))
-                    
-                    return cur.fetchall()
-        except Exception as e:
-            logger.error(f"✗ POI text search failed: {e}")
-            return []
+            async with self._connection() as conn:
+                timer.connected()
+                async with conn.transaction():
+                    async with conn.cursor() as cur:
+                        await cur.execute(staging_sql)
+                        async with cur.copy(copy_sql) as copy:
+                            copy.set_types(types)
+                            for row in rows:
+                                await copy.write_row(row)
+                        await cur.execute(merge_sql)
+                        merged = await cur.fetchall()
+            timer.done(len(merged))
+            return merged
+        except Exception:
+            timer.failed()
+            raise
     
-    async def execute_query(self, query: str, *params) -> List[Dict]:
-        """Execute a parameterized query and return results"""
+    async def _run(self, statement: _Statement) -> Any:
+        """Execute a statement from _DatabaseQueries and handle its rows"""
         try:
-            # Convert PostgreSQL $1, $2 placeholders to %s for psycopg
-            formatted_query = query
-            for i in range(len(params), 0, -1):
-                formatted_query = formatted_query.replace(f'${i}', '%s')
-            
-            with psycopg.connect(self.connection_string, row_factory=dict_row) as conn:
-                with conn.cursor() as cur:
-                    cur.execute(formatted_query, params)
-                    
-                    # Check if query returns results
-                    if cur.description:
-                        return cur.fetchall()
-                    return []
+            if statement.copy is not None:
+                rows = await self._bulk_merge(statement.method, *statement.copy, statement.query)
+            else:
+                rows = await self._fetch_all(statement.method, statement.query, statement.params,
+                                             statement.ef_search)
+            return statement.result(rows)
         except Exception as e:
-            logger.error(f"✗ Query execution failed: {e}")
-            raise
+            return _handle_failure(statement, e)
+    
+    async def _done(self, value: Any) -> Any:
+        return value
 
 
 # Global database instance
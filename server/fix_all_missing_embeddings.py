@@ -5,6 +5,21 @@ Auto-detects and embeds all POIs that have NULL description_embedding
 import asyncio
 from app.core.container import container
 
+WRITE_BATCH_SIZE = 128  # POIs per batched Voyage request and bulk COPY
+
+
+def poi_searchable_text(poi: dict) -> str:
+    """Create searchable text from POI data"""
+    text_parts = [poi['name']]
+    if poi.get('description'):
+        text_parts.append(poi['description'])
+    if poi.get('category'):
+        text_parts.append(f"Category: {poi['category']}")
+    if poi.get('tags'):
+        tags_str = ', '.join(poi['tags']) if isinstance(poi['tags'], list) else str(poi['tags'])
+        text_parts.append(f"Tags: {tags_str}")
+    return ". ".join(text_parts)
+
 
 async def fix_all_missing_embeddings():
     """Find and fix all POIs without embeddings"""
@@ -30,47 +45,27 @@ async def fix_all_missing_embeddings():
         fixed_count = 0
         failed_count = 0
         
-        for poi in result:
-            poi_id = poi['id']
-            poi_name = poi['name']
+        # Embed and write one batch at a time so progress survives a crash mid-run
+        for start in range(0, len(result), WRITE_BATCH_SIZE):
+            batch = result[start:start + WRITE_BATCH_SIZE]
             
             try:
-                print(f"\n🔄 Processing POI {poi_id}: {poi_name}")
-                
-                # Create searchable text
-                text_parts = [poi_name]
-                if poi.get('description'):
-                    text_parts.append(poi['description'])
-                if poi.get('category'):
-                    text_parts.append(f"Category: {poi['category']}")
-                if poi.get('tags'):
-                    tags_str = ', '.join(poi['tags']) if isinstance(poi['tags'], list) else str(poi['tags'])
-                    text_parts.append(f"Tags: {tags_str}")
-                
-                searchable_text = ". ".join(text_parts)
-                print(f"   📝 Text: {searchable_text[:80]}...")
-                
-                # Generate embedding using POI-specific Voyage key
-                embedding = await ai.generate_embedding(searchable_text, use_poi_key=True)
-                print(f"   ✅ Generated embedding (dim={len(embedding)})")
-                
-                # Update database
-                embedding_str = f"[{','.join(map(str, embedding))}]"
-                await db.execute_query("""
-                    UPDATE pois 
-                    SET description_embedding = $1::vector
-                    WHERE id = $2
-                """, embedding_str, poi_id)
+                print(f"\n🔄 Processing POIs {start + 1}-{start + len(batch)}")
                 
-                print(f"   💾 Updated database")
-                fixed_count += 1
+                # Generate embeddings using POI-specific Voyage key (batched requests)
+                embeddings = await ai.generate_embeddings(
+                    [poi_searchable_text(poi) for poi in batch], use_poi_key=True
+                )
+                print(f"   ✅ Generated {len(embeddings)} embeddings (dim={len(embeddings[0])})")
                 
-                # Rate limiting to avoid API throttling
-                await asyncio.sleep(0.5)
+                fixed_count += await db.bulk_update_poi_embeddings(
+                    [(poi['id'], embedding) for poi, embedding in zip(batch, embeddings)]
+                )
+                print(f"   💾 Updated database ({len(batch)} POIs)")
                 
             except Exception as e:
                 print(f"   ❌ Failed: {e}")
-                failed_count += 1
+                failed_count += len(batch)
                 continue
         
         print("\n" + "=" * 60)
@@ -82,6 +77,7 @@ async def fix_all_missing_embeddings():
         print(f"❌ Error: {e}")
     finally:
         await ai.close()
+        await db.disconnect()
 
 
 if __name__ == "__main__":
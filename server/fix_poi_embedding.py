@@ -4,6 +4,7 @@ Re-embeds a specific POI that was created without embedding
 """
 import asyncio
 from app.core.container import container
+from database import to_vector
 
 
 async def fix_poi_embedding(poi_id: int):
@@ -42,12 +43,11 @@ async def fix_poi_embedding(poi_id: int):
         print(f"✅ Generated embedding (dim={len(embedding)})")
         
         # Update database
-        embedding_str = f"[{','.join(map(str, embedding))}]"
         await db.execute_query("""
             UPDATE pois 
-            SET description_embedding = $1::vector
+            SET description_embedding = $1
             WHERE id = $2
-        """, embedding_str, poi_id)
+        """, to_vector(embedding), poi_id)
         
         print(f"✅ POI {poi_id} ({poi['name']}) embedding updated!")
         
@@ -55,6 +55,7 @@ async def fix_poi_embedding(poi_id: int):
         print(f"❌ Error: {e}")
     finally:
         await ai.close()
+        await db.disconnect()
 
 
 if __name__ == "__main__":
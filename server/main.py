@@ -36,13 +36,29 @@ async def lifespan(app: FastAPI):
     # Initialize database
     try:
         db = container.get_database()
-        if db.test_connection():
+        if db.pooled:
+            await db.open_pool()
+        if await db.test_connection():
             logger.info("✓ Database connected")
         else:
             logger.warning("⚠ Database connection warning")
     except Exception as e:
         logger.error(f"✗ Database initialization failed: {e}")
     
+    # Hash-keyed document writes need the unique index; refuse to start
+    # rather than fail every document write
+    if settings.db_document_hash:
+        try:
+            has_hash = await container.get_database().has_document_hash()
+        except Exception as e:
+            has_hash = None
+            logger.warning(f"⚠ Could not check documents.hash: {e}")
+        if has_hash is False:
+            raise RuntimeError(
+                "DB_DOCUMENT_HASH is enabled but documents.hash has no unique index; "
+                "run migrate_document_hash.py or disable DB_DOCUMENT_HASH"
+            )
+    
     # Initialize AI service
     try:
         ai = container.get_ai_service()
@@ -50,6 +66,26 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"✗ AI service initialization failed: {e}")
     
+    # Create graph LLM clients and open their connections
+    try:
+        llms = container.get_llm_registry()
+        if settings.llm_warmup:
+            await llms.warm_up()
+        logger.info(f"✓ LLM clients ready: {', '.join(llms.configs)}")
+    except Exception as e:
+        logger.error(f"✗ LLM client warm-up failed: {e}")
+    
+    # Load (or train) the local intent classifier off the event loop
+    try:
+        intent_model = container.get_intent_classifier()
+        if intent_model is not None:
+            if await intent_model.load():
+                logger.info("✓ Local intent classifier ready")
+            else:
+                logger.warning("⚠ Local intent classifier unavailable, using LLM only")
+    except Exception as e:
+        logger.error(f"✗ Local intent classifier load failed: {e}")
+    
     # Initialize cache
     try:
         cache = container.get_cache_service()
@@ -59,11 +95,12 @@ async def lifespan(app: FastAPI):
     
     # Preload OSM graph
     try:
-        from app.services.osm_service import OSMService
-        osm_service = OSMService()
+        osm_service = container.get_osm_service()
         logger.info("⏳ Loading OSM campus graph...")
-        osm_service.load_campus_graph()
-        logger.info("✓ OSM graph loaded successfully")
+        if osm_service.load_campus_graph():
+            logger.info("✓ OSM graph loaded successfully")
+        else:
+            logger.warning("⚠ OSM graph preload failed (will lazy load)")
     except Exception as e:
         logger.warning(f"⚠ OSM graph preload failed (will lazy load): {e}")
     
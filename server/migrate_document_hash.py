@@ -0,0 +1,59 @@
+"""
+Add a content hash to the documents table for bulk ingestion.
+Run this ONCE before using the bulk COPY ingestion path or enabling
+DB_DOCUMENT_HASH (hash-keyed single inserts and admin writes).
+
+Steps:
+1. Add documents.hash (SHA-256 of content, same key as document_chunks.hash)
+2. Backfill it for the oldest copy of each distinct content that has no
+   hashed copy yet (duplicates keep a NULL hash so nothing is deleted).
+   Safe to re-run for rows inserted before every path set the hash.
+3. Create the unique index that ON CONFLICT (hash) merges against
+"""
+import psycopg
+from config import settings
+
+
+def migrate_document_hash():
+    """Add documents.hash with a unique index"""
+    try:
+        print("\n=== Adding content hash to documents ===\n")
+        
+        with psycopg.connect(settings.database_url) as conn:
+            with conn.cursor() as cur:
+                print("1. Adding hash column...")
+                cur.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS hash VARCHAR(64);")
+                print("   ✓ Column added")
+                
+                print("\n2. Backfilling hashes...")
+                cur.execute("""
+                    UPDATE documents d
+                    SET hash = encode(sha256(convert_to(d.content, 'UTF8')), 'hex')
+                    WHERE d.hash IS NULL
+                      AND d.id = (
+                          SELECT MIN(id) FROM documents dup
+                          WHERE dup.content = d.content AND dup.hash IS NULL
+                      )
+                      AND NOT EXISTS (
+                          SELECT 1 FROM documents hashed
+                          WHERE hashed.content = d.content AND hashed.hash IS NOT NULL
+                      );
+                """)
+                print(f"   ✓ {cur.rowcount} documents hashed")
+                
+                print("\n3. Creating unique index...")
+                cur.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS documents_hash_key
+                    ON documents (hash);
+                """)
+                print("   ✓ Index created")
+                
+                print("\n✅ Document hash migration complete!")
+                
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    migrate_document_hash()
@@ -0,0 +1,65 @@
+"""
+Add full-text search columns for hybrid document retrieval.
+Run this ONCE, then set DB_HYBRID_SEARCH=true.
+
+Steps (for documents and document_chunks):
+1. Add search_vector as a generated tsvector column
+   (titles/headings weighted A, body text weighted B; existing rows are
+   backfilled and new inserts/updates stay in sync)
+2. Create a GIN index so term lookups (course codes, office names)
+   are one index scan
+"""
+import psycopg
+from config import settings
+
+
+SEARCH_VECTORS = {
+    "documents": """
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', content), 'B')
+    """,
+    "document_chunks": """
+        setweight(to_tsvector('english',
+            coalesce(metadata->>'page_title', '') || ' ' ||
+            coalesce(metadata->>'section_title', '')), 'A') ||
+        setweight(to_tsvector('english', content), 'B')
+    """,
+}
+
+
+def migrate_fulltext():
+    """Add search_vector columns with GIN indexes"""
+    try:
+        print("\n=== Adding full-text search columns ===\n")
+        
+        with psycopg.connect(settings.database_url, autocommit=True) as conn:
+            with conn.cursor() as cur:
+                for table, expression in SEARCH_VECTORS.items():
+                    cur.execute("SELECT to_regclass(%s);", (table,))
+                    if cur.fetchone()[0] is None:
+                        print(f"- {table}: table not found, skipped")
+                        continue
+                    
+                    print(f"- {table}: adding search_vector (backfills existing rows)...")
+                    cur.execute(f"""
+                        ALTER TABLE {table}
+                        ADD COLUMN IF NOT EXISTS search_vector tsvector
+                        GENERATED ALWAYS AS ({expression}) STORED;
+                    """)
+                    cur.execute(f"""
+                        CREATE INDEX IF NOT EXISTS {table}_search_vector_idx
+                        ON {table} USING gin (search_vector);
+                    """)
+                    cur.execute(f"ANALYZE {table};")
+                    print(f"   ✓ {table}_search_vector_idx created")
+                
+                print("\n✅ Full-text migration complete!")
+                print("   - Set DB_HYBRID_SEARCH=true to enable hybrid document retrieval")
+                
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    migrate_fulltext()
@@ -14,8 +14,28 @@ import asyncio
 import sys
 from datetime import datetime
 from app.core.container import container
+from database import vector_index_sql
 from app.core.logging_config import logger
 
+EMBED_BATCH_SIZE = 128  # POIs per batched Voyage request (API maximum)
+
+
+def poi_searchable_text(poi: dict) -> str:
+    """Create searchable text from POI data"""
+    text_parts = [poi["name"]]
+    
+    if poi.get("description"):
+        text_parts.append(poi["description"])
+    
+    if poi.get("category"):
+        text_parts.append(f"Category: {poi['category']}")
+    
+    if poi.get("tags"):
+        tags_str = ", ".join(poi["tags"]) if isinstance(poi["tags"], list) else str(poi["tags"])
+        text_parts.append(f"Tags: {tags_str}")
+    
+    return ". ".join(text_parts)
+
 
 async def migrate_poi_embeddings():
     """Main migration function"""
@@ -53,12 +73,14 @@ async def migrate_poi_embeddings():
                 DROP INDEX IF EXISTS idx_pois_description_embedding
             """)
             
-            # Create IVFFlat index for fast similarity search
-            await db.execute_query("""
-                CREATE INDEX idx_pois_description_embedding 
-                ON pois USING ivfflat (description_embedding vector_cosine_ops)
-                WITH (lists = 100)
+            # Create vector index (db_vector_index) for fast similarity search
+            count = await db.execute_query("""
+                SELECT COUNT(*) AS count FROM pois WHERE description_embedding IS NOT NULL
             """)
+            await db.execute_query(vector_index_sql(
+                "idx_pois_description_embedding", "pois", "description_embedding",
+                row_count=count[0]["count"]
+            ))
             print("✅ Vector index created successfully")
         except Exception as e:
             print(f"⚠️  Index creation: {e}")
@@ -81,55 +103,38 @@ async def migrate_poi_embeddings():
             print("✅ All POIs already have embeddings!")
             return
         
-        # Step 4: Embed each POI
+        # Step 4: Embed POIs in batched requests
         print("Step 4: Generating embeddings...")
         print("-" * 60)
         
-        success_count = 0
         error_count = 0
+        embeddings = []
         
-        for idx, poi in enumerate(pois, 1):
+        for start in range(0, total, EMBED_BATCH_SIZE):
+            batch = pois[start:start + EMBED_BATCH_SIZE]
             try:
-                # Create searchable text from POI data
-                text_parts = [poi["name"]]
-                
-                if poi.get("description"):
-                    text_parts.append(poi["description"])
+                # Generate embeddings using POI-specific Voyage key
+                vectors = await ai.generate_embeddings(
+                    [poi_searchable_text(poi) for poi in batch], use_poi_key=True
+                )
                 
-                if poi.get("category"):
-                    text_parts.append(f"Category: {poi['category']}")
-                
-                if poi.get("tags"):
-                    tags_str = ", ".join(poi["tags"]) if isinstance(poi["tags"], list) else str(poi["tags"])
-                    text_parts.append(f"Tags: {tags_str}")
-                
-                searchable_text = ". ".join(text_parts)
-                
-                # Generate embedding using POI-specific Voyage key
-                embedding = await ai.generate_embedding(searchable_text, use_poi_key=True)
-                
-                # Store in database
-                embedding_str = f"[{','.join(map(str, embedding))}]"
-                await db.execute_query("""
-                    UPDATE pois 
-                    SET description_embedding = $1::vector
-                    WHERE id = $2
-                """, embedding_str, poi["id"])
-                
-                success_count += 1
-                print(f"[{idx}/{total}] ✅ {poi['name'][:50]:<50} (dim={len(embedding)})")
-                
-                # Rate limiting (avoid hitting API limits)
-                if idx % 10 == 0:
-                    await asyncio.sleep(1)
+                for idx, (poi, embedding) in enumerate(zip(batch, vectors), start + 1):
+                    embeddings.append((poi["id"], embedding))
+                    print(f"[{idx}/{total}] ✅ {poi['name'][:50]:<50} (dim={len(embedding)})")
                 
             except Exception as e:
-                error_count += 1
-                print(f"[{idx}/{total}] ❌ {poi['name'][:50]:<50} Error: {e}")
+                error_count += len(batch)
+                print(f"[{start + 1}-{start + len(batch)}/{total}] ❌ Batch failed: {e}")
         
         print("-" * 60)
         print()
         
+        # Step 5: Store all embeddings with one bulk COPY
+        print("Step 5: Storing embeddings...")
+        success_count = await db.bulk_update_poi_embeddings(embeddings)
+        print(f"💾 Stored {success_count} embeddings")
+        print()
+        
         # Summary
         print("=" * 60)
         print("MIGRATION SUMMARY")
@@ -158,8 +163,7 @@ async def migrate_poi_embeddings():
     
     finally:
         # Cleanup
-        if ai:
-            await ai.close()
+        await container.shutdown()
         print(f"\nCompleted: {datetime.now()}")
         print("=" * 60)
 
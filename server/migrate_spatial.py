@@ -0,0 +1,58 @@
+"""
+Add an index-backed spatial column to the POIs table.
+Run this ONCE, then set DB_SPATIAL_MODE=postgis to use KNN nearby queries.
+
+Steps:
+1. Enable PostGIS
+2. Add pois.location as a generated geography(Point) column
+   (existing rows are backfilled and new inserts/updates stay in sync)
+3. Create a GiST index for ST_DWithin prefiltering and <-> KNN ordering
+"""
+import psycopg
+from config import settings
+
+
+def migrate_spatial():
+    """Add pois.location geography column with GiST index"""
+    try:
+        print("\n=== Migrating POIs to PostGIS spatial index ===\n")
+        
+        with psycopg.connect(settings.database_url) as conn:
+            with conn.cursor() as cur:
+                # Enable PostGIS
+                print("1. Enabling PostGIS extension...")
+                cur.execute("CREATE EXTENSION IF NOT EXISTS postgis;")
+                print("   ✓ PostGIS enabled")
+                
+                # Generated column backfills every existing row on creation
+                print("\n2. Adding location column (backfills existing POIs)...")
+                cur.execute("""
+                    ALTER TABLE pois
+                    ADD COLUMN IF NOT EXISTS location geography(Point, 4326)
+                    GENERATED ALWAYS AS (
+                        ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography
+                    ) STORED;
+                """)
+                cur.execute("SELECT COUNT(*) FROM pois WHERE location IS NOT NULL;")
+                backfilled = cur.fetchone()[0]
+                print(f"   ✓ {backfilled} POIs have a location")
+                
+                # GiST index serves both the radius filter and KNN ordering
+                print("\n3. Creating GiST index...")
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS pois_location_gist_idx
+                    ON pois USING gist (location);
+                """)
+                cur.execute("ANALYZE pois;")
+                print("   ✓ Index created")
+                
+                print("\n✅ Spatial migration complete!")
+                print("   - Set DB_SPATIAL_MODE=postgis to enable KNN nearby queries")
+                
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    migrate_spatial()
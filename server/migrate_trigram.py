@@ -0,0 +1,70 @@
+"""
+Add a trigram-indexed search column to the POIs table.
+Run this ONCE, then set DB_TEXT_SEARCH_MODE=trigram to use fuzzy POI search.
+
+Steps:
+1. Enable pg_trgm
+2. Add pois.search_text: lowercased name, category, description and tags
+   as one generated column (existing rows are backfilled, new ones stay in sync)
+3. Create a GIN trigram index so typo-tolerant matching is one index scan
+
+Match strictness follows pg_trgm.word_similarity_threshold (default 0.6);
+lower it per database with:
+    ALTER DATABASE postgres SET pg_trgm.word_similarity_threshold = 0.5;
+"""
+import psycopg
+from config import settings
+
+
+def migrate_trigram():
+    """Add pois.search_text column with a GIN trigram index"""
+    try:
+        print("\n=== Migrating POIs to trigram text search ===\n")
+        
+        with psycopg.connect(settings.database_url) as conn:
+            with conn.cursor() as cur:
+                print("1. Enabling pg_trgm extension...")
+                cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+                print("   ✓ pg_trgm enabled")
+                
+                # array_to_string is only STABLE, so wrap it for use in a
+                # generated column (safe for text[], which has no locale output)
+                print("\n2. Adding search_text column (backfills existing POIs)...")
+                cur.execute("""
+                    CREATE OR REPLACE FUNCTION poi_search_text(
+                        name TEXT, category TEXT, description TEXT, tags TEXT[]
+                    ) RETURNS TEXT
+                    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+                        SELECT lower(concat_ws(' ', name, category, description,
+                                               array_to_string(tags, ' ')))
+                    $$;
+                """)
+                cur.execute("""
+                    ALTER TABLE pois
+                    ADD COLUMN IF NOT EXISTS search_text TEXT
+                    GENERATED ALWAYS AS (
+                        poi_search_text(name, category, description, tags)
+                    ) STORED;
+                """)
+                cur.execute("SELECT COUNT(*) FROM pois WHERE search_text IS NOT NULL;")
+                backfilled = cur.fetchone()[0]
+                print(f"   ✓ {backfilled} POIs have search text")
+                
+                print("\n3. Creating GIN trigram index...")
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS pois_search_text_trgm_idx
+                    ON pois USING gin (search_text gin_trgm_ops);
+                """)
+                cur.execute("ANALYZE pois;")
+                print("   ✓ Index created")
+                
+                print("\n✅ Trigram migration complete!")
+                print("   - Set DB_TEXT_SEARCH_MODE=trigram to enable fuzzy POI search")
+                
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    migrate_trigram()
@@ -0,0 +1,58 @@
+"""
+Rebuild the pgvector indexes as IVFFlat or HNSW.
+Run after bulk loads (IVFFlat) or when switching DB_VECTOR_INDEX.
+
+Steps (for documents, document_chunks and pois):
+1. Count rows with embeddings (sizes IVFFlat lists)
+2. Drop the existing index
+3. Create it with the chosen method and ANALYZE the table
+
+Usage:
+    python migrate_vector_index.py              # uses DB_VECTOR_INDEX
+    python migrate_vector_index.py --index hnsw
+"""
+import argparse
+import psycopg
+from config import settings
+from database import VECTOR_INDEXES, vector_index_sql
+
+
+def migrate_vector_index(method: str):
+    """Drop and recreate every vector index with the given method"""
+    try:
+        print(f"\n=== Rebuilding vector indexes ({method}) ===\n")
+        
+        with psycopg.connect(settings.database_url, autocommit=True) as conn:
+            with conn.cursor() as cur:
+                for name, (table, column) in VECTOR_INDEXES.items():
+                    cur.execute("SELECT to_regclass(%s);", (table,))
+                    if cur.fetchone()[0] is None:
+                        print(f"- {table}: table not found, skipped")
+                        continue
+                    
+                    cur.execute(f"SELECT COUNT(*) FROM {table} WHERE {column} IS NOT NULL;")
+                    row_count = cur.fetchone()[0]
+                    
+                    print(f"- {table}.{column}: {row_count} embeddings")
+                    cur.execute(f"DROP INDEX IF EXISTS {name};")
+                    cur.execute(vector_index_sql(name, table, column, method=method, row_count=row_count))
+                    cur.execute(f"ANALYZE {table};")
+                    print(f"   ✓ {name} rebuilt")
+                
+                print("\n✅ Vector index rebuild complete!")
+                print(f"   - Set DB_VECTOR_INDEX={method} so new tables use the same method")
+                
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild pgvector indexes")
+    parser.add_argument(
+        "--index",
+        choices=["ivfflat", "hnsw"],
+        default=settings.db_vector_index,
+        help=f"Index method (default: {settings.db_vector_index})"
+    )
+    migrate_vector_index(parser.parse_args().index)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+scripts/benchmark_intent_classifier.py
+Compare the local intent classifier with the LLM classifier.
+
+Holds out part of the labelled queries, trains the local model on the
+rest and measures accuracy and latency of the local model, the LLM
+classifier and the hybrid the graph runs (local when confident, LLM
+otherwise). Without --llm only the local numbers are measured and the
+hybrid assumes the LLM labels escalated queries correctly.
+
+Usage:
+    python scripts/benchmark_intent_classifier.py
+    python scripts/benchmark_intent_classifier.py --llm --holdout 0.3
+"""
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+from sklearn.model_selection import train_test_split
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from app.graph.intent_model import load_examples, train
+
+
+def percentiles(timings: list) -> str:
+    """p50/p99 of a list of millisecond timings"""
+    timings = sorted(timings)
+    p50 = timings[len(timings) // 2]
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    return f"p50={p50:8.2f}ms  p99={p99:8.2f}ms"
+
+
+async def classify_with_llm(queries: list) -> tuple:
+    """LLM labels and per-query latency, sequentially like the graph node"""
+    from app.graph.llm_registry import LLMRegistry
+    from app.graph.nodes.intent_classifier import intent_classifier_node
+
+    llms = LLMRegistry()
+    labels, timings = [], []
+    try:
+        for query in queries:
+            start = time.perf_counter()
+            result = await intent_classifier_node({"user_query": query, "reasoning_stream": []}, llms)
+            timings.append((time.perf_counter() - start) * 1000)
+            labels.append(result["intent"] if "error" not in result else None)
+    finally:
+        await llms.close()
+    return labels, timings
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark local vs LLM intent classification"
+    )
+    parser.add_argument(
+        "--data",
+        nargs="+",
+        default=[settings.intent_data_path, settings.intent_log_path or ""],
+        help="JSONL labelled queries (default: seeded + logged queries)"
+    )
+    parser.add_argument(
+        "--holdout",
+        type=float,
+        default=0.3,
+        help="Fraction of queries held out for evaluation (default: 0.3)"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=settings.intent_local_threshold,
+        help=f"Escalation threshold (default: {settings.intent_local_threshold})"
+    )
+    parser.add_argument(
+        "--llm",
+        action="store_true",
+        help="Also classify the held-out queries with the Gemini classifier"
+    )
+
+    args = parser.parse_args()
+
+    queries, labels = load_examples(*args.data)
+    train_queries, test_queries, train_labels, test_labels = train_test_split(
+        queries, labels, test_size=args.holdout, stratify=labels, random_state=42
+    )
+    model = train(train_queries, train_labels)
+    model.predict_proba(test_queries[:1])  # Warm up before timing
+
+    local, local_timings = [], []
+    for query in test_queries:
+        start = time.perf_counter()
+        probabilities = model.predict_proba([query.lower()])[0]
+        local_timings.append((time.perf_counter() - start) * 1000)
+        best = probabilities.argmax()
+        local.append((model.classes_[best], probabilities[best]))
+
+    count = len(test_queries)
+    confident = [p >= args.threshold for _, p in local]
+    local_correct = [label == truth for (label, _), truth in zip(local, test_labels)]
+
+    print(f"\n=== Intent classification ({len(train_queries)} train / {count} held out) ===")
+    print(f"Local (all):         accuracy {sum(local_correct) / count * 100:5.1f}%  {percentiles(local_timings)}")
+    answered = sum(confident)
+    if answered:
+        accuracy = sum(c for c, ok in zip(local_correct, confident) if ok) / answered * 100
+        print(f"Local (p >= {args.threshold:.2f}):  accuracy {accuracy:5.1f}%  on {answered / count * 100:.1f}% of queries")
+
+    if args.llm:
+        llm, llm_timings = asyncio.run(classify_with_llm(test_queries))
+        llm_correct = [label == truth for label, truth in zip(llm, test_labels)]
+        print(f"LLM:                 accuracy {sum(llm_correct) / count * 100:5.1f}%  {percentiles(llm_timings)}")
+    else:
+        llm_correct, llm_timings = [True] * count, None
+
+    hybrid_correct = [l if ok else m for l, m, ok in zip(local_correct, llm_correct, confident)]
+    label = "Hybrid:" if args.llm else "Hybrid (LLM = 100%):"
+    print(f"{label:<20} accuracy {sum(hybrid_correct) / count * 100:5.1f}%  escalated {(count - answered) / count * 100:.1f}% to the LLM")
+    if llm_timings:
+        hybrid_timings = [t if ok else t + m for t, m, ok in zip(local_timings, llm_timings, confident)]
+        print(f"Hybrid latency:      {percentiles(hybrid_timings)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+scripts/benchmark_vector_adapter.py
+Compare text-formatted vs binary pgvector query parameters.
+
+Measures the bytes sent per 1024-dim embedding and the client CPU spent
+encoding it. With --database, also times a round-trip distance query in
+both formats so the server-side parse cost shows up in the latency.
+
+Usage:
+    python scripts/benchmark_vector_adapter.py
+    python scripts/benchmark_vector_adapter.py --vectors 2000 --database
+"""
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import VectorBinaryDumper, register_vector_adapter
+
+
+def encode_text(embedding: list) -> bytes:
+    """Legacy encoding used before the binary adapter"""
+    return f"[{','.join(map(str, embedding))}]".encode("utf-8")
+
+
+def benchmark_encoding(vectors: np.ndarray) -> None:
+    """Payload size and encode time per vector for both formats"""
+    as_lists = [v.tolist() for v in vectors]
+    dumper = VectorBinaryDumper(np.ndarray)
+
+    start = time.perf_counter()
+    text_payloads = [encode_text(v) for v in as_lists]
+    text_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    binary_payloads = [dumper.dump(np.asarray(v, dtype=np.float32)) for v in as_lists]
+    binary_seconds = time.perf_counter() - start
+
+    text_bytes = statistics.mean(len(p) for p in text_payloads)
+    binary_bytes = statistics.mean(len(p) for p in binary_payloads)
+    count = len(vectors)
+
+    print(f"\n=== Encoding ({count} vectors, dim={vectors.shape[1]}) ===")
+    print(f"Text:   {text_bytes:>8.0f} bytes/vector  {text_seconds / count * 1e6:>8.1f} µs/vector")
+    print(f"Binary: {binary_bytes:>8.0f} bytes/vector  {binary_seconds / count * 1e6:>8.1f} µs/vector")
+    print(f"Payload reduction: {(1 - binary_bytes / text_bytes) * 100:.1f}%")
+    print(f"Encode speedup:    {text_seconds / binary_seconds:.1f}x")
+
+
+def benchmark_round_trip(vectors: np.ndarray, iterations: int) -> None:
+    """Round-trip latency of a cosine distance query in both formats"""
+    import psycopg
+    from config import settings
+
+    with psycopg.connect(settings.database_url, autocommit=True) as conn:
+        register_vector_adapter(conn)
+        base = vectors[0]
+
+        def run(label: str, param_for) -> None:
+            timings = []
+            with conn.cursor() as cur:
+                for i in range(iterations):
+                    vec = vectors[i % len(vectors)]
+                    start = time.perf_counter()
+                    cur.execute("SELECT %s::vector <=> %s::vector;", (param_for(vec), param_for(base)))
+                    cur.fetchone()
+                    timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            p50 = timings[len(timings) // 2]
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            print(f"{label}: p50={p50:.2f}ms  p99={p99:.2f}ms")
+
+        print(f"\n=== Round trip ({iterations} queries) ===")
+        run("Text  ", lambda v: encode_text(v.tolist()).decode("utf-8"))
+        run("Binary", lambda v: v)
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark text vs binary pgvector parameters"
+    )
+    parser.add_argument(
+        "--vectors",
+        type=int,
+        default=1000,
+        help="Number of random vectors to encode (default: 1000)"
+    )
+    parser.add_argument(
+        "--dim",
+        type=int,
+        default=1024,
+        help="Embedding dimension (default: 1024, voyage-2)"
+    )
+    parser.add_argument(
+        "--database",
+        action="store_true",
+        help="Also time round-trip queries against DATABASE_URL"
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=200,
+        help="Round-trip queries per format with --database (default: 200)"
+    )
+
+    args = parser.parse_args()
+
+    vectors = np.random.default_rng(42).standard_normal((args.vectors, args.dim)).astype(np.float32)
+    benchmark_encoding(vectors)
+
+    if args.database:
+        benchmark_round_trip(vectors, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
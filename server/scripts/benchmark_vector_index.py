@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+scripts/benchmark_vector_index.py
+Compare IVFFlat and HNSW indexes against an exact scan.
+
+Loads a synthetic clustered corpus into a temporary table, computes the
+exact top-k for each query with a sequential scan, then builds each index
+type and reports build time, recall@k and p50/p99 query latency for a
+range of ivfflat.probes / hnsw.ef_search values.
+
+Nothing is written to the application tables.
+
+Usage:
+    python scripts/benchmark_vector_index.py
+    python scripts/benchmark_vector_index.py --rows 50000 --k 5 --ef-search 20,40,100
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import psycopg
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from database import ivfflat_lists, register_vector_adapter
+
+
+def make_corpus(rows: int, dim: int, clusters: int, queries: int, seed: int = 42):
+    """Unit-normalized gaussian clusters (embeddings are rarely uniform) and nearby queries"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, rows)
+    corpus = centers[labels] + 0.5 * rng.standard_normal((rows, dim)).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    
+    picks = rng.integers(0, rows, queries)
+    query_vecs = corpus[picks] + 0.1 * rng.standard_normal((queries, dim)).astype(np.float32)
+    query_vecs /= np.linalg.norm(query_vecs, axis=1, keepdims=True)
+    return corpus, query_vecs
+
+
+def load_corpus(cur, corpus: np.ndarray) -> None:
+    """Binary COPY the corpus into a temp table"""
+    cur.execute(f"CREATE TEMP TABLE bench_vectors (id INTEGER, embedding vector({corpus.shape[1]}));")
+    with cur.copy("COPY bench_vectors (id, embedding) FROM STDIN (FORMAT BINARY)") as copy:
+        copy.set_types(["int4", "vector"])
+        for i, vec in enumerate(corpus):
+            copy.write_row((i, vec))
+    cur.execute("ANALYZE bench_vectors;")
+
+
+def run_queries(cur, query_vecs: np.ndarray, k: int) -> tuple:
+    """Return the top-k ids and latency (ms) for each query"""
+    ids, timings = [], []
+    for vec in query_vecs:
+        start = time.perf_counter()
+        cur.execute(
+            "SELECT id FROM bench_vectors ORDER BY embedding <=> %s LIMIT %s;",
+            (vec, k)
+        )
+        rows = cur.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+        ids.append({row[0] for row in rows})
+    return ids, timings
+
+
+def percentile(timings: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of timings"""
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def report(label: str, exact: list, ids: list, timings: list, k: int) -> None:
+    """Print recall@k and latency for one configuration"""
+    recall = np.mean([len(found & truth) / k for found, truth in zip(ids, exact)])
+    print(f"{label:<22} recall@{k}={recall:.3f}  "
+          f"p50={percentile(timings, 0.5):.2f}ms  p99={percentile(timings, 0.99):.2f}ms")
+
+
+def benchmark(args) -> None:
+    """Run the exact baseline then each index type"""
+    corpus, query_vecs = make_corpus(args.rows, args.dim, args.clusters, args.queries)
+    lists = args.lists or ivfflat_lists(args.rows)
+    
+    with psycopg.connect(settings.database_url, autocommit=True) as conn:
+        register_vector_adapter(conn)
+        with conn.cursor() as cur:
+            print(f"\nLoading {args.rows} vectors (dim={args.dim}, clusters={args.clusters})...")
+            load_corpus(cur, corpus)
+            
+            print(f"\n=== {args.queries} queries, k={args.k} ===")
+            exact, timings = run_queries(cur, query_vecs, args.k)
+            report("exact scan", exact, exact, timings, args.k)
+            
+            # Force the index path so small corpora don't fall back to seq scans
+            cur.execute("SET enable_seqscan = off;")
+            
+            start = time.perf_counter()
+            cur.execute(f"CREATE INDEX bench_ivfflat ON bench_vectors "
+                        f"USING ivfflat (embedding vector_cosine_ops) WITH (lists = {lists});")
+            print(f"\nIVFFlat (lists={lists}) built in {time.perf_counter() - start:.1f}s")
+            for probes in args.probes:
+                cur.execute("SELECT set_config('ivfflat.probes', %s, false);", (str(probes),))
+                ids, timings = run_queries(cur, query_vecs, args.k)
+                report(f"ivfflat probes={probes}", exact, ids, timings, args.k)
+            cur.execute("DROP INDEX bench_ivfflat;")
+            
+            start = time.perf_counter()
+            cur.execute(f"CREATE INDEX bench_hnsw ON bench_vectors "
+                        f"USING hnsw (embedding vector_cosine_ops) "
+                        f"WITH (m = {args.m}, ef_construction = {args.ef_construction});")
+            print(f"\nHNSW (m={args.m}, ef_construction={args.ef_construction}) "
+                  f"built in {time.perf_counter() - start:.1f}s")
+            for ef_search in args.ef_search:
+                cur.execute("SELECT set_config('hnsw.ef_search', %s, false);", (str(ef_search),))
+                ids, timings = run_queries(cur, query_vecs, args.k)
+                report(f"hnsw ef_search={ef_search}", exact, ids, timings, args.k)
+
+
+def int_list(value: str) -> list:
+    """Parse a comma-separated list of ints"""
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark IVFFlat vs HNSW recall and latency"
+    )
+    parser.add_argument("--rows", type=int, default=10000,
+                        help="Synthetic corpus size (default: 10000)")
+    parser.add_argument("--dim", type=int, default=1024,
+                        help="Embedding dimension (default: 1024, voyage-2)")
+    parser.add_argument("--clusters", type=int, default=50,
+                        help="Gaussian clusters in the corpus (default: 50)")
+    parser.add_argument("--queries", type=int, default=200,
+                        help="Queries per configuration (default: 200)")
+    parser.add_argument("--k", type=int, default=10,
+                        help="Neighbours per query for recall@k (default: 10)")
+    parser.add_argument("--lists", type=int, default=None,
+                        help="IVFFlat lists (default: rows / 1000)")
+    parser.add_argument("--probes", type=int_list, default=[1, 5, 10, 20],
+                        help="Comma-separated ivfflat.probes values (default: 1,5,10,20)")
+    parser.add_argument("--m", type=int, default=settings.db_hnsw_m,
+                        help=f"HNSW m (default: {settings.db_hnsw_m})")
+    parser.add_argument("--ef-construction", type=int, default=settings.db_hnsw_ef_construction,
+                        help=f"HNSW ef_construction (default: {settings.db_hnsw_ef_construction})")
+    parser.add_argument("--ef-search", type=int_list, default=[20, 40, 80, 160],
+                        help="Comma-separated hnsw.ef_search values (default: 20,40,80,160)")
+    
+    benchmark(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
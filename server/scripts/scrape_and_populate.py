@@ -65,40 +65,22 @@ async def scrape_and_store_astu(max_pages: int = 30):
         documents = scraper.prepare_documents(scraped_data, chunk_size=1000)
         logger.info(f"Prepared {len(documents)} documents (with chunking)")
         
-        # Store documents with embeddings
-        stored_count = 0
-        failed_count = 0
+        # Embed documents in batched requests, then store them in one bulk write
+        logger.info(f"Generating embeddings for {len(documents)} documents...")
+        embeddings = await ai_service.generate_embeddings([doc['content'] for doc in documents])
+        embedded_docs = [
+            {**doc, 'tags': doc.get('tags', []), 'embedding': embedding}
+            for doc, embedding in zip(documents, embeddings)
+        ]
         
-        for i, doc in enumerate(documents, 1):
-            try:
-                logger.info(f"Processing document {i}/{len(documents)}: {doc['title'][:50]}...")
-                
-                # Generate embedding
-                embedding = await ai_service.generate_embedding(doc['content'])
-                
-                # Insert into database
-                doc_id = database.insert_document(
-                    title=doc['title'],
-                    content=doc['content'],
-                    source=doc['source'],
-                    tags=doc.get('tags', []),
-                    embedding=embedding
-                )
-                
-                stored_count += 1
-                logger.info(f"✓ Stored document ID {doc_id}")
-                
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"✗ Failed to store document: {e}")
-                continue
+        merged = database.bulk_upsert_documents(embedded_docs)
+        stored_count = len(merged)
         
         logger.info("=" * 60)
         logger.info(f"SCRAPING COMPLETE")
         logger.info(f"Pages scraped: {len(scraped_data)}")
         logger.info(f"Documents prepared: {len(documents)}")
         logger.info(f"Successfully stored: {stored_count}")
-        logger.info(f"Failed: {failed_count}")
         logger.info("=" * 60)
         
     finally:
@@ -140,15 +122,15 @@ async def scrape_single_url(url: str):
         embedding = await ai_service.generate_embedding(content_data['content'])
         
         # Store in database
-        doc_id = database.insert_document(
-            title=content_data['title'],
-            content=content_data['content'],
-            source=content_data['url'],
-            tags=['web-scraped'],
-            embedding=embedding
-        )
+        merged = database.bulk_upsert_documents([{
+            'title': content_data['title'],
+            'content': content_data['content'],
+            'source': content_data['url'],
+            'tags': ['web-scraped'],
+            'embedding': embedding
+        }])
         
-        logger.info(f"✓ Successfully stored with ID {doc_id}")
+        logger.info(f"✓ Successfully stored with ID {merged[0]['id']}")
         
     finally:
         await ai_service.close()
@@ -174,29 +156,32 @@ async def scrape_from_sitemap():
         logger.info(f"Found {len(urls)} URLs in sitemap")
         
         # Scrape each URL
-        stored_count = 0
+        scraped_docs = []
         for i, url in enumerate(urls[:50], 1):  # Limit to 50
             try:
                 logger.info(f"Processing {i}/{len(urls)}: {url}")
                 
                 content_data = scraper.scrape_url(url)
                 if content_data and len(content_data.get('content', '')) > 100:
-                    embedding = await ai_service.generate_embedding(content_data['content'])
-                    doc_id = database.insert_document(
-                        title=content_data['title'],
-                        content=content_data['content'],
-                        source=content_data['url'],
-                        tags=['sitemap', 'web-scraped'],
-                        embedding=embedding
-                    )
-                    stored_count += 1
-                    logger.info(f"✓ Stored ID {doc_id}")
+                    scraped_docs.append({
+                        'title': content_data['title'],
+                        'content': content_data['content'],
+                        'source': content_data['url'],
+                        'tags': ['sitemap', 'web-scraped']
+                    })
+                    logger.info(f"✓ Scraped {content_data['title'][:50]}")
                     
             except Exception as e:
                 logger.error(f"Failed: {e}")
                 continue
         
-        logger.info(f"Stored {stored_count} documents from sitemap")
+        # Embed all pages in batched requests, then store them in one bulk write
+        embeddings = await ai_service.generate_embeddings([doc['content'] for doc in scraped_docs])
+        for doc, embedding in zip(scraped_docs, embeddings):
+            doc['embedding'] = embedding
+        
+        merged = database.bulk_upsert_documents(scraped_docs)
+        logger.info(f"Stored {len(merged)} documents from sitemap")
         
     finally:
         await ai_service.close()
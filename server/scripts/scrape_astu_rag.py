@@ -7,7 +7,6 @@ Uses Voyage embeddings and semantic chunking for optimal retrieval quality.
 import os
 import sys
 import hashlib
-import json
 import logging
 import time
 from datetime import datetime
@@ -20,11 +19,12 @@ import html2text
 import tiktoken
 import voyageai
 import psycopg
-from psycopg.rows import dict_row
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import settings
+from database import Database, vector_index_sql
+from app.services.rate_limiter import AdaptiveRateLimiter
 
 # Configure logging
 logging.basicConfig(
@@ -67,7 +67,11 @@ class RAGScraper:
         else:
             logger.warning("⚠️  VOYAGE_API_KEY not set. Set it with: export VOYAGE_API_KEY='your-key'")
         
+        # Paces batches to the Voyage quota (VOYAGE_RPM / VOYAGE_TPM)
+        self.rate_limiter = AdaptiveRateLimiter("voyage-rag", settings.voyage_rpm, settings.voyage_tpm)
+        
         self.db_connection_string = settings.database_url
+        self.database = Database()
         self.html2text_converter = html2text.HTML2Text()
         self.html2text_converter.ignore_links = False
         self.html2text_converter.ignore_images = True
@@ -466,10 +470,17 @@ class RAGScraper:
             
             for i in range(0, len(texts), batch_size):
                 batch = texts[i:i + batch_size]
+                tokens = sum(self.count_tokens(text) for text in batch)
                 
-                # Retry logic for rate limits
-                max_retries = 3
+                # Wait for the rate limiter instead of a fixed delay; on a rate
+                # limit error it halves the request rate and retries
+                max_retries = 5
                 for attempt in range(max_retries):
+                    wait_time = self.rate_limiter.reserve(tokens)
+                    if wait_time > 0:
+                        logger.info(f"⏳ Waiting {wait_time:.1f}s for Voyage rate limit")
+                        time.sleep(wait_time)
+                    
                     try:
                         result = self.voyage_client.embed(
                             batch,
@@ -477,17 +488,13 @@ class RAGScraper:
                             input_type="document"
                         )
                         all_embeddings.extend(result.embeddings)
-                        
-                        # Add delay to respect rate limits (3 RPM = 20 seconds between requests)
-                        if i + batch_size < len(texts):
-                            time.sleep(21)  # Wait 21 seconds between batches
+                        self.rate_limiter.succeeded()
                         break
                         
                     except Exception as e:
                         if "rate limit" in str(e).lower() and attempt < max_retries - 1:
-                            wait_time = 30 * (attempt + 1)  # 30, 60 seconds
-                            logger.warning(f"⏳ Rate limit hit, waiting {wait_time}s before retry {attempt + 2}/{max_retries}")
-                            time.sleep(wait_time)
+                            pause = self.rate_limiter.throttled()
+                            logger.warning(f"⏳ Rate limit hit, backing off {pause:.0f}s before retry {attempt + 2}/{max_retries}")
                         else:
                             raise
             
@@ -514,68 +521,29 @@ class RAGScraper:
         # First, ensure the table exists with proper schema
         self.ensure_chunk_table()
         
-        stored = 0
-        updated = 0
-        skipped = 0
+        rows = [
+            {
+                "content": chunk["content"],
+                "embedding": chunk.get("embedding"),
+                "source_url": chunk["source_url"],
+                "metadata": {
+                    "page_title": chunk["page_title"],
+                    "section_title": chunk["section_title"],
+                    "content_type": chunk["content_type"],
+                    "tags": chunk["tags"],
+                    "chunk_summary": chunk.get("chunk_summary", "")
+                },
+                "language": chunk["language"],
+                "date_scraped": chunk["date_scraped"],
+                "hash": chunk["hash"],
+                "token_count": chunk.get("token_count", 0)
+            }
+            for chunk in chunks
+        ]
         
         try:
-            # Use a fresh connection for each batch to avoid prepared statement conflicts
-            with psycopg.connect(self.db_connection_string, row_factory=dict_row, prepare_threshold=None) as conn:
-                conn.autocommit = False
-                with conn.cursor() as cur:
-                    for chunk in chunks:
-                        # Check if chunk exists
-                        cur.execute("SELECT id, embedding FROM document_chunks WHERE hash = %s LIMIT 1;", (chunk["hash"],))
-                        existing = cur.fetchone()
-                        
-                        # Prepare embedding
-                        embedding_str = None
-                        if "embedding" in chunk and chunk["embedding"]:
-                            embedding_str = f"[{','.join(map(str, chunk['embedding']))}]"
-                        
-                        # Prepare metadata JSON
-                        metadata = {
-                            "page_title": chunk["page_title"],
-                            "section_title": chunk["section_title"],
-                            "content_type": chunk["content_type"],
-                            "tags": chunk["tags"],
-                            "chunk_summary": chunk.get("chunk_summary", "")
-                        }
-                        
-                        if existing:
-                            # If chunk exists but has no embedding, update it
-                            if existing["embedding"] is None and embedding_str:
-                                cur.execute("""
-                                    UPDATE document_chunks 
-                                    SET embedding = %s::vector, 
-                                        metadata = %s::jsonb
-                                    WHERE id = %s;
-                                """, (embedding_str, json.dumps(metadata), existing["id"]))
-                                updated += 1
-                            else:
-                                skipped += 1
-                        else:
-                            # Insert new chunk
-                            cur.execute("""
-                                INSERT INTO document_chunks (
-                                    content, embedding, source_url, metadata,
-                                    language, date_scraped, hash, token_count
-                                ) VALUES (
-                                    %s, %s::vector, %s, %s::jsonb, %s, %s, %s, %s
-                                );
-                            """, (
-                                chunk["content"],
-                                embedding_str,
-                                chunk["source_url"],
-                                json.dumps(metadata),
-                                chunk["language"],
-                                chunk["date_scraped"],
-                                chunk["hash"],
-                                chunk.get("token_count", 0)
-                            ))
-                            stored += 1
-                
-                conn.commit()
+            # One COPY into a staging table plus one merge for the whole page
+            merged = self.database.bulk_upsert_chunks(rows)
         
         except Exception as e:
             error_msg = f"Database storage error: {str(e)}"
@@ -583,6 +551,10 @@ class RAGScraper:
             self.stats["errors"].append(error_msg)
             raise
         
+        stored = sum(1 for row in merged if row["inserted"])
+        updated = len(merged) - stored
+        skipped = len(chunks) - len(merged)
+        
         self.stats["chunks_skipped"] += skipped
         logger.info(f"✓ Stored {stored} new chunks, updated {updated} chunks with embeddings, skipped {skipped} duplicates")
     
@@ -612,11 +584,11 @@ class RAGScraper:
                         ON document_chunks(hash);
                     """)
                     
-                    cur.execute("""
-                        CREATE INDEX IF NOT EXISTS document_chunks_embedding_idx 
-                        ON document_chunks USING ivfflat (embedding vector_cosine_ops)
-                        WITH (lists = 100);
-                    """)
+                    cur.execute("SELECT COUNT(*) FROM document_chunks WHERE embedding IS NOT NULL;")
+                    cur.execute(vector_index_sql(
+                        "document_chunks_embedding_idx", "document_chunks", "embedding",
+                        row_count=cur.fetchone()[0]
+                    ))
                     
                     cur.execute("""
                         CREATE INDEX IF NOT EXISTS document_chunks_metadata_idx 
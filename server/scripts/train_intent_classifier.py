@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+scripts/train_intent_classifier.py
+Train and evaluate the local intent classifier.
+
+Trains on the seeded queries plus any LLM-labelled queries logged in
+production, reports stratified cross-validated accuracy, per-intent
+precision/recall and how many queries clear the confidence threshold
+(and how accurate those are), then saves the model the server loads.
+
+Usage:
+    python scripts/train_intent_classifier.py
+    python scripts/train_intent_classifier.py --threshold 0.9 --folds 10
+    python scripts/train_intent_classifier.py --eval-only
+"""
+import sys
+import argparse
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from app.graph.intent_model import build_pipeline, load_examples, train, save_model
+
+
+def evaluate(queries: list, labels: list, folds: int, threshold: float) -> None:
+    """Cross-validated accuracy overall and above the escalation threshold"""
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    probabilities = cross_val_predict(build_pipeline(), queries, labels, cv=cv, method="predict_proba")
+    classes = np.array(sorted(set(labels)))
+    predicted = classes[probabilities.argmax(axis=1)]
+    confidence = probabilities.max(axis=1)
+    actual = np.array(labels)
+
+    print(f"\n=== {folds}-fold cross-validation ({len(queries)} queries) ===")
+    print(f"Accuracy: {accuracy_score(actual, predicted) * 100:.1f}%")
+    print(classification_report(actual, predicted, digits=3))
+
+    print(f"{'threshold':>9}  {'answered locally':>16}  {'local accuracy':>14}")
+    for value in sorted({0.5, 0.7, 0.8, 0.85, 0.9, 0.95, threshold}):
+        confident = confidence >= value
+        coverage = confident.mean() * 100
+        accuracy = (predicted[confident] == actual[confident]).mean() * 100 if confident.any() else 0.0
+        marker = "  <- configured" if value == threshold else ""
+        print(f"{value:>9.2f}  {coverage:>15.1f}%  {accuracy:>13.1f}%{marker}")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Train and evaluate the local intent classifier"
+    )
+    parser.add_argument(
+        "--data",
+        nargs="+",
+        default=[settings.intent_data_path, settings.intent_log_path or ""],
+        help="JSONL training files (default: seeded + logged queries)"
+    )
+    parser.add_argument(
+        "--output",
+        default=settings.intent_model_path,
+        help=f"Model file (default: {settings.intent_model_path})"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=settings.intent_local_threshold,
+        help=f"Escalation threshold to report on (default: {settings.intent_local_threshold})"
+    )
+    parser.add_argument(
+        "--folds",
+        type=int,
+        default=5,
+        help="Cross-validation folds (default: 5)"
+    )
+    parser.add_argument(
+        "--eval-only",
+        action="store_true",
+        help="Evaluate without saving a model"
+    )
+
+    args = parser.parse_args()
+
+    queries, labels = load_examples(*args.data)
+    if not queries:
+        print("No training data found")
+        sys.exit(1)
+
+    evaluate(queries, labels, args.folds, args.threshold)
+
+    if not args.eval_only:
+        path = save_model(train(queries, labels), args.output, len(queries))
+        print(f"\nSaved model trained on {len(queries)} queries to {path}")
+
+
+if __name__ == "__main__":
+    main()
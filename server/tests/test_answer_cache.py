@@ -0,0 +1,57 @@
+"""
+Tests for SemanticAnswerCache hits and stale source detection.
+"""
+from app.services.answer_cache import SemanticAnswerCache
+
+
+QUESTION = [1.0, 0.0, 0.0]
+PARAPHRASE = [0.98, 0.2, 0.0]  # Cosine ~0.98 to QUESTION
+UNRELATED = [0.0, 1.0, 0.0]
+
+FEES = {"id": 1, "content": "Tuition is due in October."}
+CALENDAR = {"id": 2, "content": "Registration opens in September."}
+
+
+def _cache_with_answer():
+    cache = SemanticAnswerCache(ai_service=None, threshold=0.9)
+    cache.store("graph", "when is tuition due", QUESTION, {"answer": "In October."}, [FEES, CALENDAR])
+    return cache
+
+
+def test_paraphrase_hits_when_sources_come_back_unchanged():
+    cache = _cache_with_answer()
+
+    # Extra retrieved documents don't matter, only the ones the answer cites
+    entry = cache.lookup("graph", PARAPHRASE, [CALENDAR, FEES, {"id": 3, "content": "Library hours."}])
+
+    assert entry.answer == {"answer": "In October."}
+    assert entry.similarity > 0.9
+    assert cache.stats()["hits"] == 1
+
+
+def test_edited_source_makes_the_entry_stale():
+    cache = _cache_with_answer()
+
+    assert cache.lookup("graph", PARAPHRASE, [{"id": 1, "content": "Tuition is due in November."}, CALENDAR]) is None
+    assert cache.stats()["stale"] == 1
+    assert cache.stats()["size"] == 0  # Dropped, so the next lookup is a plain miss
+
+    assert cache.lookup("graph", QUESTION, [FEES, CALENDAR]) is None
+    assert cache.stats()["stale"] == 1
+
+
+def test_source_no_longer_retrieved_makes_the_entry_stale():
+    cache = _cache_with_answer()
+
+    assert cache.lookup("graph", QUESTION, [FEES]) is None
+    assert cache.stats()["stale"] == 1
+
+
+def test_other_namespace_or_question_misses_without_going_stale():
+    cache = _cache_with_answer()
+
+    assert cache.lookup("query", QUESTION, [FEES, CALENDAR]) is None
+    assert cache.lookup("graph", UNRELATED, [FEES, CALENDAR]) is None
+
+    stats = cache.stats()
+    assert (stats["misses"], stats["stale"], stats["size"]) == (2, 0, 1)
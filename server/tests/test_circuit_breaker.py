@@ -0,0 +1,97 @@
+"""
+Tests for CircuitBreaker and how the graph's LLM calls feed it.
+"""
+import asyncio
+
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+from app.core.exceptions import CircuitOpenError
+from app.graph.llm_registry import is_rate_limited
+
+
+class ResourceExhausted(Exception):
+    """Shaped like the Gemini client's 429 error"""
+    code = 429
+
+
+async def _fail(error):
+    raise error
+
+
+def _cool_down(breaker):
+    """Move the breaker's open time back past its cool-down"""
+    breaker.opened_at -= breaker.open_seconds + 1
+
+
+def test_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker("voyage", window=4, min_calls=4, failure_rate=0.5, half_open_calls=2)
+    for success in (True, False, True):
+        breaker.record(success, 10)
+    assert breaker.state == CLOSED  # Below min_calls
+
+    breaker.record(False, 10)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    _cool_down(breaker)
+    breaker.before_call()
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # Only half_open_calls probes at a time
+
+    breaker.record(True, 10)
+    breaker.record(True, 10)
+    assert breaker.state == CLOSED
+    snapshot = breaker.snapshot()
+    assert (snapshot["opened"], snapshot["rejected"], snapshot["window_calls"]) == (1, 2, 0)
+
+
+def test_failed_or_slow_probe_reopens():
+    breaker = CircuitBreaker("voyage", window=2, min_calls=2, slow_call_ms=100, slow_call_rate=1.0)
+    breaker.record(True, 500)
+    breaker.record(True, 500)
+    assert breaker.state == OPEN  # Every call slow
+
+    _cool_down(breaker)
+    breaker.before_call()
+    breaker.record(True, 500)
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["retry_in_s"] > 0
+
+
+def test_cancelled_probe_releases_its_slot():
+    breaker = CircuitBreaker("gemini", window=2, min_calls=2, half_open_calls=1)
+    breaker.record(False, 10)
+    breaker.record(False, 10)
+    _cool_down(breaker)
+
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(breaker.call(cancelled))
+    breaker.before_call()  # The slot is free again
+    assert breaker.state == HALF_OPEN
+
+
+def test_rate_limit_errors_do_not_open_the_breaker():
+    breaker = CircuitBreaker("gemini", window=10, min_calls=3, failure_rate=0.5)
+
+    for _ in range(10):
+        with pytest.raises(ResourceExhausted):
+            asyncio.run(breaker.call(lambda: _fail(ResourceExhausted("quota")), ignore=is_rate_limited))
+
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["failures"] == 0
+
+
+def test_is_rate_limited_follows_the_cause_chain():
+    wrapped = RuntimeError("generation failed")
+    wrapped.__cause__ = ResourceExhausted("quota")
+
+    assert is_rate_limited(wrapped)
+    assert is_rate_limited(ValueError("429 RESOURCE_EXHAUSTED"))
+    assert not is_rate_limited(ConnectionError("reset by peer"))
@@ -0,0 +1,92 @@
+"""
+Tests for the SQL the database layer picks from settings.
+"""
+import asyncio
+
+import pytest
+
+from database import (AsyncDatabase, Database, _QueryTimer, _insert_document_query, _is_read_only, content_hash,
+                      INSERT_DOCUMENT_SQL, UPSERT_DOCUMENT_SQL)
+from config import settings
+
+
+def test_plain_insert_without_document_hash(monkeypatch):
+    monkeypatch.setattr(settings, "db_document_hash", False)
+
+    sql, params = _insert_document_query("Fees", "Tuition is due in October.", None, None, None)
+
+    assert sql == INSERT_DOCUMENT_SQL and "hash" not in sql
+    assert params == ("Fees", "Tuition is due in October.", None, None, None)
+
+
+def test_hash_keyed_upsert_with_document_hash(monkeypatch):
+    monkeypatch.setattr(settings, "db_document_hash", True)
+
+    sql, params = _insert_document_query("Fees", "Tuition is due in October.", None, None, None)
+
+    assert sql == UPSERT_DOCUMENT_SQL and "ON CONFLICT (hash)" in sql
+    assert params[-1] == content_hash("Tuition is due in October.")
+
+
+def test_sync_and_async_share_row_handling(monkeypatch):
+    sync_db, async_db = Database(), AsyncDatabase(pooled=False)
+    calls = []
+
+    def fetch_all(method, query, params=(), ef_search=None):
+        calls.append((method, query, params))
+        return [{"id": 7}]
+
+    async def async_fetch_all(*args):
+        return fetch_all(*args)
+
+    monkeypatch.setattr(sync_db, "_fetch_all", fetch_all)
+    monkeypatch.setattr(async_db, "_fetch_all", async_fetch_all)
+
+    assert sync_db.insert_poi("Library", "library", 8.56, 39.29) == 7
+    assert asyncio.run(async_db.insert_poi("Library", "library", 8.56, 39.29)) == 7
+    assert calls[0] == calls[1]
+    assert asyncio.run(async_db.bulk_upsert_documents([])) == []
+
+
+def test_failed_searches_return_empty_and_writes_raise(monkeypatch):
+    db = Database()
+
+    def fetch_all(*args):
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(db, "_fetch_all", fetch_all)
+
+    assert db.search_pois_by_text("library") == []
+    with pytest.raises(RuntimeError):
+        db.execute_query("DELETE FROM pois WHERE id = $1", 1)
+
+
+def test_only_reads_are_explained_with_analyze():
+    assert _is_read_only("SELECT id FROM documents WHERE embedding IS NOT NULL")
+    assert _is_read_only("WITH ranked AS (SELECT id FROM documents) SELECT * FROM ranked")
+    assert not _is_read_only("INSERT INTO documents (title) VALUES (%s) RETURNING id")
+    assert not _is_read_only("WITH moved AS (DELETE FROM pois RETURNING id) SELECT * FROM moved")
+    assert not _is_read_only("UPDATE documents SET title = %s")
+
+
+def test_slow_query_plan_is_captured_after_rows_are_returned(monkeypatch):
+    db = AsyncDatabase(pooled=False)
+    monkeypatch.setattr(settings, "db_slow_query_explain", True)
+    explained, reported = asyncio.Event(), []
+
+    async def explain(query, text, params, ef_search):
+        explained.set()
+        return ["Seq Scan on documents"]
+
+    monkeypatch.setattr(db, "_explain", explain)
+    monkeypatch.setattr("database._report_slow_query", lambda timer, text, plan: reported.append(plan))
+
+    async def run():
+        timer = _QueryTimer("test_slow_plan_capture")
+        db._report_slow(timer, "SELECT 1", "SELECT 1", (), None)
+        assert not explained.is_set()  # Nothing ran before the caller got its rows
+        await asyncio.wait_for(explained.wait(), 1)
+        await asyncio.gather(*db._explains)
+
+    asyncio.run(run())
+    assert reported == [["Seq Scan on documents"]]
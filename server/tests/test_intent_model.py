@@ -0,0 +1,40 @@
+"""
+Tests that LocalIntentClassifier trains and logs off the event loop.
+"""
+import asyncio
+import json
+import threading
+
+from app.graph.intent_model import LocalIntentClassifier
+
+
+def test_predict_escalates_until_loaded_and_trains_in_a_thread(tmp_path):
+    model = LocalIntentClassifier(str(tmp_path / "missing.joblib"), threshold=0.0,
+                                  data_paths=("data/intent_queries.jsonl",))
+    threads = []
+    load = model._load
+    model._load = lambda: threads.append(threading.current_thread()) or load()
+
+    async def run():
+        first = model.predict("where is the library")
+        await model._loading
+        return first, model.predict("where is the library")
+
+    first, second = asyncio.run(run())
+    assert first is None
+    assert second is not None and second[0] in ("NAVIGATION", "MIXED")
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_log_label_appends_from_a_worker_thread(tmp_path):
+    log = tmp_path / "labels.jsonl"
+    model = LocalIntentClassifier(str(tmp_path / "missing.joblib"), threshold=0.5, log_path=str(log))
+
+    async def run():
+        model.log_label("when does registration open", "UNIVERSITY_INFO")
+        assert model._writes
+        await asyncio.gather(*model._writes)
+
+    asyncio.run(run())
+    assert json.loads(log.read_text()) == {"query": "when does registration open", "intent": "UNIVERSITY_INFO"}
+    assert model.stats()["logged"] == 1
@@ -0,0 +1,44 @@
+"""
+Tests for JsonFieldStreamer decoding a field from arbitrarily split chunks.
+"""
+import json
+
+from app.graph.json_stream import JsonFieldStreamer, chunk_text
+
+
+ANSWER = 'Take the "main" road.\nThen turn \\ left — café 😀 / done'
+RESPONSE = json.dumps({"sources": ["doc 1"], "answer": ANSWER, "confidence": 0.9})
+
+
+def _stream(text, size):
+    streamer = JsonFieldStreamer("answer")
+    pieces = [streamer.feed(text[i:i + size]) for i in range(0, len(text), size)]
+    return streamer, pieces
+
+
+def test_every_chunk_size_decodes_the_same_answer():
+    # ensure_ascii escapes give \uXXXX sequences, including a surrogate pair
+    for text in (RESPONSE, json.dumps({"answer": ANSWER}, ensure_ascii=False)):
+        for size in range(1, 14):
+            streamer, pieces = _stream(text, size)
+
+            assert "".join(pieces) == ANSWER, size
+            assert streamer.done
+            assert streamer.text == text
+            assert json.loads(streamer.text)["answer"] == ANSWER
+
+
+def test_nothing_is_emitted_before_the_field_or_after_it_closes():
+    streamer = JsonFieldStreamer("answer")
+
+    assert streamer.feed('{"sources": ["a"], "ans') == ""
+    assert streamer.feed('wer" : "Hi') == "Hi"
+    assert streamer.feed('\\') == ""  # Escape split across chunks is held back
+    assert streamer.feed('n!", "answer_note": "x"}') == "\n!"
+    assert streamer.feed("trailing") == ""
+
+
+def test_chunk_text_keeps_only_text_blocks():
+    assert chunk_text("plain") == "plain"
+    assert chunk_text(["a", {"type": "text", "text": "b"}, {"type": "tool_use", "text": "c"}]) == "ab"
+    assert chunk_text(None) == ""
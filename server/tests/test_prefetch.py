@@ -0,0 +1,95 @@
+"""
+Tests for cancelling speculative embeddings before they reach Voyage.
+"""
+import asyncio
+
+from app.core.singleflight import SingleFlight
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.graph.prefetch import EmbeddingPrefetch
+from app.graph.nodes.geo_helpers import poi_search_terms
+from app.graph.nodes.intent_classifier import intent_classifier_node
+
+
+class BatchedAI:
+    """generate_embedding shaped like AIService: single-flight over a batcher"""
+
+    def __init__(self):
+        self.upstream = []
+        self.inflight = SingleFlight()
+        self.batcher = EmbeddingBatcher(self._embed, window_ms=20)
+
+    async def _embed(self, texts, use_poi_key):
+        self.upstream.append((list(texts), use_poi_key))
+        return [[1.0, 0.0] for _ in texts]
+
+    async def generate_embedding(self, text, use_poi_key=False):
+        return await self.inflight.do(f"{use_poi_key}:{text}", lambda: self.batcher.embed(text, use_poi_key))
+
+
+def test_cancelled_branch_never_reaches_upstream():
+    async def run():
+        ai = BatchedAI()
+        prefetch = EmbeddingPrefetch(ai)
+        prefetch.start("what are the library hours")
+        prefetch.start("library", use_poi_key=True)
+        await asyncio.sleep(0)
+
+        prefetch.cancel(True)  # Classified as UNIVERSITY_INFO inside the batch window
+        embedding = await prefetch.get("what are the library hours")
+        prefetch.cancel_unused()
+        await asyncio.sleep(0.05)
+        return ai, embedding
+
+    ai, embedding = asyncio.run(run())
+    assert embedding == [1.0, 0.0]
+    assert ai.upstream == [(["what are the library hours"], False)]
+    assert ai.inflight.stats()["abandoned"] == 1
+
+
+def test_shared_call_survives_one_cancelled_caller():
+    async def run():
+        ai = BatchedAI()
+        first = asyncio.ensure_future(ai.generate_embedding("library", True))
+        second = asyncio.ensure_future(ai.generate_embedding("library", True))
+        await asyncio.sleep(0)
+        first.cancel()
+        return ai, await second
+
+    ai, embedding = asyncio.run(run())
+    assert embedding == [1.0, 0.0]
+    assert ai.upstream == [(["library"], True)]
+
+
+def test_poi_terms_skip_whole_query_fallback():
+    assert poi_search_terms("what are the registration requirements") == []
+    assert poi_search_terms("take me from the library to block 8") == ["the library", "block 8"]
+
+
+class FixedIntentModel:
+    def __init__(self, intent):
+        self.intent = intent
+
+    def predict(self, query):
+        return self.intent, 0.99
+
+
+def test_intent_keeps_only_the_prefetches_its_branch_reads():
+    async def run(intent):
+        ai = BatchedAI()
+        prefetch = EmbeddingPrefetch(ai)
+        query = "where is the nearest pharmacy"
+        prefetch.start(query)
+        prefetch.start("nearest pharmacy", use_poi_key=True)
+        await asyncio.sleep(0)
+
+        state = {"user_query": query, "prefetch": prefetch, "reasoning_stream": []}
+        await intent_classifier_node(state, llm_registry=None, intent_model=FixedIntentModel(intent))
+        kept = sorted(prefetch._tasks)
+        prefetch.cancel_unused()
+        await asyncio.sleep(0.05)
+        return kept, ai.upstream
+
+    assert asyncio.run(run("NEARBY_SERVICE")) == ([], [])
+    kept, upstream = asyncio.run(run("NAVIGATION"))
+    assert kept == [("nearest pharmacy", True)]
+    assert upstream == []  # Nobody claimed it either, so it was cancelled at the end
@@ -0,0 +1,44 @@
+"""
+Tests for RAGService when the question embedding for the answer cache fails.
+"""
+import asyncio
+
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.rag_service import RAGService
+
+
+class Doc:
+    def __init__(self, id, content):
+        self.id, self.content, self.title, self.source = id, content, f"Doc {id}", "handbook"
+
+
+class DownAI:
+    """Embeddings fail (provider error or open breaker); text generation works"""
+
+    async def generate_embedding(self, text):
+        raise RuntimeError("embedding provider unavailable")
+
+    async def generate_text(self, prompt):
+        return "Registration opens in September."
+
+
+class LexicalVector:
+    def __init__(self):
+        self.calls = []
+
+    async def search_documents(self, query, limit=5, query_embedding=None):
+        self.calls.append(query_embedding)
+        return [Doc(1, "Registration opens in September.")]
+
+
+def test_embedding_failure_skips_answer_cache_and_still_answers():
+    ai, vector = DownAI(), LexicalVector()
+    cache = SemanticAnswerCache(ai)
+    rag = RAGService(vector, ai, answer_cache=cache)
+
+    answer = asyncio.run(rag.answer_question("when does registration open"))
+
+    assert answer["answer"] == "Registration opens in September."
+    assert vector.calls == [None]
+    assert cache.stats()["lookups"] == 0
+    assert cache.stats()["stores"] == 0
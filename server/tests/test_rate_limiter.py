@@ -0,0 +1,109 @@
+"""
+Tests for TokenBucket, AIMD rate adaptation and AdaptiveRateLimiter with a
+shared store that fails mid-acquire.
+"""
+import asyncio
+import time
+
+from app.services.ai_service import GeminiAIService
+from app.services.rate_limiter import (AIMD_MIN_FRACTION, AdaptiveRateLimiter, RedisLimiterStore,
+                                       TokenBucket, parse_retry_after)
+from config import settings
+
+
+class FlakyStore(RedisLimiterStore):
+    """Shared store whose reservations fail from the given bucket kind on"""
+
+    def __init__(self, fail_on: str):
+        super().__init__("redis://unused")
+        self.fail_on = fail_on
+        self.reserved = []
+
+    async def reserve(self, bucket, rate, capacity, cost):
+        if bucket.endswith(f":{self.fail_on}") or not self.available:
+            self.available = False  # Like the real store after an error
+            return None
+        self.reserved.append((bucket, cost))
+        return 0.0
+
+
+def test_token_bucket_queues_reservations_past_capacity():
+    bucket = TokenBucket(rate=2.0, capacity=10.0)
+    start = bucket.updated
+
+    assert bucket.reserve(4, now=start) == 0.0
+    assert bucket.reserve(8, now=start) == 1.0  # 2 tokens short at 2/s
+    assert bucket.reserve(1, now=start + 1.0) == 0.5  # Debt paid, next waits its turn
+    assert bucket.reserve(0, now=start + 100) == 0.0
+    assert bucket.tokens == 10.0  # Refill stops at capacity
+
+
+def test_throttle_halves_the_rate_and_pauses_the_key():
+    limiter = AdaptiveRateLimiter("gemini:key", rpm=60, tpm=6000)
+
+    pause = limiter.throttled()
+
+    assert limiter.fraction == 0.5
+    assert (limiter.requests.rate, limiter.tokens.rate) == (0.5, 50.0)
+    assert pause == 2.0  # One request interval at the halved rate
+    assert limiter.paused_until > time.time() + 1.5
+    assert limiter.throttled(retry_after=30) == 30
+    assert limiter.stats()["throttled"] == 2
+
+
+def test_rate_has_a_floor_and_recovers_additively():
+    limiter = AdaptiveRateLimiter("gemini:key", rpm=60)
+    for _ in range(10):
+        limiter.throttled(retry_after=0)
+
+    assert limiter.fraction == AIMD_MIN_FRACTION
+
+    limiter.succeeded()
+    assert round(limiter.fraction, 2) == 0.1
+    for _ in range(30):
+        limiter.succeeded()
+    assert limiter.fraction == 1.0 and limiter.requests.rate == 1.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # In the past
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_redis_failure_between_reservations_charges_each_quota_once():
+    store = FlakyStore(fail_on="tokens")
+    limiter = AdaptiveRateLimiter("voyage:key", rpm=60, tpm=6000, store=store)
+    requests_before, tokens_before = limiter.requests.tokens, limiter.tokens.tokens
+
+    asyncio.run(limiter.acquire(cost=100))
+
+    # The request was reserved in Redis; only the failed token quota falls back locally
+    assert store.reserved == [("voyage:key:requests", 1.0)]
+    assert limiter.requests.tokens == requests_before
+    assert limiter.tokens.tokens == tokens_before - 100
+    assert limiter.stats()["requests"] == 1
+
+
+def test_redis_unavailable_falls_back_to_local_buckets():
+    store = FlakyStore(fail_on="requests")
+    limiter = AdaptiveRateLimiter("voyage:key", rpm=60, tpm=6000, store=store)
+    requests_before, tokens_before = limiter.requests.tokens, limiter.tokens.tokens
+
+    asyncio.run(limiter.acquire(cost=100))
+
+    assert store.reserved == []
+    assert limiter.requests.tokens == requests_before - 1
+    assert limiter.tokens.tokens == tokens_before - 100
+
+
+def test_document_and_poi_pools_never_share_buckets(monkeypatch):
+    monkeypatch.setattr(settings, "voyage_api_key", "same-key")
+    monkeypatch.setattr(settings, "voyage_poi_api_key", "same-key")
+
+    service = GeminiAIService()
+
+    assert (service.voyage_keys.name, service.voyage_poi_keys.name) == ("voyage", "voyage_poi")
+    assert service.voyage_keys.limiters[0].name != service.voyage_poi_keys.limiters[0].name
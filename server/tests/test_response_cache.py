@@ -0,0 +1,89 @@
+"""
+Tests for response cache keys, generation invalidation, and that the cache
+is only kept in process with a single worker.
+"""
+import asyncio
+
+import pytest
+
+from app.core.container import ServiceContainer
+from app.graph.response_cache import ResponseCache, geohash, response_cache_keys
+from app.services.cache_service import MemoryCacheService
+from config import settings
+
+
+def test_no_cache_without_redis_when_workers_would_diverge(monkeypatch):
+    monkeypatch.setattr(settings, "response_cache_enabled", True)
+    monkeypatch.setattr(settings, "web_concurrency", 4)
+    container = ServiceContainer()
+    container._cache = MemoryCacheService()
+
+    assert container.get_response_cache() is None
+
+
+def test_in_process_cache_with_a_single_worker(monkeypatch):
+    monkeypatch.setattr(settings, "response_cache_enabled", True)
+    monkeypatch.setattr(settings, "web_concurrency", 1)
+    container = ServiceContainer()
+    container._cache = MemoryCacheService()
+
+    cache = container.get_response_cache()
+    assert cache is not None and cache.backend is None
+
+
+TTLS = {"NAVIGATION": 3600, "UNIVERSITY_INFO": 3600}
+LIBRARY = {"user_query": "Where is the library?", "latitude": 8.5630, "longitude": 39.2904}
+
+
+def _result(intent):
+    return {"intent": intent, "final_answer": "Behind block 10.", "confidence": "high"}
+
+
+def test_geohash_matches_the_reference_encoding():
+    assert geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert geohash(8.5630, 39.2904, 5) == geohash(8.5630, 39.2904)[:5]
+
+
+def test_keys_share_a_cell_and_ignore_trivial_query_variants():
+    query_key, input_key = response_cache_keys(LIBRARY)
+    nearby = {**LIBRARY, "user_query": "  where IS the library? ", "latitude": 8.56301}
+
+    assert response_cache_keys(nearby) == (query_key, input_key)
+    assert response_cache_keys({**LIBRARY, "mode": "driving"})[1] != input_key
+    assert response_cache_keys({**LIBRARY, "latitude": 8.60})[1] != input_key
+    assert response_cache_keys({**LIBRARY, "latitude": 8.60})[0] == query_key
+
+
+def test_location_only_keys_geo_intents():
+    async def run():
+        cache = ResponseCache(backend=MemoryCacheService(), ttls=TTLS)
+        generations = await cache.generations()
+        elsewhere = {**LIBRARY, "latitude": 9.0}
+
+        await cache.set(LIBRARY, _result("NAVIGATION"), generations)
+        assert await cache.get(elsewhere, generations) is None
+
+        await cache.set(LIBRARY, _result("UNIVERSITY_INFO"), generations)
+        assert (await cache.get(elsewhere, generations))["intent"] == "UNIVERSITY_INFO"
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("backend", [None, MemoryCacheService()])
+def test_invalidating_a_source_only_misses_answers_built_from_it(backend):
+    async def run():
+        cache = ResponseCache(backend=backend, ttls=TTLS)
+        generations = await cache.generations()
+        assert await cache.set(LIBRARY, _result("NAVIGATION"), generations)
+
+        await cache.invalidate("documents")
+        assert await cache.get(LIBRARY, await cache.generations()) is not None
+
+        await cache.invalidate("pois")
+        assert await cache.get(LIBRARY, await cache.generations()) is None
+        # A run that read its generations before the write can't store a fresh-looking entry
+        await cache.set(LIBRARY, _result("NAVIGATION"), generations)
+        assert await cache.get(LIBRARY, await cache.generations()) is None
+        assert cache.stats()["stale"] == 2
+
+    asyncio.run(run())
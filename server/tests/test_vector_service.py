@@ -0,0 +1,51 @@
+"""
+Tests for VectorSearchService degrading to full-text search.
+"""
+import asyncio
+
+import pytest
+
+from app.core.exceptions import VectorSearchError
+from app.services.vector_service import VectorSearchService
+from config import settings
+
+
+class DownAI:
+    async def generate_embedding(self, text, use_poi_key=False):
+        raise RuntimeError("voyage circuit open")
+
+
+class RecordingDB:
+    def __init__(self, full_text):
+        self.full_text = full_text
+        self.calls = []
+
+    async def has_full_text_search(self):
+        return self.full_text
+
+    async def hybrid_search(self, query, query_embedding=None, limit=5, *, columns=None):
+        self.calls.append(("hybrid_search", query_embedding))
+        return [{"id": 1, "title": "Fees", "content": "Tuition is due in October.", "source": None, "tags": None}]
+
+    async def semantic_search(self, query_embedding, limit=5, *, columns=None):
+        self.calls.append(("semantic_search", query_embedding))
+        return []
+
+
+def test_embedding_failure_falls_back_to_full_text_without_hybrid_mode(monkeypatch):
+    monkeypatch.setattr(settings, "db_hybrid_search", False)
+    db = RecordingDB(full_text=True)
+
+    documents = asyncio.run(VectorSearchService(db, DownAI()).search_documents("tuition deadline"))
+
+    assert [doc.title for doc in documents] == ["Fees"]
+    assert db.calls == [("hybrid_search", None)]
+
+
+def test_embedding_failure_still_fails_without_full_text_column(monkeypatch):
+    monkeypatch.setattr(settings, "db_hybrid_search", False)
+    db = RecordingDB(full_text=False)
+
+    with pytest.raises(VectorSearchError):
+        asyncio.run(VectorSearchService(db, DownAI()).search_documents("tuition deadline"))
+    assert db.calls == []